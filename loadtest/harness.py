@@ -0,0 +1,228 @@
+import argparse
+import json
+import math
+import os
+import random
+import threading
+import time
+import redis
+import requests
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+
+from src.app.forex.constant import (
+  COMMODITY_SNAPSHOT_FAILED_KEY, COMMODITY_SNAPSHOT_KEY, CURRENCY_CACHE_PREFIX, DEFAULT_COMMODITIES,
+  DEFAULT_COMMODITY_PAIRS, DEFAULT_CURRENCIES, DEFAULT_CURRENCY_PAIRS, L1_INVALIDATION_CHANNEL
+)
+
+
+FOREX_PATH = "/app/api/v1/forex" # Path prefix of the forex blueprint
+
+# Faults injected into the stand-in upstreams for the degraded case
+DEGRADED_FAULTS = {"latency_ms": 300, "jitter_ms": 200, "error_rate": 0.3, "timeout_rate": 0.1}
+
+
+@dataclass
+class ScenarioResult:
+  """
+  Data class representing the measurements of one load scenario.
+  """
+
+  name: str
+  requests: int
+  duration: float # Wall time of the scenario in seconds
+  latencies: list[float] # Latency of each request in milliseconds
+  statuses: dict[int, int] = field(default_factory=dict) # Response count by status code, 0 for client errors
+  upstream_calls: dict[str, int] = field(default_factory=dict) # Stand-in call count by upstream
+
+  def percentile(self, p: float) -> float:
+    """
+    Return the latency percentile in milliseconds, with the nearest-rank method.
+    """
+
+    if len(self.latencies) == 0:
+      return 0
+
+    ranked = sorted(self.latencies)
+    return ranked[max(0, math.ceil(p / 100 * len(ranked)) - 1)]
+
+  def summary(self) -> dict:
+    return {
+      "scenario": self.name,
+      "requests": self.requests,
+      "throughput": round(self.requests / self.duration, 1) if self.duration > 0 else 0,
+      "p50_ms": round(self.percentile(50), 2),
+      "p99_ms": round(self.percentile(99), 2),
+      "statuses": self.statuses,
+      "upstream_calls": self.upstream_calls
+    }
+
+
+class LoadHarness:
+  """
+  Load generator of the forex API, run against an app whose upstream base URLs point at the stand-in server
+  (see `loadtest.upstream`). Each scenario resets the stand-in call counts, so the upstream load it causes
+  is reported next to the API throughput and latency.
+  """
+
+  def __init__(self, target: str, stub: str, rdb: redis.Redis, concurrency: int, seed: int):
+    """
+    Initialize the load harness.
+
+    Parameters:
+    - target: Base URL of the API under test.
+    - stub: Base URL of the upstream stand-in.
+    - rdb: Redis client of the API, used to clear the forex cache.
+    - concurrency: Number of concurrent clients.
+    - seed: Seed of the request mix.
+    """
+
+    self.target = target.rstrip("/")
+    self.stub = stub.rstrip("/")
+    self.rdb = rdb
+    self.concurrency = concurrency
+    self.random = random.Random(seed)
+    self.local = threading.local()
+
+  def run_scenario(self, name: str, total: int, cold: bool, faults: Optional[dict] = None) -> ScenarioResult:
+    """
+    Send `total` requests of the forex request mix and measure them.
+
+    Parameters:
+    - name: Scenario name.
+    - total: Number of requests.
+    - cold: Whether the forex cache is cleared first.
+    - faults: Optional faults injected into the stand-in during the scenario.
+    """
+
+    if cold:
+      self.clear_cache()
+
+    previous_faults: dict = requests.get(f"{self.stub}/_stats", timeout=5).json()["faults"]
+    if faults is not None:
+      requests.post(f"{self.stub}/_faults", json=faults, timeout=5).raise_for_status()
+    requests.post(f"{self.stub}/_reset", timeout=5).raise_for_status()
+
+    paths = [self._next_path() for _ in range(total)]
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    lock = threading.Lock()
+
+    def send(path: str):
+      status, latency = self._send(path)
+      with lock:
+        latencies.append(latency)
+        statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(self.concurrency) as pool:
+      list(pool.map(send, paths))
+    duration = time.perf_counter() - started
+
+    stats: dict = requests.get(f"{self.stub}/_stats", timeout=5).json()
+    if faults is not None:
+      requests.post(f"{self.stub}/_faults", json=previous_faults, timeout=5).raise_for_status()
+
+    return ScenarioResult(name, total, duration, latencies, statuses, stats.get("calls", {}))
+
+  def clear_cache(self):
+    """
+    Delete the cached forex data from Redis, and tell every worker to drop its local copy.
+    """
+
+    keys = [f"{CURRENCY_CACHE_PREFIX}{base}" for base in DEFAULT_CURRENCIES]
+    keys += [COMMODITY_SNAPSHOT_KEY, COMMODITY_SNAPSHOT_FAILED_KEY]
+
+    pipe = self.rdb.pipeline()
+    pipe.delete(*keys)
+    for key in keys:
+      pipe.publish(L1_INVALIDATION_CHANNEL, json.dumps({"key": key, "origin": "loadtest"}))
+    pipe.execute()
+
+  def _send(self, path: str) -> tuple[int, float]:
+    """
+    Send a request with the session of the calling thread.
+    Return the status code (0 for a client error) and the latency in milliseconds.
+    """
+
+    session: Optional[requests.Session] = getattr(self.local, "session", None)
+    if session is None:
+      session = self.local.session = requests.Session()
+
+    started = time.perf_counter()
+    try:
+      status = session.get(f"{self.target}{path}", timeout=30).status_code
+    except requests.RequestException:
+      status = 0
+
+    return status, (time.perf_counter() - started) * 1000
+
+  def _next_path(self) -> str:
+    """
+    Pick the next request of the mix: currency rates, commodity prices and pair quotes.
+    """
+
+    kind = self.random.random()
+    if kind < 0.4:
+      bases = self.random.sample(sorted(DEFAULT_CURRENCIES), self.random.randint(1, 3))
+      return f"{FOREX_PATH}/currencies?" + "&".join(f"base={base}" for base in bases)
+    if kind < 0.7:
+      symbols = self.random.sample(sorted(DEFAULT_COMMODITIES), self.random.randint(1, 3))
+      return f"{FOREX_PATH}/commodities?" + "&".join(f"symbol={symbol}" for symbol in symbols)
+
+    pairs = self.random.sample(DEFAULT_CURRENCY_PAIRS + DEFAULT_COMMODITY_PAIRS, self.random.randint(1, 5))
+    return f"{FOREX_PATH}/pairs?" + "&".join(f"pair={pair}" for pair in pairs)
+
+
+def print_results(results: list[ScenarioResult]):
+  """
+  Print the scenario summaries as a table.
+  """
+
+  print(f"{'scenario':<10} {'requests':>8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}  statuses / upstream calls")
+  for result in results:
+    summary = result.summary()
+    print(
+      f"{summary['scenario']:<10} {summary['requests']:>8} {summary['throughput']:>8} "
+      f"{summary['p50_ms']:>8} {summary['p99_ms']:>8}  {summary['statuses']} / {summary['upstream_calls']}"
+    )
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Load test of the forex API against the upstream stand-in.")
+  parser.add_argument("--target", default="http://127.0.0.1:5000", help="Base URL of the API under test")
+  parser.add_argument("--stub", default="http://127.0.0.1:8010", help="Base URL of the upstream stand-in")
+  parser.add_argument("--redis-uri", default=os.getenv("REDIS_URI", "redis://:redis@localhost:6379/0"))
+  parser.add_argument("--requests", type=int, default=2000, help="Requests per scenario")
+  parser.add_argument("--concurrency", type=int, default=32)
+  parser.add_argument("--scenarios", default="cold,warm,degraded", help="Comma separated scenarios to run")
+  parser.add_argument("--seed", type=int, default=0)
+  parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+  args = parser.parse_args()
+
+  harness = LoadHarness(args.target, args.stub, redis.Redis.from_url(args.redis_uri), args.concurrency, args.seed)
+
+  # Cold: empty cache, every miss goes upstream. Warm: served from cache.
+  # Degraded: empty cache with slow, failing and timing out upstreams.
+  scenarios = {
+    "cold": lambda: harness.run_scenario("cold", args.requests, cold=True),
+    "warm": lambda: harness.run_scenario("warm", args.requests, cold=False),
+    "degraded": lambda: harness.run_scenario("degraded", args.requests, cold=True, faults=DEGRADED_FAULTS)
+  }
+
+  results: list[ScenarioResult] = []
+  for name in args.scenarios.split(","):
+    if name not in scenarios:
+      parser.error(f"Unknown scenario: {name}.")
+    results.append(scenarios[name]())
+
+  if args.json:
+    print(json.dumps([result.summary() for result in results], indent=2))
+  else:
+    print_results(results)
+
+
+if __name__ == "__main__":
+  main()
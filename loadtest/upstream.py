@@ -0,0 +1,277 @@
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+from src.app.forex.constant import DEFAULT_COMMODITIES, DEFAULT_CURRENCIES
+
+
+FRANKFURTER_PREFIX = "/frankfurter" # Path prefix standing in for https://api.frankfurter.dev/v1
+GOLD_API_PREFIX = "/gold-api" # Path prefix standing in for https://api.gold-api.com
+GOLD_API_IO_PREFIX = "/goldapi-io" # Path prefix standing in for https://www.goldapi.io
+
+
+@dataclass
+class FaultConfig:
+  """
+  Data class representing the faults injected into every stand-in response.
+  """
+
+  latency_ms: float = 0 # Base delay added to every response
+  jitter_ms: float = 0 # Max random delay added on top of the base delay
+  error_rate: float = 0 # Share of requests answered with `error_status`
+  error_status: int = 503 # Status code of injected errors
+  timeout_rate: float = 0 # Share of requests held for `timeout_ms` before the connection is dropped
+  timeout_ms: float = 10000 # Time a timed out request is held, longer than the client read timeout
+
+
+class UpstreamStub:
+  """
+  Stand-in for the Frankfurter, gold-api.com and goldapi.io endpoints used by the forex servicers.
+  Prices and rates are deterministic per symbol with a small random drift, and every call is counted by upstream.
+  """
+
+  def __init__(self, faults: FaultConfig):
+    """
+    Initialize the stand-in.
+
+    Parameters:
+    - faults: Faults injected into the responses, can be changed at runtime.
+    """
+
+    self.faults = faults
+    self.lock = threading.Lock()
+    self.calls: dict[str, int] = {}
+
+  def handle(self, path: str, query: dict[str, list[str]]) -> tuple[int, Optional[dict]]:
+    """
+    Route a GET request to the matching upstream, after applying the injected faults.
+    Return the status code and JSON body, a None body means the connection is dropped.
+    """
+
+    upstream, handler = self._route(path)
+    if handler is None:
+      return 404, {"message": "Not Found"}
+
+    with self.lock:
+      self.calls[upstream] = self.calls.get(upstream, 0) + 1
+      faults = FaultConfig(**asdict(self.faults))
+
+    time.sleep((faults.latency_ms + random.uniform(0, faults.jitter_ms)) / 1000)
+
+    roll = random.random()
+    if roll < faults.timeout_rate:
+      time.sleep(faults.timeout_ms / 1000)
+      return 0, None
+    if roll < faults.timeout_rate + faults.error_rate:
+      return faults.error_status, {"message": "Injected error"}
+
+    return handler(path, query)
+
+  def stats(self) -> dict:
+    """
+    Return the call count of each upstream and the current faults.
+    """
+
+    with self.lock:
+      return {"calls": dict(self.calls), "faults": asdict(self.faults)}
+
+  def reset(self):
+    """
+    Reset the call counts.
+    """
+
+    with self.lock:
+      self.calls = {}
+
+  def set_faults(self, changes: dict):
+    """
+    Update some of the injected faults.
+    """
+
+    with self.lock:
+      self.faults = FaultConfig(**{**asdict(self.faults), **changes})
+
+  def _route(self, path: str):
+    if path.startswith(f"{FRANKFURTER_PREFIX}/latest"):
+      return "frankfurter", self._latest_rates
+    if path.startswith(f"{FRANKFURTER_PREFIX}/") and ".." in path:
+      return "frankfurter", self._time_series
+    if path.startswith(f"{GOLD_API_PREFIX}/price/"):
+      return "gold_api", self._gold_api_price
+    if path.startswith(f"{GOLD_API_IO_PREFIX}/api/"):
+      return "gold_api_io", self._gold_api_io_price
+
+    return "", None
+
+  def _latest_rates(self, path: str, query: dict[str, list[str]]) -> tuple[int, Optional[dict]]:
+    base = query.get("base", ["EUR"])[0].upper()
+    if base not in DEFAULT_CURRENCIES:
+      return 404, {"message": "not found"}
+
+    return 200, {
+      "amount": 1.0,
+      "base": base,
+      "date": date.today().isoformat(),
+      "rates": self._rates(base, drift=True)
+    }
+
+  def _time_series(self, path: str, query: dict[str, list[str]]) -> tuple[int, Optional[dict]]:
+    base = query.get("base", ["EUR"])[0].upper()
+    start, end = (date.fromisoformat(day) for day in path[len(FRANKFURTER_PREFIX) + 1:].split(".."))
+
+    # Rates are published on business days only
+    rates: dict[str, dict[str, float]] = {}
+    day = start
+    while day <= end:
+      if day.weekday() < 5:
+        rates[day.isoformat()] = self._rates(base, drift=False)
+      day += timedelta(days=1)
+
+    return 200, {"amount": 1.0, "base": base, "start_date": start.isoformat(), "end_date": end.isoformat(), "rates": rates}
+
+  def _gold_api_price(self, path: str, query: dict[str, list[str]]) -> tuple[int, Optional[dict]]:
+    symbol = path.rsplit("/", 1)[-1].upper()
+    if symbol not in DEFAULT_COMMODITIES:
+      return 404, {"message": "not found"}
+
+    return 200, {
+      "name": DEFAULT_COMMODITIES[symbol],
+      "price": self._price(symbol),
+      "symbol": symbol,
+      "updatedAt": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    }
+
+  def _gold_api_io_price(self, path: str, query: dict[str, list[str]]) -> tuple[int, Optional[dict]]:
+    symbol = path.split("/")[-2].upper()
+    if symbol not in DEFAULT_COMMODITIES:
+      return 404, {"error": "not found"}
+
+    return 200, {"metal": symbol, "currency": "USD", "price": self._price(symbol), "timestamp": int(time.time())}
+
+  def _rates(self, base: str, drift: bool) -> dict[str, float]:
+    base_value = self._value(base)
+    return {
+      currency: round(self._value(currency) / base_value * (1 + random.uniform(-1e-4, 1e-4) if drift else 1), 6)
+      for currency in DEFAULT_CURRENCIES if currency != base
+    }
+
+  def _price(self, symbol: str) -> float:
+    return round(self._value(symbol) * 1000 * (1 + random.uniform(-1e-3, 1e-3)), 2)
+
+  def _value(self, symbol: str) -> float:
+    # Stable value per symbol, so derived cross rates stay consistent
+    return 0.5 + (zlib.crc32(symbol.encode()) % 10000) / 100
+
+
+def create_handler(stub: UpstreamStub) -> type[BaseHTTPRequestHandler]:
+  """
+  Create the request handler class serving the stand-in, with its control endpoints:
+  - GET /_stats: call counts and faults.
+  - POST /_faults: update the faults with a JSON object of `FaultConfig` fields.
+  - POST /_reset: reset the call counts.
+  """
+
+  class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True # Headers and body are separate writes, don't delay keep-alive responses
+
+    def do_GET(self):
+      url = urlsplit(self.path)
+      if url.path == "/_stats":
+        return self._send(200, stub.stats())
+
+      status, body = stub.handle(url.path, parse_qs(url.query))
+      if body is None:
+        self.close_connection = True
+        return
+
+      self._send(status, body)
+
+    def do_POST(self):
+      url = urlsplit(self.path)
+      length = int(self.headers.get("Content-Length", 0))
+      payload = json.loads(self.rfile.read(length) or b"{}")
+
+      if url.path == "/_faults":
+        try:
+          stub.set_faults(payload)
+        except TypeError as e:
+          return self._send(400, {"message": str(e)})
+        return self._send(200, stub.stats())
+      if url.path == "/_reset":
+        stub.reset()
+        return self._send(200, stub.stats())
+
+      self._send(404, {"message": "Not Found"})
+
+    def log_message(self, format: str, *args):
+      # Keep the output readable under load
+      pass
+
+    def _send(self, status: int, body: dict):
+      data = json.dumps(body).encode()
+      self.send_response(status)
+      self.send_header("Content-Type", "application/json")
+      self.send_header("Content-Length", str(len(data)))
+      self.end_headers()
+      self.wfile.write(data)
+
+  return Handler
+
+
+def serve(host: str, port: int, faults: FaultConfig) -> ThreadingHTTPServer:
+  """
+  Start the stand-in server in a daemon thread.
+  """
+
+  server = ThreadingHTTPServer((host, port), create_handler(UpstreamStub(faults)))
+  server.daemon_threads = True
+  threading.Thread(target=server.serve_forever, name="upstream-stub", daemon=True).start()
+  return server
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Stand-in server of the forex upstream APIs.")
+  parser.add_argument("--host", default="127.0.0.1")
+  parser.add_argument("--port", type=int, default=8010)
+  parser.add_argument("--latency-ms", type=float, default=50)
+  parser.add_argument("--jitter-ms", type=float, default=20)
+  parser.add_argument("--error-rate", type=float, default=0)
+  parser.add_argument("--error-status", type=int, default=503)
+  parser.add_argument("--timeout-rate", type=float, default=0)
+  parser.add_argument("--timeout-ms", type=float, default=10000)
+  args = parser.parse_args()
+
+  faults = FaultConfig(
+    latency_ms=args.latency_ms,
+    jitter_ms=args.jitter_ms,
+    error_rate=args.error_rate,
+    error_status=args.error_status,
+    timeout_rate=args.timeout_rate,
+    timeout_ms=args.timeout_ms
+  )
+  server = serve(args.host, args.port, faults)
+
+  base = f"http://{args.host}:{server.server_port}"
+  print(f"Upstream stand-in listening on {base}, start the API with:")
+  print(f"  FRANKFURTER_BASE_URL={base}{FRANKFURTER_PREFIX}")
+  print(f"  GOLD_API_BASE_URL={base}{GOLD_API_PREFIX}")
+  print(f"  GOLD_API_IO_BASE_URL={base}{GOLD_API_IO_PREFIX}")
+
+  try:
+    threading.Event().wait()
+  except KeyboardInterrupt:
+    server.shutdown()
+
+
+if __name__ == "__main__":
+  main()
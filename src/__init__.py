@@ -7,12 +7,12 @@ from flask_smorest import Api
 from request_id import RequestId
 
 from src.app.user import init_internal_auth_app, init_auth_app
-from src.app.forex import init_forex_app
+from src.app.forex import init_forex_app, init_internal_forex_app
 from src.app.user.repository import Repository as AuthRepo
 from src.config import config
 from src.extensions import (
   app_logger, auth_service, db_service, email_service, ip_service, redis_service,
-  frank_further_service, gold_api_service, gold_api_io_service
+  frank_further_service, gold_api_service, gold_api_io_service, async_http_client
 )
 from src.middleware.access_log import AccessLogMiddleware
 from src.middleware.error import ErrorMiddleware
@@ -94,7 +94,9 @@ def create_app():
         url_prefix="/app/api/v1/auth"
       )
       api.register_blueprint(
-        init_forex_app(config, redis_service, frank_further_service, gold_api_service, gold_api_io_service),
+        init_forex_app(
+          config, redis_service, frank_further_service, gold_api_service, gold_api_io_service, async_http_client
+        ),
         url_prefix="/app/api/v1/forex"
       )
     case "http_internal":
@@ -102,6 +104,10 @@ def create_app():
         init_internal_auth_app(config, db_service, redis_service, ip_service, email_service), 
         url_prefix="/app/api/v1/auth"
       )
+      api.register_blueprint(
+        init_internal_forex_app(redis_service, frank_further_service, gold_api_service, gold_api_io_service),
+        url_prefix="/app/api/v1/forex"
+      )
     case _:  
       app_logger.fatal(f"Invalid app mode: '{config.app_mode}' detected. Expected 'http_pulic' or 'http_internal'.")
       sys.exit(1)
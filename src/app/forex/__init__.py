@@ -1,9 +1,23 @@
+from datetime import date, timedelta
 from flask_smorest import Blueprint
 
+from src.app.forex.constant import (
+  ANCHOR_CURRENCY, CURRENCY_ALIASES, DEFAULT_COMMODITIES, DEFAULT_CURRENCIES, HISTORY_SYNC_INTERVAL,
+  METRICS_PUBLISH_INTERVAL, METRICS_WORKER_TTL, RATE_TABLE_READ_RETRIES, RATE_TABLE_WRITE_INTERVAL,
+  STREAM_CLIENT_BUFFER, STREAM_POLL_INTERVAL, STREAM_THREAD_SHARE
+)
+from src.app.forex.history import RateHistoryStore, RateHistorySyncer
 from src.app.forex.http_handler import create_forex_blueprint
+from src.app.forex.http_internal_handler import create_internal_forex_blueprint
 from src.app.forex.manager import ForexService
+from src.app.forex.metrics import ForexMetricsPublisher, ForexMetricsReader
+from src.app.forex.refresher import ForexRefresher
 from src.app.forex.repository import Repository
+from src.app.forex.shared_table import RateTableWriter, SharedRateTable
+from src.app.forex.stream import ForexStreamHub, ForexStreamPoller
+from src.app.forex.warm_start import ForexWarmStart
 from src.config import Config
+from src.service.async_http import AsyncHTTPClient
 from src.service.redis import RedisServicer
 from src.service.frankfurter import FrankFurtherServicer
 from src.service.gold_api import GoldAPIServicer
@@ -11,8 +25,83 @@ from src.service.gold_api_io import GoldAPIIOServicer
 
 
 def init_forex_app(config: Config, redis_client: RedisServicer, ffs: FrankFurtherServicer,
-  gs: GoldAPIServicer, gsio: GoldAPIIOServicer) -> Blueprint: 
-  repo = Repository(redis_client, ffs, gs, gsio)
-  forex_service = ForexService(config, repo)
+  gs: GoldAPIServicer, gsio: GoldAPIIOServicer, async_client: AsyncHTTPClient) -> Blueprint: 
+  repo = Repository(
+    redis_client,
+    ffs,
+    gs,
+    gsio,
+    async_client,
+    timedelta(seconds=config.forex_max_staleness),
+    timedelta(seconds=config.http_batch_deadline)
+  )
+  repo.currency.subscribe_invalidation()
+
+  # Rehydrate an empty cache from the local snapshot, before the refresher calls the upstreams
+  warm_start = ForexWarmStart(
+    config.forex_warm_start_path,
+    repo,
+    timedelta(seconds=config.forex_warm_start_interval)
+  )
+  warm_start.start()
+
+  # Pre-warm forex cache keys before they expire
+  refresher = ForexRefresher(
+    redis_client,
+    repo,
+    timedelta(seconds=config.forex_refresh_interval),
+    timedelta(seconds=config.forex_refresh_ahead)
+  )
+  refresher.start()
+
+  # Backfill and extend the rate history off the request path
+  history = RateHistoryStore(config.forex_history_dir, ANCHOR_CURRENCY, list(DEFAULT_CURRENCIES))
+  history_syncer = RateHistorySyncer(
+    history,
+    ffs,
+    date.fromisoformat(config.forex_history_start),
+    HISTORY_SYNC_INTERVAL
+  )
+  history_syncer.start()
+
+  # Publish forex updates once for every stream client
+  poller = ForexStreamPoller(redis_client, repo, STREAM_POLL_INTERVAL)
+  poller.start()
+  # Every open stream holds a request thread, keep the rest for regular requests
+  stream_max_clients = max(1, int(config.http_threads * STREAM_THREAD_SHARE))
+  stream_hub = ForexStreamHub(redis_client, stream_max_clients, STREAM_CLIENT_BUFFER)
+  stream_hub.start()
+
+  # Pair quotes shared by every worker of the host
+  rate_table = SharedRateTable(
+    config.forex_rate_table_path,
+    [*DEFAULT_CURRENCIES, *CURRENCY_ALIASES, *DEFAULT_COMMODITIES],
+    RATE_TABLE_READ_RETRIES
+  )
+
+  forex_service = ForexService(config, repo, history, stream_hub, rate_table)
+
+  rate_table_writer = RateTableWriter(rate_table, forex_service.load_pair_index, RATE_TABLE_WRITE_INTERVAL)
+  rate_table_writer.start()
+
+  # Share the metrics of this worker with the internal app
+  metrics_publisher = ForexMetricsPublisher(
+    redis_client,
+    forex_service.get_metrics,
+    METRICS_PUBLISH_INTERVAL,
+    METRICS_WORKER_TTL
+  )
+  metrics_publisher.start()
 
   return create_forex_blueprint(forex_service)
+
+def init_internal_forex_app(redis_client: RedisServicer, ffs: FrankFurtherServicer, gs: GoldAPIServicer,
+  gsio: GoldAPIIOServicer) -> Blueprint:
+  quotas = {"frankfurter": ffs.quota, "gold_api": gs.quota, "gold_api_io": gsio.quota}
+  metrics_reader = ForexMetricsReader(
+    redis_client,
+    {name: quota for name, quota in quotas.items() if quota is not None},
+    METRICS_WORKER_TTL
+  )
+
+  return create_internal_forex_blueprint(metrics_reader)
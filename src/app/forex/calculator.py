@@ -0,0 +1,92 @@
+from typing import Optional
+
+from src.app.forex.constant import (
+  COMMODITY_CONTRACT_SIZES, COMMODITY_PIP_DECIMALS, CURRENCY_ALIASES, DEFAULT_COMMODITY_PAIRS, DEFAULT_CONTRACT_SIZE,
+  DEFAULT_CURRENCY_PAIRS, DEFAULT_PIP_DECIMAL, QUOTE_PIP_MULTIPLIERS
+)
+from src.app.forex.model import PairSpec
+from src.app.forex.pair_index import PairIndex
+
+
+def get_pair_spec(pair: str) -> PairSpec:
+  """
+  Return the default pip decimal and standard lot contract size of a currency or commodity pair ("BASE/QUOTE").
+  """
+
+  base, quote = pair.split("/")
+  quote = CURRENCY_ALIASES.get(quote, quote)
+
+  pip_decimal = COMMODITY_PIP_DECIMALS.get(base, DEFAULT_PIP_DECIMAL) * QUOTE_PIP_MULTIPLIERS.get(quote, 1)
+  return PairSpec(
+    pip_decimal=round(pip_decimal, 10),
+    contract_size=COMMODITY_CONTRACT_SIZES.get(base, DEFAULT_CONTRACT_SIZE)
+  )
+
+
+def get_cross_pair(account: str, asset: str) -> str:
+  """
+  Return the pair converting between the account currency and another asset, in its usual market order:
+  account currency first if such a pair is listed, else the asset first.
+  """
+
+  pair = f"{account}/{asset}"
+  if pair in DEFAULT_CURRENCY_PAIRS or pair in DEFAULT_COMMODITY_PAIRS:
+    return pair
+
+  return f"{asset}/{account}"
+
+
+def get_context_pairs(pair: str, account: str) -> list[str]:
+  """
+  Return the pairs whose quotes are needed to build the calculator context of a pair.
+  """
+
+  pairs = [pair]
+  for asset in pair.split("/"):
+    if asset != account:
+      pairs += [f"{asset}/{account}", get_cross_pair(account, asset)]
+
+  return list(dict.fromkeys(pairs))
+
+
+def build_calculator_context(pair: str, account: str, index: PairIndex) -> dict:
+  """
+  Build everything the forex calculators need to price a pair for an account currency, from one pair index.
+
+  Parameters:
+  - pair: Currency or commodity pair, e.g. "EUR/JPY".
+  - account: Account currency.
+  - index: Pair index holding the quotes of `get_context_pairs`.
+
+  Returns:
+  - The pair price, the account currency value of one unit of base and quote, the cross pairs shown
+    by the calculators with their rate (None when the account currency is part of the pair), and the pair specs.
+    Unavailable rates are None.
+  """
+
+  base, quote = pair.split("/")
+  spec = get_pair_spec(pair)
+
+  def get_rate(asset: str) -> Optional[float]:
+    return 1.0 if asset == account else index.get(f"{asset}/{account}")
+
+  def get_cross(asset: str) -> Optional[dict]:
+    if asset == account:
+      return None
+
+    cross_pair = get_cross_pair(account, asset)
+    return {"pair": cross_pair, "rate": index.get(cross_pair), "pip_decimal": get_pair_spec(cross_pair).pip_decimal}
+
+  return {
+    "pair": pair,
+    "account": account,
+    "price": index.get(pair),
+    "base_rate": get_rate(base),
+    "quote_rate": get_rate(quote),
+    "base_cross": get_cross(base),
+    "quote_cross": get_cross(quote),
+    "pip_decimal": spec.pip_decimal,
+    "contract_size": spec.contract_size,
+    "updated_at": index.updated_at,
+    "stale": index.stale
+  }
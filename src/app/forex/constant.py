@@ -1,3 +1,6 @@
+from datetime import time, timedelta
+
+
 DEFAULT_CURRENCIES = {
   "AUD": "Australian Dollar",
   "BGN": "Bulgarian Lev",
@@ -40,6 +43,11 @@ DEFAULT_COMMODITIES = {
   "XPT": "Platinum"
 }
 
+# Currencies without their own rates, quoted with the rates of another currency
+CURRENCY_ALIASES = {
+  "CNH": "CNY"
+}
+
 DEFAULT_CURRENCY_PAIRS = [
   'AUD/CAD', 'AUD/CHF', 'AUD/JPY', 'AUD/NZD', 'AUD/SGD', 'AUD/USD', 
   'CAD/CHF', 'CAD/JPY', 
@@ -63,3 +71,111 @@ DEFAULT_COMMODITY_PAIRS = [
   'XPD/USD', 
   'XPT/USD', 
 ]
+
+# Pip decimal of commodities quoted in USD
+COMMODITY_PIP_DECIMALS = {
+  "HG": 0.0001,
+  "XAG": 0.01,
+  "XAU": 0.1,
+  "XPD": 0.1,
+  "XPT": 0.1
+}
+
+# Units of commodity in a standard lot
+COMMODITY_CONTRACT_SIZES = {
+  "HG": 25000,
+  "XAG": 1000,
+  "XAU": 100,
+  "XPD": 100,
+  "XPT": 100
+}
+
+# Pip decimal scale of pairs quoted in low-value currencies, e.g. USD/JPY pip is 0.01 instead of 0.0001
+QUOTE_PIP_MULTIPLIERS = {
+  "CZK": 10,
+  "HUF": 100,
+  "JPY": 100
+}
+
+# Share of the standard lot contract size by lot type
+LOT_SIZES = {
+  "standard": 1,
+  "mini": 0.1,
+  "micro": 0.01
+}
+
+BATCH_MAX_SIZE = 10000 # Max scenarios or positions of a forex batch request
+DEFAULT_PIP_DECIMAL = 0.0001 # Pip decimal of currency pairs
+DEFAULT_CONTRACT_SIZE = 100000 # Units of base currency in a standard lot
+
+FEE_NONE = 0 # Position sized without trading fee
+FEE_PER_LOT = 1 # Commission charged per lot traded
+FEE_PER_100K = 2 # Commission charged per 100k units of base currency traded
+PROFIT_GOAL_NONE = 0 # Position sized without profit goal
+PROFIT_GOAL_PIP = 1 # Profit goal given in pips
+PROFIT_GOAL_PORTFOLIO = 2 # Profit goal given in percent of the portfolio capital
+
+POSITION_SIDES = ("long", "short") # Sides of an open position
+
+# Trading fee and profit goal codes by their name in requests
+FEE_TYPES = {
+  "none": FEE_NONE,
+  "per_lot": FEE_PER_LOT,
+  "per_100k": FEE_PER_100K
+}
+
+PROFIT_GOAL_TYPES = {
+  "none": PROFIT_GOAL_NONE,
+  "pip": PROFIT_GOAL_PIP,
+  "portfolio": PROFIT_GOAL_PORTFOLIO
+}
+
+POSITION_SIZE_MAX_ITERATIONS = 10000 # Max steps of the lot size and profit pip adjustments, as in the web calculator
+
+ANCHOR_CURRENCY = "EUR" # Every cross rate is derived from this currency's rate table
+CROSS_RATE_TOLERANCE = 1e-4 # Max relative difference between derived and direct upstream rates
+CURRENCY_CACHE_PREFIX = "forex:currency:" # Cache key prefix of currency rates by base currency
+RATE_MATRIX_LOCK_KEY = "forex:currency:matrix:lock" # Lock serializing the anchor rate table fetch
+
+ECB_TIMEZONE = "Europe/Berlin" # Time zone of the ECB reference rate publication (CET/CEST)
+ECB_PUBLICATION_TIME = time(16, 0) # Local time the ECB publishes reference rates on TARGET business days
+ECB_PUBLICATION_DELAY = timedelta(minutes=15) # Time for the upstream to pick up a new ECB publication
+ECB_RETRY_INTERVAL = timedelta(minutes=10) # Time before refetching rates the upstream hasn't updated yet
+METALS_TIMEZONE = "America/New_York" # Time zone of the metals market hours
+METALS_CLOSE_TIME = time(17, 0) # Local time metals markets close on Friday
+METALS_OPEN_TIME = time(18, 0) # Local time metals markets reopen on Sunday
+COMMODITY_SNAPSHOT_KEY = "forex:commodity:snapshot" # Redis hash of every commodity price, refreshed together
+COMMODITY_SNAPSHOT_FAILED_KEY = "forex:commodity:snapshot:failed" # Negative cache entry of a failed snapshot fetch
+COMMODITY_SNAPSHOT_TTL = timedelta(hours=1) # Time a commodity snapshot is served before being refreshed
+COMMODITY_FILL_LOCK_KEY = "forex:commodity:fill:lock" # Lock serializing the commodity snapshot fetch
+
+CACHE_FILL_LOCK_TIMEOUT = timedelta(seconds=30) # Max lifetime of the cross-process cache fill lock
+CACHE_FILL_LOCK_WAIT = timedelta(seconds=15) # Max time to wait for another process to fill the cache
+NEGATIVE_CACHE_TTL = timedelta(seconds=30) # Time a failed upstream fetch is cached to fail fast
+
+FILL_MAX_WORKERS = 8 # Max threads loading forex cache misses of batch reads
+REVALIDATE_MAX_WORKERS = 4 # Max threads refreshing stale forex cache in the background
+
+L1_CACHE_MAX_SIZE = 256 # Max entries kept in the in-process forex cache
+L1_INVALIDATION_CHANNEL = "forex:invalidate" # Redis pub/sub channel to invalidate in-process forex cache
+
+HISTORY_SYNC_INTERVAL = timedelta(hours=1) # Time between two forex rate history syncs with upstream
+
+ASSETS_MAX_AGE = timedelta(days=1) # Time clients may reuse the forex asset list without revalidation
+
+RATE_TABLE_WRITE_INTERVAL = timedelta(seconds=5) # Time between two refreshes of the shared rate table
+RATE_TABLE_READ_RETRIES = 100 # Max attempts of a shared rate table read racing with writes
+
+STREAM_CHANNEL = "forex:stream" # Redis pub/sub channel of forex price and rate updates
+STREAM_POLLER_LOCK_KEY = "forex:stream:poller:lock" # Lock electing the single poller publishing forex updates
+STREAM_VERSIONS_KEY = "forex:stream:versions" # Redis hash of the last published update time by item
+STREAM_POLL_INTERVAL = timedelta(seconds=5) # Time between two polls of the forex cache for updates
+STREAM_KEEPALIVE = timedelta(seconds=15) # Max idle time of a stream before a keep-alive comment is sent
+STREAM_THREAD_SHARE = 0.5 # Max share of the request threads of a worker held by stream clients
+STREAM_CLIENT_BUFFER = 64 # Max pending events per stream client before it is disconnected as too slow
+
+METRICS_COUNTERS_KEY = "forex:metrics:counters" # Redis hash of the forex counters summed over every worker
+METRICS_WORKERS_KEY = "forex:metrics:workers" # Redis sorted set of the workers by last metrics publication time
+METRICS_WORKER_KEY_PREFIX = "forex:metrics:worker:" # Prefix of the Redis hash of the current gauges of a worker
+METRICS_PUBLISH_INTERVAL = timedelta(seconds=15) # Time between two publications of the forex metrics of a worker
+METRICS_WORKER_TTL = timedelta(seconds=45) # Time after its last publication a worker is left out of the metrics
@@ -0,0 +1,181 @@
+import json
+
+from redis.typing import EncodableT, FieldT
+from typing import Mapping, Optional
+
+
+class CacheFragment:
+  """
+  Cached forex data kept in its serialized JSON form, so it can be spliced into responses as is.
+  Only the timestamps are parsed eagerly, the JSON is decoded on the first access to `data`.
+
+  In Redis, the JSON is prefixed with the timestamps: `{updated_at}:{expired_at}:{json}`.
+  """
+
+  __slots__ = ("raw", "updated_at", "expired_at", "stale", "_data")
+
+  def __init__(self, raw: bytes, updated_at: int, expired_at: int, stale: bool = False, data: Optional[dict] = None):
+    """
+    Initialize the fragment.
+
+    Parameters:
+    - raw: JSON object of the data.
+    - updated_at: Update time of the data.
+    - expired_at: Expiry time of the data.
+    - stale: Whether the data is served past its expiry.
+    - data: Optional decoded data, if already known.
+    """
+
+    self.raw = raw
+    self.updated_at = updated_at
+    self.expired_at = expired_at
+    self.stale = stale
+    self._data = data
+
+  @classmethod
+  def from_data(cls, data: dict) -> "CacheFragment":
+    """
+    Serialize cache data into a fragment.
+    """
+
+    return cls(json.dumps(data).encode(), data["updated_at"], data["expired_at"], data=data)
+
+  @classmethod
+  def decode(cls, value: bytes) -> "CacheFragment":
+    """
+    Parse a fragment stored in Redis, without decoding its JSON.
+    """
+
+    # Values written before fragments were introduced are plain JSON
+    if value.startswith(b"{"):
+      return cls.from_data(json.loads(value))
+
+    updated_at, expired_at, raw = value.split(b":", 2)
+    return cls(raw, int(updated_at), int(expired_at))
+
+  def encode(self) -> bytes:
+    """
+    Serialize the fragment to store it in Redis.
+    """
+
+    return b"%d:%d:%s" % (self.updated_at, self.expired_at, self.raw)
+
+  @property
+  def data(self) -> dict:
+    """
+    Decoded data, without the stale flag.
+    """
+
+    if self._data is None:
+      self._data = json.loads(self.raw)
+
+    return self._data
+
+  def as_stale(self, stale: bool) -> "CacheFragment":
+    """
+    Return a copy of the fragment with the given stale flag, sharing its JSON.
+    """
+
+    return CacheFragment(self.raw, self.updated_at, self.expired_at, stale, self._data)
+
+  def select(self, field: str, keys: list[str]) -> "CacheFragment":
+    """
+    Return a copy of the fragment whose `field` object only keeps the given keys, in the given order.
+    Keys missing from the data are left out.
+    """
+
+    entries: dict = self.data[field]
+    data = {**self.data, field: {key: entries[key] for key in keys if key in entries}}
+    return CacheFragment(json.dumps(data).encode(), self.updated_at, self.expired_at, self.stale, data)
+
+  def to_dict(self) -> dict:
+    """
+    Return the data with its stale flag.
+    """
+
+    return {**self.data, "stale": self.stale}
+
+  def to_json(self) -> bytes:
+    """
+    Return the JSON of the data with its stale flag, spliced in without decoding.
+    """
+
+    return self.raw[:-1] + (b', "stale": true}' if self.stale else b', "stale": false}')
+
+
+class CommoditySnapshot:
+  """
+  Prices of every commodity refreshed together, stored as a single Redis hash.
+  The hash holds one field per symbol with its encoded fragment, next to the snapshot version and timestamps,
+  so any subset of prices is read with one HMGET and always comes from the same refresh.
+  """
+
+  FIELDS = ("version", "updated_at", "expired_at")
+
+  __slots__ = ("version", "updated_at", "expired_at", "prices", "stale")
+
+  def __init__(self, version: int, updated_at: int, expired_at: int, prices: dict[str, CacheFragment],
+    stale: bool = False):
+    """
+    Initialize the snapshot.
+
+    Parameters:
+    - version: Version stamp, incremented on every refresh.
+    - updated_at: Refresh time of the snapshot.
+    - expired_at: Expiry time of the snapshot.
+    - prices: Price fragment by symbol.
+    - stale: Whether the snapshot is served past its expiry.
+    """
+
+    self.version = version
+    self.updated_at = updated_at
+    self.expired_at = expired_at
+    self.prices = prices
+    self.stale = stale
+
+  @classmethod
+  def decode(cls, symbols: list[str], values: list[Optional[bytes]]) -> Optional["CommoditySnapshot"]:
+    """
+    Parse a snapshot read with HMGET of `FIELDS` followed by the symbols.
+    Return None if there is no snapshot.
+    """
+
+    version, updated_at, expired_at = values[:len(cls.FIELDS)]
+    if version is None or updated_at is None or expired_at is None:
+      return None
+
+    prices = {
+      symbol: CacheFragment.decode(value)
+      for symbol, value in zip(symbols, values[len(cls.FIELDS):]) if value is not None
+    }
+    return cls(int(version), int(updated_at), int(expired_at), prices)
+
+  def encode(self) -> Mapping[FieldT, EncodableT]:
+    """
+    Serialize the snapshot into hash fields to store it in Redis.
+    """
+
+    return {
+      "version": b"%d" % self.version,
+      "updated_at": b"%d" % self.updated_at,
+      "expired_at": b"%d" % self.expired_at,
+      **{symbol: fragment.encode() for symbol, fragment in self.prices.items()}
+    }
+
+  def get(self, symbol: str) -> Optional[CacheFragment]:
+    """
+    Return the price fragment of a symbol with the stale flag of the snapshot, None if missing.
+    """
+
+    fragment = self.prices.get(symbol)
+    if fragment is None:
+      return None
+
+    return fragment.as_stale(self.stale)
+
+  def as_stale(self, stale: bool) -> "CommoditySnapshot":
+    """
+    Return a copy of the snapshot with the given stale flag, sharing its prices.
+    """
+
+    return CommoditySnapshot(self.version, self.updated_at, self.expired_at, self.prices, stale)
@@ -0,0 +1,268 @@
+import fcntl
+import os
+import numpy as np
+import threading
+
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from src.app.forex.publication import latest_ecb_reference_date
+from src.extensions import app_logger
+from src.service.frankfurter import FrankFurtherServicer
+
+
+EPOCH = date(1970, 1, 1)
+
+
+class RateHistoryStore:
+  """
+  Daily currency rate history, anchored on a single currency.
+
+  Each currency is stored as a memory-mapped float64 column file (`{CCY}.f64`, NaN when missing),
+  next to an int32 date index (`dates.i32`, days since epoch, ascending).
+  Days are appended to the end of the files and never rewritten. The date index is written last,
+  so its length is the number of complete rows, a crashed append is truncated on the next one.
+  Range queries against the anchor currency are zero-copy slices of the mapped files.
+  """
+
+  def __init__(self, base_dir: str, anchor: str, currencies: list[str]):
+    """
+    Initialize the rate history store.
+
+    Parameters:
+    - base_dir: Directory of the history files.
+    - anchor: Currency every stored rate is quoted against.
+    - currencies: Currencies to store.
+    """
+
+    self.base_dir = base_dir
+    self.anchor = anchor
+    self.currencies = [currency for currency in currencies if currency != anchor]
+
+    self._lock = threading.Lock()
+    self._maps: dict[str, tuple[int, Optional[np.ndarray]]] = {}
+
+  def get_range(self, base: str, quote: str, start: date, end: date) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return the dates (days since epoch) and rates of a currency pair between two dates inclusive.
+    Pairs against the anchor currency are zero-copy views of the mapped files, other pairs are derived.
+    """
+
+    dates = self._map("dates.i32", np.int32)
+    if len(dates) == 0 or base == quote:
+      return dates[:0], np.empty(0, dtype=np.float64)
+
+    lo = int(np.searchsorted(dates, to_day(start), side="left"))
+    hi = int(np.searchsorted(dates, to_day(end), side="right"))
+    n = len(dates)
+
+    if base == self.anchor:
+      return dates[lo:hi], self._map(f"{quote}.f64", np.float64)[:n][lo:hi]
+
+    base_col = self._map(f"{base}.f64", np.float64)[:n][lo:hi]
+    if quote == self.anchor:
+      return dates[lo:hi], 1 / base_col
+
+    return dates[lo:hi], self._map(f"{quote}.f64", np.float64)[:n][lo:hi] / base_col
+
+  def get_last_date(self) -> Optional[date]:
+    """
+    Return the last stored date, or None if the store is empty.
+    """
+
+    dates = self._map("dates.i32", np.int32)
+    if len(dates) == 0:
+      return None
+
+    return from_day(int(dates[-1]))
+
+  def append(self, rows: dict[str, dict[str, float]]) -> int:
+    """
+    Append daily rates after the last stored date, without rewriting existing data.
+    The caller must hold the writer lock (see `sync`).
+
+    Parameters:
+    - rows: Rates against the anchor currency by date (YYYY-MM-DD).
+
+    Returns:
+    - Number of days appended.
+    """
+
+    os.makedirs(self.base_dir, exist_ok=True)
+
+    last_date = self.get_last_date()
+    days = sorted(
+      (to_day(date.fromisoformat(day)), rates) for day, rates in rows.items()
+      if last_date is None or date.fromisoformat(day) > last_date
+    )
+    if len(days) == 0:
+      return 0
+
+    n = len(self._map("dates.i32", np.int32))
+    for currency in self.currencies:
+      path = self._path(f"{currency}.f64")
+      column = np.array([rates.get(currency, np.nan) for _, rates in days], dtype=np.float64)
+
+      # Drop rows of a crashed append, and pad currencies added after the store was created
+      size = os.path.getsize(path) if os.path.exists(path) else 0
+      if size > n * 8:
+        os.truncate(path, n * 8)
+      elif size < n * 8:
+        column = np.concatenate((np.full(n - size // 8, np.nan), column))
+
+      with open(path, "ab") as f:
+        f.write(column.tobytes())
+
+    with open(self._path("dates.i32"), "ab") as f:
+      f.write(np.array([day for day, _ in days], dtype=np.int32).tobytes())
+
+    return len(days)
+
+  def sync(self, ffs: FrankFurtherServicer, start: date, end: date, chunk: timedelta = timedelta(days=90)) -> int:
+    """
+    Append the rates missing between the last stored date (or `start`) and `end` from upstream.
+    Only one process per host syncs at a time, others return immediately.
+
+    Returns:
+    - Number of days appended.
+    """
+
+    os.makedirs(self.base_dir, exist_ok=True)
+
+    with open(self._path(".lock"), "w") as lock_file:
+      try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+      except BlockingIOError:
+        return 0
+
+      try:
+        last_date = self.get_last_date()
+        chunk_start = start if last_date is None else last_date + timedelta(days=1)
+
+        appended = 0
+        while chunk_start <= end:
+          chunk_end = min(chunk_start + chunk, end)
+          series = ffs.get_currency_time_series(self.anchor, chunk_start.isoformat(), chunk_end.isoformat())
+          if series is None:
+            app_logger.error(f"Failed to sync rate history from {chunk_start} to {chunk_end}.")
+            break
+
+          appended += self.append(series.rates)
+          chunk_start = chunk_end + timedelta(days=1)
+
+        return appended
+      finally:
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+  def _map(self, name: str, dtype: type) -> np.ndarray:
+    """
+    Return a read-only memory map of a history file, remapped when the file grew.
+    """
+
+    path = self._path(name)
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+
+    with self._lock:
+      cached_size, mapped = self._maps.get(name, (-1, None))
+      if cached_size == size and mapped is not None:
+        return mapped
+
+      if size < np.dtype(dtype).itemsize:
+        mapped = np.empty(0, dtype=dtype)
+      else:
+        mapped = np.memmap(path, dtype=dtype, mode="r", shape=(size // np.dtype(dtype).itemsize,))
+
+      self._maps[name] = (size, mapped)
+      return mapped
+
+  def _path(self, name: str) -> str:
+    return os.path.join(self.base_dir, name)
+
+
+class RateHistorySyncer:
+  """
+  Background syncer of the rate history. Every worker runs it, the one holding the host history lock
+  backfills the store from upstream on start and appends new days at every interval,
+  so history requests only read what is stored.
+  """
+
+  def __init__(self, store: RateHistoryStore, ffs: FrankFurtherServicer, start: date, interval: timedelta):
+    """
+    Initialize the rate history syncer.
+
+    Parameters:
+    - store: Rate history store.
+    - ffs: Frankfurter client the rates are fetched from.
+    - start: First date of the history.
+    - interval: Time between two syncs.
+    """
+
+    self.store = store
+    self.ffs = ffs
+    self.start_date = start
+    self.interval = interval
+    self.stop_event = threading.Event()
+    self.thread: threading.Thread | None = None
+
+  def start(self):
+    """
+    Start the syncer in a daemon thread.
+    """
+
+    if self.thread is not None:
+      return
+
+    self.thread = threading.Thread(target=self._run, name="forex-history", daemon=True)
+    self.thread.start()
+
+  def stop(self):
+    """
+    Stop the syncer thread.
+    """
+
+    self.stop_event.set()
+
+  def sync_once(self, now: Optional[datetime] = None) -> int:
+    """
+    Append the days missing up to the latest ECB publication, unless the store already holds it.
+    Weekends, TARGET holidays and the hours before the daily publication have no new day to fetch.
+    Return the number of days appended.
+    """
+
+    published_date = latest_ecb_reference_date(now or datetime.now())
+    last_date = self.store.get_last_date()
+    if last_date is not None and last_date >= published_date:
+      return 0
+
+    return self.store.sync(self.ffs, self.start_date, published_date)
+
+  def _run(self):
+    """
+    Sync loop executed by the background thread.
+    """
+
+    while not self.stop_event.is_set():
+      try:
+        appended = self.sync_once()
+        if appended > 0:
+          app_logger.info(f"Forex history syncer appended {appended} days.")
+      except Exception as e:
+        app_logger.error(f"Forex history syncer failed. Error: {e}.")
+
+      self.stop_event.wait(self.interval.total_seconds())
+
+
+def to_day(d: date) -> int:
+  """
+  Convert a date to days since epoch.
+  """
+
+  return (d - EPOCH).days
+
+
+def from_day(day: int) -> date:
+  """
+  Convert days since epoch to a date.
+  """
+
+  return EPOCH + timedelta(days=day)
@@ -1,29 +1,43 @@
+import math
 import src.app.forex.schema as schema
 import src.common.error as common_error
 
+from datetime import date, datetime
+from flask import Response
 from flask_smorest import Blueprint
 from flask.views import MethodView
+from typing import Optional
 
+from src.app.forex.fragment import CacheFragment
 from src.app.forex.manager import ForexService 
-from src.common.response import make_response_body
+from src.common.response import (
+  is_not_modified, make_cache_headers, make_etag, make_not_modified_response, make_raw_response, make_response_body
+)
 from src.app.forex.constant import (
-  DEFAULT_CURRENCIES, DEFAULT_COMMODITIES, DEFAULT_CURRENCY_PAIRS, DEFAULT_COMMODITY_PAIRS
+  ASSETS_MAX_AGE, CURRENCY_ALIASES, DEFAULT_CURRENCIES, DEFAULT_COMMODITIES, DEFAULT_CURRENCY_PAIRS, DEFAULT_COMMODITY_PAIRS
 )
 
 
 def create_forex_blueprint(forex_service: ForexService) -> Blueprint:
   forex_bp = Blueprint("Forex", __name__, description="Operations on forex")
 
+  # The asset list only changes with a deployment
+  assets_etag = make_etag(DEFAULT_CURRENCIES, DEFAULT_CURRENCY_PAIRS, DEFAULT_COMMODITY_PAIRS)
+
   @forex_bp.route("/assets")
   class Asset(MethodView):
     @forex_bp.response(200, schema.BaseResponseSchema)
     def get(self):
+      headers = make_cache_headers(assets_etag, int(ASSETS_MAX_AGE.total_seconds()))
+      if is_not_modified(assets_etag):
+        return make_not_modified_response(headers)
+
       resp_data = {
         "currencies": DEFAULT_CURRENCIES,
         "currency_pairs": DEFAULT_CURRENCY_PAIRS,
         "commodity_pairs": DEFAULT_COMMODITY_PAIRS
       }
-      return make_response_body(200, "", resp_data), 200
+      return make_response_body(200, "", resp_data), 200, headers
     
 
   @forex_bp.route("/commodities")
@@ -37,9 +51,13 @@ def create_forex_blueprint(forex_service: ForexService) -> Blueprint:
         if symbols[i] not in DEFAULT_COMMODITIES:
           raise common_error.UnprocessableEntityError("Invalid symbol.")
 
-      prices = forex_service.get_commodity_price(symbols)
-      resp_data = {"prices": prices}
-      return make_response_body(200, "", resp_data), 200
+      # Cached prices are sent as stored, without decoding and re-encoding them
+      prices = forex_service.get_commodity_price_fragments(symbols)
+      etag, last_modified, headers = make_data_cache_headers(symbols, prices)
+      if is_not_modified(etag, last_modified):
+        return make_not_modified_response(headers)
+
+      return make_raw_response(200, {"prices": join_fragments(prices)}, headers)
     
 
   @forex_bp.route("/currencies")
@@ -52,10 +70,278 @@ def create_forex_blueprint(forex_service: ForexService) -> Blueprint:
         bases[i] = base.upper()
         if bases[i] not in DEFAULT_CURRENCIES:
           raise common_error.UnprocessableEntityError("Invalid currency.")
-      
-      rates = forex_service.get_currency_rate(bases)
-      resp_data = {"rates": rates}
+
+      quotes: list[str] = [quote.upper() for quote in params["quotes"]]
+      if any(quote not in DEFAULT_CURRENCIES for quote in quotes):
+        raise common_error.UnprocessableEntityError("Invalid currency.")
+
+      since: Optional[int] = params["since"]
+
+      # Cached rates are sent as stored, without decoding and re-encoding them,
+      # unless only some quotes are requested
+      rates = forex_service.get_currency_rate_fragments(bases)
+      etag, last_modified, headers = make_data_cache_headers(
+        [*bases, f"quotes={','.join(quotes)}", f"since={since}"], rates, len(bases)
+      )
+      if is_not_modified(etag, last_modified):
+        return make_not_modified_response(headers)
+
+      # Bases unchanged since the client's last update are left out
+      if since is not None:
+        rates = [fragment for fragment in rates if fragment.updated_at > since]
+      if len(quotes) > 0:
+        rates = [fragment.select("rates", quotes) for fragment in rates]
+
+      return make_raw_response(200, {"rates": join_fragments(rates)}, headers)
+
+  @forex_bp.route("/pairs")
+  class Pair(MethodView):
+    @forex_bp.arguments(schema.GetPairQuoteRequestSchema, location="query")
+    @forex_bp.response(200, schema.BaseResponseSchema)
+    def get(self, params: dict):
+      pairs: list[str] = params["pair"]
+      for i, pair in enumerate(pairs):
+        pairs[i] = pair.upper()
+        if not is_valid_pair(pairs[i]):
+          raise common_error.UnprocessableEntityError("Invalid pair.")
+
+      quotes, index = forex_service.get_pair_quotes(pairs)
+      resp_data = {"quotes": quotes, "updated_at": index.updated_at, "stale": index.stale}
+      return make_response_body(200, "", resp_data), 200
+
+  @forex_bp.route("/context")
+  class CalculatorContext(MethodView):
+    @forex_bp.arguments(schema.GetCalculatorContextRequestSchema, location="query")
+    @forex_bp.response(200, schema.BaseResponseSchema)
+    def get(self, params: dict):
+      pair: str = params["pair"].upper()
+      if not is_valid_pair(pair):
+        raise common_error.UnprocessableEntityError("Invalid pair.")
+
+      account: str = params["account"].upper()
+      if account not in DEFAULT_CURRENCIES:
+        raise common_error.UnprocessableEntityError("Invalid currency.")
+
+      resp_data = forex_service.get_calculator_context(pair, account)
       return make_response_body(200, "", resp_data), 200
 
+  @forex_bp.route("/pip-values")
+  class PipValue(MethodView):
+    @forex_bp.arguments(schema.GetPipValueRequestSchema, location="query")
+    @forex_bp.response(200, schema.BaseResponseSchema)
+    def get(self, params: dict):
+      matrix = forex_service.get_pip_value_matrix()
+
+      # Every pair, account currency and lot type unless some are requested
+      pairs: list[str] = [pair.upper() for pair in params["pair"]] or matrix.pairs
+      if any(pair not in matrix.pairs for pair in pairs):
+        raise common_error.UnprocessableEntityError("Invalid pair.")
+
+      accounts: list[str] = [account.upper() for account in params["account"]] or matrix.accounts
+      if any(account not in matrix.accounts for account in accounts):
+        raise common_error.UnprocessableEntityError("Invalid currency.")
+
+      lots: list[str] = params["lot"] or matrix.lots
+
+      etag = make_etag(matrix.version, matrix.stale, *pairs, *accounts, *lots)
+      max_age = 0 if matrix.stale else matrix.expired_at - int(datetime.now().timestamp())
+      headers = make_cache_headers(etag, max_age)
+      if is_not_modified(etag):
+        return make_not_modified_response(headers)
+
+      values = matrix.select(pairs, accounts, lots)
+      resp_data = {
+        "pairs": pairs,
+        "accounts": accounts,
+        "lots": lots,
+        "pip_values": [
+          [[None if math.isnan(value) else value for value in row] for row in pair_values]
+          for pair_values in values.tolist()
+        ],
+        "updated_at": matrix.updated_at,
+        "stale": matrix.stale
+      }
+      return make_response_body(200, "", resp_data), 200, headers
+
+  @forex_bp.route("/position-size")
+  class PositionSize(MethodView):
+    @forex_bp.arguments(schema.CalculatePositionSizeRequestSchema)
+    @forex_bp.response(200, schema.BaseResponseSchema)
+    def post(self, params: dict):
+      account: str = params.pop("account").upper()
+      if account not in DEFAULT_CURRENCIES:
+        raise common_error.UnprocessableEntityError("Invalid currency.")
+
+      pairs: list[str] = params["pair"]
+      for i, pair in enumerate(pairs):
+        pairs[i] = pair.upper()
+        if not is_valid_pair(pairs[i]):
+          raise common_error.UnprocessableEntityError("Invalid pair.")
+
+      if get_batch_size(params) is None:
+        raise common_error.UnprocessableEntityError("Invalid scenario count.")
+
+      result, index = forex_service.calculate_position_sizes(account, params)
+      resp_data = {
+        "account": account,
+        "results": {
+          name: [None if math.isnan(value) else value for value in values.tolist()]
+          for name, values in vars(result).items()
+        },
+        "updated_at": index.updated_at,
+        "stale": index.stale
+      }
+      return make_response_body(200, "", resp_data), 200
+
+  @forex_bp.route("/portfolio")
+  class Portfolio(MethodView):
+    @forex_bp.arguments(schema.CalculatePortfolioRequestSchema)
+    @forex_bp.response(200, schema.BaseResponseSchema)
+    def post(self, params: dict):
+      account: str = params.pop("account").upper()
+      if account not in DEFAULT_CURRENCIES:
+        raise common_error.UnprocessableEntityError("Invalid currency.")
+
+      pairs: list[str] = params["pair"]
+      for i, pair in enumerate(pairs):
+        pairs[i] = pair.upper()
+        if not is_valid_pair(pairs[i]):
+          raise common_error.UnprocessableEntityError("Invalid pair.")
+
+      balance: Optional[float] = params.pop("balance")
+      if get_batch_size(params) is None:
+        raise common_error.UnprocessableEntityError("Invalid position count.")
+
+      result, index = forex_service.calculate_portfolio(account, params, balance)
+      resp_data = {
+        "account": account,
+        "positions": {
+          name: [None if math.isnan(value) else value for value in getattr(result, name).tolist()]
+          for name in ("position_size", "notional", "margin", "profit_loss")
+        },
+        "exposures": [
+          {"asset": asset, "exposure": exposure, "value": value}
+          for asset, exposure, value in zip(result.assets, result.exposure.tolist(), result.exposure_value.tolist())
+          if exposure != 0
+        ],
+        "total_margin": result.total_margin,
+        "gross_exposure": result.gross_exposure,
+        "total_profit_loss": result.total_profit_loss,
+        "equity": result.equity,
+        "free_margin": result.free_margin,
+        "margin_level": result.margin_level,
+        "unpriced": result.unpriced,
+        "updated_at": index.updated_at,
+        "stale": index.stale
+      }
+      return make_response_body(200, "", resp_data), 200
+
+  @forex_bp.route("/history")
+  class History(MethodView):
+    @forex_bp.arguments(schema.GetRateHistoryRequestSchema, location="query")
+    @forex_bp.response(200, schema.BaseResponseSchema)
+    def get(self, params: dict):
+      pair: str = params["pair"].upper()
+      assets = pair.split("/")
+      if len(assets) != 2 or assets[0] not in DEFAULT_CURRENCIES or assets[1] not in DEFAULT_CURRENCIES:
+        raise common_error.UnprocessableEntityError("Invalid pair.")
+
+      start: date = params["start"]
+      end: date = params["end"] or date.today()
+      if start > end:
+        raise common_error.UnprocessableEntityError("Invalid date range.")
+
+      dates, rates = forex_service.get_rate_history(assets[0], assets[1], start, end)
+      resp_data = {"pair": pair, "dates": dates, "rates": rates}
+      return make_response_body(200, "", resp_data), 200
+
+  @forex_bp.route("/stream")
+  class Stream(MethodView):
+    @forex_bp.arguments(schema.GetStreamRequestSchema, location="query")
+    @forex_bp.response(200, content_type="text/event-stream")
+    def get(self, params: dict):
+      symbols: list[str] = [symbol.upper() for symbol in params["symbol"]]
+      bases: list[str] = [base.upper() for base in params["base"]]
+      if len(symbols) == 0 and len(bases) == 0:
+        symbols = list(DEFAULT_COMMODITIES)
+
+      if any(symbol not in DEFAULT_COMMODITIES for symbol in symbols):
+        raise common_error.UnprocessableEntityError("Invalid symbol.")
+      if any(base not in DEFAULT_CURRENCIES for base in bases):
+        raise common_error.UnprocessableEntityError("Invalid currency.")
+
+      events = forex_service.stream_updates(symbols, bases)
+      if events is None:
+        raise common_error.TooManyRequestError("Too many stream clients, please retry later.")
+
+      return Response(
+        events,
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+      )
+
   return forex_bp
-  
\ No newline at end of file
+
+
+def make_data_cache_headers(
+  ids: list[str],
+  fragments: list[CacheFragment],
+  expected: Optional[int] = None
+) -> tuple[str, int, dict[str, str]]:
+  """
+  Derive the cache validators of a response from the cached data it is built from.
+  The response changes only when the update time of any item changes, and is fresh until the first item expires.
+
+  Parameters:
+  - ids: Requested bases or symbols, and any other parameter the response depends on.
+  - fragments: Cached rate or price data found.
+  - expected: Number of items requested, defaults to the number of ids.
+
+  Returns:
+  - The entity tag, last modified time and cache headers.
+  """
+
+  etag = make_etag(*ids, *(f"{fragment.updated_at}:{fragment.stale}" for fragment in fragments))
+  last_modified = max((fragment.updated_at for fragment in fragments), default=0)
+
+  # Stale or missing data must be revalidated on every request
+  max_age = 0
+  if len(fragments) == (expected if expected is not None else len(ids)) and not any(fragment.stale for fragment in fragments):
+    max_age = min(fragment.expired_at for fragment in fragments) - int(datetime.now().timestamp())
+
+  return etag, last_modified, make_cache_headers(etag, max_age, last_modified)
+
+
+def is_valid_pair(pair: str) -> bool:
+  """
+  Check that a pair ("BASE/QUOTE") is a currency or commodity quoted in a currency.
+  """
+
+  assets = pair.split("/")
+  currencies = DEFAULT_CURRENCIES.keys() | CURRENCY_ALIASES.keys()
+  return (
+    len(assets) == 2 and
+    (assets[0] in currencies or assets[0] in DEFAULT_COMMODITIES) and
+    assets[1] in currencies
+  )
+
+
+def get_batch_size(params: dict[str, Optional[list]]) -> Optional[int]:
+  """
+  Return the size of a batch request whose fields hold one value per item, or a single value shared by all.
+  Return None if the fields disagree on the size.
+  """
+
+  size = max(len(values) for values in params.values() if values is not None)
+  if any(values is not None and len(values) not in (1, size) for values in params.values()):
+    return None
+
+  return size
+
+
+def join_fragments(fragments: list[CacheFragment]) -> bytes:
+  """
+  Serialize fragments into a JSON array, without decoding them.
+  """
+
+  return b"[" + b", ".join(fragment.to_json() for fragment in fragments) + b"]"
@@ -0,0 +1,19 @@
+import src.app.forex.schema as schema
+
+from flask.views import MethodView
+from flask_smorest import Blueprint
+
+from src.app.forex.metrics import ForexMetricsReader
+from src.common.response import make_response_body
+
+
+def create_internal_forex_blueprint(metrics_reader: ForexMetricsReader) -> Blueprint:
+  forex_bp = Blueprint("Forex", __name__, description="Operations on forex")
+
+  @forex_bp.route("/metrics")
+  class Metric(MethodView):
+    @forex_bp.response(200, schema.BaseResponseSchema)
+    def get(self):
+      return make_response_body(200, "", metrics_reader.get_metrics()), 200
+
+  return forex_bp
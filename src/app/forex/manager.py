@@ -1,44 +1,323 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
 
+from datetime import date, datetime
+from numpy.typing import ArrayLike
+from typing import Optional
+
+from src.app.forex.calculator import build_calculator_context, get_context_pairs
+from src.app.forex.constant import (
+  CURRENCY_ALIASES, DEFAULT_COMMODITIES, DEFAULT_COMMODITY_PAIRS, DEFAULT_CURRENCIES, DEFAULT_CURRENCY_PAIRS, FEE_TYPES,
+  PROFIT_GOAL_TYPES, STREAM_KEEPALIVE
+)
+from src.app.forex.fragment import CacheFragment
+from src.app.forex.history import RateHistoryStore, from_day
+from src.app.forex.model import PortfolioInput, PortfolioResult, PositionSizeInput, PositionSizeResult
+from src.app.forex.pair_index import PairIndex, build_pair_index
+from src.app.forex.pip_value import PipValueMatrix, build_pip_value_matrix, get_quote_rate_pairs
+from src.app.forex.portfolio import calculate_portfolio
+from src.app.forex.position_size import calculate_position_size
 from src.app.forex.repository import Repository
+from src.app.forex.shared_table import SharedRateTable
+from src.app.forex.stream import PRICE_EVENT, RATE_EVENT, EventStream, ForexStreamHub, format_event
 from src.config import Config
 from src.extensions import app_logger
 
 
 class ForexService:
-  def __init__(self, config: Config, repo: Repository):
+  def __init__(self, config: Config, repo: Repository, history: RateHistoryStore, stream_hub: ForexStreamHub,
+    rate_table: SharedRateTable):
 
     self.config = config
     self.repo = repo
+    self.history = history
+    self.stream_hub = stream_hub
+    self.rate_table = rate_table
+    self.pair_index: Optional[PairIndex] = None
+    self.pip_value_matrix: Optional[PipValueMatrix] = None
 
   def get_currency_rate(self, base_currencies: list[str]) -> list[dict]:
     resp: list[dict] = []
- 
-    with ThreadPoolExecutor() as executor:
-      futures = { executor.submit(self.repo.currency.get_currency_rate, base): base 
-                 for base in base_currencies }
-
-      for future in as_completed(futures):
-        rates = future.result()
-        if rates is None:
-          app_logger.error(f"Failed to get currency rates, base: {futures[future]}")
-          continue
-        resp.append(rates)
-    
+
+    for base, rates in zip(base_currencies, self.repo.currency.get_currency_rates(base_currencies)):
+      if rates is None:
+        app_logger.error(f"Failed to get currency rates, base: {base}")
+        continue
+      resp.append(rates)
+
     return resp
 
   def get_commodity_price(self, symbols: list[str]) -> list[dict]:
     resp: list[dict] = []
 
-    with ThreadPoolExecutor() as executor:
-      futures = { executor.submit(self.repo.currency.get_commodity_price, symbol): symbol for symbol in symbols}
-      
-      for future in as_completed(futures):
-        price = future.result()
-        if price is None:
-          app_logger.error(f"Failed to get commodity price, symbols: {futures[future]}")
-          continue
-        resp.append(price)
-    
+    for symbol, price in zip(symbols, self.repo.currency.get_commodity_prices(symbols)):
+      if price is None:
+        app_logger.error(f"Failed to get commodity price, symbols: {symbol}")
+        continue
+      resp.append(price)
+
+    return resp
+
+  def get_currency_rate_fragments(self, base_currencies: list[str]) -> list[CacheFragment]:
+    """
+    Get currency rates of multiple base currencies as serialized fragments, to be sent without decoding.
+    """
+
+    resp: list[CacheFragment] = []
+
+    for base, fragment in zip(base_currencies, self.repo.currency.get_currency_rate_fragments(base_currencies)):
+      if fragment is None:
+        app_logger.error(f"Failed to get currency rates, base: {base}")
+        continue
+      resp.append(fragment)
+
+    return resp
+
+  def get_commodity_price_fragments(self, symbols: list[str]) -> list[CacheFragment]:
+    """
+    Get prices of multiple commodities as serialized fragments, to be sent without decoding.
+    """
+
+    resp: list[CacheFragment] = []
+
+    for symbol, fragment in zip(symbols, self.repo.currency.get_commodity_price_fragments(symbols)):
+      if fragment is None:
+        app_logger.error(f"Failed to get commodity price, symbols: {symbol}")
+        continue
+      resp.append(fragment)
+
     return resp
-  
\ No newline at end of file
+
+  def get_pair_quotes(self, pairs: list[str]) -> tuple[list[dict], PairIndex]:
+    """
+    Get quotes of multiple currency or commodity pairs.
+    Return the quotes found and the index they come from.
+    """
+
+    index = self._read_pair_index(pairs)
+
+    resp: list[dict] = []
+    for pair in pairs:
+      rate = index.get(pair)
+      if rate is None:
+        app_logger.error(f"Failed to get pair quote, pair: {pair}")
+        continue
+      resp.append({"pair": pair, "rate": rate})
+
+    return resp, index
+
+  def get_calculator_context(self, pair: str, account: str) -> dict:
+    """
+    Get the rates, pip decimal and contract size the forex calculators need for a pair and an account currency,
+    read together from one version of the pair index.
+    """
+
+    index = self._read_pair_index(get_context_pairs(pair, account))
+    return build_calculator_context(pair, account, index)
+
+  def get_pip_value_matrix(self) -> PipValueMatrix:
+    """
+    Get the pip values of every listed pair in every account currency for every lot type.
+    The matrix is recomputed only when the rates it depends on change.
+    """
+
+    pairs = DEFAULT_CURRENCY_PAIRS + DEFAULT_COMMODITY_PAIRS
+    accounts = list(DEFAULT_CURRENCIES)
+    index = self._read_pair_index(get_quote_rate_pairs(pairs, accounts))
+
+    matrix = build_pip_value_matrix(pairs, accounts, index, self.pip_value_matrix)
+    self.pip_value_matrix = matrix
+    return matrix
+
+  def calculate_position_sizes(self, account: str, scenarios: dict[str, list]) -> tuple[PositionSizeResult, PairIndex]:
+    """
+    Size the positions of a batch of scenarios for an account currency, with the rates of one pair index.
+
+    Parameters:
+    - account: Account currency.
+    - scenarios: Request fields by name, each holding one value per scenario or a single value shared by all.
+      Pip decimal and contract size default to the pair specs.
+
+    Returns:
+    - The results, one value per scenario, and the index the rates come from.
+    """
+
+    pairs: list[str] = scenarios["pair"]
+    size = max(len(values) for values in scenarios.values() if values is not None)
+    pairs = pairs * size if len(pairs) == 1 else pairs
+
+    context_pairs = [context_pair for pair in dict.fromkeys(pairs) for context_pair in get_context_pairs(pair, account)]
+    index = self._read_pair_index(list(dict.fromkeys(context_pairs)))
+    contexts = {pair: build_calculator_context(pair, account, index) for pair in dict.fromkeys(pairs)}
+
+    def get_context_column(name: str) -> np.ndarray:
+      # Unavailable rates are NaN, and so are the results depending on them
+      return np.array([np.nan if contexts[pair][name] is None else contexts[pair][name] for pair in pairs])
+
+    scenario_input = PositionSizeInput(
+      capital=get_column(scenarios["capital"], size),
+      risk=get_column(scenarios["risk"], size),
+      stop_pip=get_column(scenarios["stop_pip"], size),
+      pip_decimal=get_column(scenarios["pip_decimal"] or get_context_column("pip_decimal"), size),
+      contract_size=get_column(scenarios["contract_size"] or get_context_column("contract_size"), size),
+      base_rate=get_context_column("base_rate"),
+      quote_rate=get_context_column("quote_rate"),
+      leverage=get_column(scenarios["leverage"], size),
+      lot_type=get_column(scenarios["lot_type"], size, np.int64),
+      fee_type=get_column([FEE_TYPES[fee_type] for fee_type in scenarios["fee_type"]], size, np.int64),
+      commission=get_column(scenarios["commission"], size),
+      swap=get_column(scenarios["swap"], size),
+      period=get_column(scenarios["period"], size),
+      precision=get_column(scenarios["precision"], size, np.int64),
+      profit_goal_type=get_column([PROFIT_GOAL_TYPES[goal] for goal in scenarios["profit_goal_type"]], size, np.int64),
+      profit_goal=get_column(scenarios["profit_goal"], size)
+    )
+
+    return calculate_position_size(scenario_input), index
+
+  def calculate_portfolio(
+    self, account: str, positions: dict[str, list], balance: Optional[float]
+  ) -> tuple[PortfolioResult, PairIndex]:
+    """
+    Aggregate the margin, exposure and floating profit or loss of open positions for an account currency,
+    with the rates of one pair index.
+
+    Parameters:
+    - account: Account currency.
+    - positions: Request fields by name, each holding one value per position or a single value shared by all.
+      Contract size defaults to the pair specs, entry price to the current price.
+    - balance: Account balance, to derive the equity and margin level.
+
+    Returns:
+    - The results, per position and per asset, and the index the rates come from.
+    """
+
+    pairs: list[str] = positions["pair"]
+    size = max(len(values) for values in positions.values() if values is not None)
+    pairs = pairs * size if len(pairs) == 1 else pairs
+
+    context_pairs = [context_pair for pair in dict.fromkeys(pairs) for context_pair in get_context_pairs(pair, account)]
+    index = self._read_pair_index(list(dict.fromkeys(context_pairs)))
+    contexts = {pair: build_calculator_context(pair, account, index) for pair in dict.fromkeys(pairs)}
+
+    # Account currency value of one unit of every asset, from the contexts of the pairs holding it
+    asset_rates: dict[str, Optional[float]] = {}
+    for pair, context in contexts.items():
+      base, quote = pair.split("/")
+      asset_rates.setdefault(base, context["base_rate"])
+      asset_rates.setdefault(quote, context["quote_rate"])
+
+    assets = list(asset_rates)
+    unique_pairs, pair_positions = np.unique(np.array(pairs), return_inverse=True)
+    base_positions = np.array([assets.index(pair.split("/")[0]) for pair in unique_pairs])[pair_positions]
+    quote_positions = np.array([assets.index(pair.split("/")[1]) for pair in unique_pairs])[pair_positions]
+
+    price = np.array([np.nan if contexts[pair]["price"] is None else contexts[pair]["price"] for pair in unique_pairs])
+    contract_sizes = np.array([contexts[pair]["contract_size"] for pair in unique_pairs])
+
+    portfolio_input = PortfolioInput(
+      assets=assets,
+      asset_rates=np.array([np.nan if rate is None else rate for rate in asset_rates.values()], dtype=np.float64),
+      base=base_positions,
+      quote=quote_positions,
+      price=price[pair_positions],
+      is_long=get_column([side == "long" for side in positions["side"]], size, bool),
+      lots=get_column(positions["lots"], size),
+      contract_size=get_column(positions["contract_size"] or contract_sizes[pair_positions], size),
+      leverage=get_column(positions["leverage"], size),
+      entry_price=get_column(positions["entry_price"] or price[pair_positions], size),
+      balance=balance
+    )
+
+    return calculate_portfolio(portfolio_input), index
+
+  def get_rate_history(self, base: str, quote: str, start: date, end: date) -> tuple[list[str], list[float]]:
+    """
+    Get the daily rates of a currency pair between two dates inclusive.
+    Return the dates (YYYY-MM-DD) and rates, days without a rate are skipped.
+    Only stored days are returned, the history is synced in the background.
+    """
+
+    days, rates = self.history.get_range(base, quote, start, end)
+    valid = ~np.isnan(rates)
+    return [from_day(int(day)).isoformat() for day in days[valid]], rates[valid].round(6).tolist()
+
+  def stream_updates(self, symbols: list[str], bases: list[str]) -> Optional[EventStream]:
+    """
+    Stream the prices of the commodities and the rates of the base currencies as server-sent events.
+    The current data is sent first, followed by every update.
+    Return None if this worker cannot accept more stream clients.
+    """
+
+    # Subscribe before reading the current data, so no update is missed in between
+    topics = {f"{PRICE_EVENT}:{symbol}" for symbol in symbols} | {f"{RATE_EVENT}:{base}" for base in bases}
+    client = self.stream_hub.subscribe(topics)
+    if client is None:
+      return None
+
+    initial_events: list[bytes] = []
+    for fragment in self.get_commodity_price_fragments(symbols):
+      initial_events.append(format_event(PRICE_EVENT, fragment.to_json()))
+    for fragment in self.get_currency_rate_fragments(bases):
+      initial_events.append(format_event(RATE_EVENT, fragment.to_json()))
+
+    return EventStream(self.stream_hub, client, initial_events, STREAM_KEEPALIVE)
+
+  def get_metrics(self) -> dict:
+    """
+    Return the forex metrics of this worker, published to the internal app by `ForexMetricsPublisher`.
+    """
+
+    return {
+      "l1_cache": self.repo.currency.get_cache_stats(),
+      "pools": self.repo.currency.get_pool_stats(),
+      "upstreams": self.repo.currency.get_upstream_stats(),
+      "quotas": self.repo.currency.get_quota_stats(),
+      "stream": self.stream_hub.stats(),
+      "rate_table": self.rate_table.stats()
+    }
+
+  def _read_pair_index(self, pairs: list[str]) -> PairIndex:
+    """
+    Read quotes of multiple pairs from the shared rate table of the host,
+    falling back to the pair index of this worker until the table is written.
+    """
+
+    index = self.rate_table.read(pairs)
+    if index is None:
+      index = self._get_pair_index()
+
+    return index
+
+  def _get_pair_index(self) -> PairIndex:
+    """
+    Return the pair index, rebuilding it once any of its source data expired.
+    """
+
+    index = self.pair_index
+    if index is not None and not index.stale and index.expired_at > datetime.now().timestamp():
+      return index
+
+    index = self.load_pair_index()
+    self.pair_index = index
+    return index
+
+  def load_pair_index(self) -> PairIndex:
+    """
+    Build the pair index from the cached currency rates and commodity prices.
+    """
+
+    rate_dicts = self.repo.currency.get_currency_rates(list(DEFAULT_CURRENCIES))
+    price_dicts = self.repo.currency.get_commodity_prices(list(DEFAULT_COMMODITIES))
+    return build_pair_index(
+      [rate_dict for rate_dict in rate_dicts if rate_dict is not None],
+      [price_dict for price_dict in price_dicts if price_dict is not None],
+      CURRENCY_ALIASES
+    )
+
+
+def get_column(values: ArrayLike, size: int, dtype: type = np.float64) -> np.ndarray:
+  """
+  Broadcast request values, one per row or a single one shared by all, to a column of some size.
+  """
+
+  return np.broadcast_to(np.asarray(values, dtype=dtype), size)
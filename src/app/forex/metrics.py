@@ -0,0 +1,208 @@
+import os
+import socket
+import threading
+import time
+import src.app.forex.constant as constant
+
+from datetime import timedelta
+from redis.client import Pipeline
+from typing import Any, Callable
+
+from src.extensions import app_logger
+from src.service.quota import QuotaManager
+from src.service.redis import RedisServicer
+
+
+# Stat fields growing for the lifetime of a worker, summed over every worker that ever ran
+COUNTER_FIELDS = frozenset(("hits", "misses", "completed", "rejected", "failed_reads"))
+# Stat fields describing the current state of a worker, summed over the running workers
+GAUGE_FIELDS = frozenset(("size", "max_size", "max_workers", "queued", "active", "clients", "max_clients", "writer"))
+
+
+class ForexMetricsPublisher:
+  """
+  Background publisher of the forex metrics of a worker to Redis, so the internal app can report
+  the metrics of every worker of every node.
+
+  Counters are added to a shared hash as the increase since the last publication, gauges replace
+  the hash of the worker, which expires once the worker stops publishing.
+  """
+
+  def __init__(self, rdb: RedisServicer, collect: Callable[[], dict], interval: timedelta, worker_ttl: timedelta):
+    """
+    Initialize the metrics publisher.
+
+    Parameters:
+    - rdb: Redis client the metrics are published to.
+    - collect: Function returning the metrics of this worker.
+    - interval: Time between two publications.
+    - worker_ttl: Time after its last publication the gauges of the worker expire.
+    """
+
+    self.rdb = rdb
+    self.collect = collect
+    self.interval = interval
+    self.worker_ttl = worker_ttl
+    self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    self.published: dict[str, int] = {}
+    self.stop_event = threading.Event()
+    self.thread: threading.Thread | None = None
+
+  def start(self):
+    """
+    Start the publisher in a daemon thread.
+    """
+
+    if self.thread is not None:
+      return
+
+    self.thread = threading.Thread(target=self._run, name="forex-metrics", daemon=True)
+    self.thread.start()
+
+  def stop(self):
+    """
+    Stop the publisher thread.
+    """
+
+    self.stop_event.set()
+
+  def publish_once(self):
+    """
+    Publish the counters increase since the last publication and the current gauges of this worker.
+    """
+
+    counters, gauges = split_metrics(self.collect())
+    increases = {field: value - self.published.get(field, 0) for field, value in counters.items()}
+    worker_key = f"{constant.METRICS_WORKER_KEY_PREFIX}{self.worker_id}"
+    ttl = int(self.worker_ttl.total_seconds())
+
+    def fn(pipe: Pipeline) -> None:
+      for field, increase in increases.items():
+        pipe.hincrby(constant.METRICS_COUNTERS_KEY, field, increase)
+      pipe.delete(worker_key)
+      if len(gauges) > 0:
+        pipe.hset(worker_key, mapping=gauges)
+        pipe.expire(worker_key, ttl)
+      pipe.zadd(constant.METRICS_WORKERS_KEY, {self.worker_id: time.time()})
+
+    self.rdb.exec_with_pipeline(fn)
+    # Only once published, so a failed publication is added to the next one
+    self.published = counters
+
+  def _run(self):
+    """
+    Publish loop executed by the background thread.
+    """
+
+    while not self.stop_event.is_set():
+      try:
+        self.publish_once()
+      except Exception as e:
+        app_logger.error(f"Forex metrics publisher failed. Error: {e}.")
+
+      self.stop_event.wait(self.interval.total_seconds())
+
+
+class ForexMetricsReader:
+  """
+  Reader of the forex metrics published by the workers, it runs no background worker of its own.
+  """
+
+  def __init__(self, rdb: RedisServicer, quotas: dict[str, QuotaManager], worker_ttl: timedelta):
+    """
+    Initialize the metrics reader.
+
+    Parameters:
+    - rdb: Redis client the metrics are published to.
+    - quotas: Call budget of each metered upstream, read from the shared ledger.
+    - worker_ttl: Time after its last publication a worker is left out of the metrics.
+    """
+
+    self.rdb = rdb
+    self.quotas = quotas
+    self.worker_ttl = worker_ttl
+
+  def get_metrics(self) -> dict:
+    """
+    Return the forex metrics summed over the workers of every node.
+    """
+
+    def fn(pipe: Pipeline) -> None:
+      pipe.zremrangebyscore(constant.METRICS_WORKERS_KEY, "-inf", time.time() - self.worker_ttl.total_seconds())
+      pipe.zrange(constant.METRICS_WORKERS_KEY, 0, -1)
+      pipe.hgetall(constant.METRICS_COUNTERS_KEY)
+
+    _, worker_ids, counters = self.rdb.exec_with_pipeline(fn)
+
+    def gauges_fn(pipe: Pipeline) -> None:
+      for worker_id in worker_ids:
+        pipe.hgetall(f"{constant.METRICS_WORKER_KEY_PREFIX}{worker_id.decode()}")
+
+    worker_gauges = self.rdb.exec_with_pipeline(gauges_fn) if len(worker_ids) > 0 else []
+    metrics = merge_metrics(
+      {field.decode(): int(value) for field, value in counters.items()},
+      [{field.decode(): int(value) for field, value in gauges.items()} for gauges in worker_gauges if gauges]
+    )
+
+    # The budget left is shared in Redis already, only the rejected calls are counted by the workers
+    upstream_quotas: dict[str, Any] = metrics.get("quotas", {})
+    metrics["quotas"] = {
+      name: {**quota.stats(), "rejected": upstream_quotas.get(name, {}).get("rejected", 0)}
+      for name, quota in self.quotas.items()
+    }
+
+    return metrics
+
+
+def split_metrics(metrics: dict) -> tuple[dict[str, int], dict[str, int]]:
+  """
+  Flatten the metrics of a worker into counters and gauges by dotted path.
+  A circuit state becomes a gauge of the workers in that state, other fields are left out.
+
+  Returns:
+  - The counters and the gauges of the worker.
+  """
+
+  counters: dict[str, int] = {}
+  gauges: dict[str, int] = {}
+
+  def visit(values: dict, prefix: str):
+    for name, value in values.items():
+      path = f"{prefix}{name}"
+      if isinstance(value, dict):
+        visit(value, f"{path}.")
+      elif name in COUNTER_FIELDS:
+        counters[path] = int(value)
+      elif name in GAUGE_FIELDS:
+        gauges[path] = int(value)
+      elif name == "state":
+        gauges[f"{prefix}{value}"] = 1
+
+  visit(metrics, "")
+  return counters, gauges
+
+
+def merge_metrics(counters: dict[str, int], worker_gauges: list[dict[str, int]]) -> dict:
+  """
+  Sum the gauges of the running workers with the counters into nested metrics, the inverse of `split_metrics`.
+  The number of running workers and the L1 cache hit ratio are added.
+  """
+
+  totals = dict(counters)
+  for gauges in worker_gauges:
+    for path, value in gauges.items():
+      totals[path] = totals.get(path, 0) + value
+
+  metrics: dict[str, Any] = {"workers": len(worker_gauges)}
+  for path, value in sorted(totals.items()):
+    *parents, name = path.split(".")
+    node = metrics
+    for parent in parents:
+      node = node.setdefault(parent, {})
+    node[name] = value
+
+  l1_cache = metrics.setdefault("l1_cache", {})
+  lookups = l1_cache.get("hits", 0) + l1_cache.get("misses", 0)
+  l1_cache["hit_ratio"] = round(l1_cache.get("hits", 0) / lookups, 4) if lookups > 0 else 0
+
+  return metrics
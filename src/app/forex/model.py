@@ -1,4 +1,7 @@
+import numpy as np
+
 from dataclasses import dataclass
+from typing import Optional
 
 
 @dataclass
@@ -17,4 +20,76 @@ class CurrencyCache:
   rates: dict[str, float]
   updated_at: int
   expired_at: int
-  
\ No newline at end of file
+  
+
+@dataclass
+class PairSpec:
+  pip_decimal: float
+  contract_size: int
+
+@dataclass
+class PositionSizeInput:
+  capital: np.ndarray # Portfolio capital in account currency
+  risk: np.ndarray # Max portfolio risk in percent
+  stop_pip: np.ndarray
+  pip_decimal: np.ndarray
+  contract_size: np.ndarray
+  base_rate: np.ndarray # Account currency value of one unit of base
+  quote_rate: np.ndarray # Account currency value of one unit of quote
+  leverage: np.ndarray
+  lot_type: np.ndarray # Decimals of the lot size: 0 standard, 1 mini, 2 micro, 3 nano lot
+  fee_type: np.ndarray
+  commission: np.ndarray # Commission per lot or per 100k units, depending on the fee type
+  swap: np.ndarray # Swap per lot per day, in points
+  period: np.ndarray # Days the position is held
+  precision: np.ndarray # Decimals of fee and swap amounts
+  profit_goal_type: np.ndarray
+  profit_goal: np.ndarray # Profit target in pips, or min portfolio profit in percent
+
+@dataclass
+class PositionSizeResult:
+  lot_size: np.ndarray
+  position_size: np.ndarray
+  margin_to_hold: np.ndarray
+  risk_amount: np.ndarray
+  portfolio_risk: np.ndarray
+  entry_fee: np.ndarray
+  stop_fee: np.ndarray
+  swap_value: np.ndarray
+  profit_pip: np.ndarray
+  profit_amount: np.ndarray
+  profit_fee: np.ndarray
+  portfolio_profit: np.ndarray
+  risk_reward_ratio: np.ndarray
+  break_even_win_rate: np.ndarray
+
+@dataclass
+class PortfolioInput:
+  assets: list[str] # Distinct currencies and commodities of the positions
+  asset_rates: np.ndarray # Account currency value of one unit of each asset
+  base: np.ndarray # Position of the base asset of each pair in `assets`
+  quote: np.ndarray # Position of the quote asset of each pair in `assets`
+  price: np.ndarray # Current price of each pair
+  is_long: np.ndarray
+  lots: np.ndarray
+  contract_size: np.ndarray
+  leverage: np.ndarray
+  entry_price: np.ndarray
+  balance: Optional[float]
+
+@dataclass
+class PortfolioResult:
+  assets: list[str]
+  position_size: np.ndarray
+  notional: np.ndarray # Position value in account currency
+  margin: np.ndarray
+  profit_loss: np.ndarray # Floating profit or loss at the current price
+  exposure: np.ndarray # Net units held of each asset, long minus short
+  exposure_value: np.ndarray # Net exposure of each asset in account currency
+  total_margin: float
+  gross_exposure: float # Sum of position values in account currency
+  total_profit_loss: float
+  equity: Optional[float] # Balance plus floating profit or loss
+  free_margin: Optional[float]
+  margin_level: Optional[float] # Equity over used margin in percent
+  unpriced: int # Positions left out of the totals for lack of rates
@@ -0,0 +1,68 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class PairIndex:
+  """
+  Data class representing precomputed quotes of every currency and commodity pair, keyed by "BASE/QUOTE".
+  """
+
+  quotes: dict[str, float]
+  updated_at: int # Oldest update time of the source data
+  expired_at: int # Earliest expiry time of the source data
+  stale: bool # Whether any source data was served stale
+
+  def get(self, pair: str) -> Optional[float]:
+    """
+    Return the quote of a pair, or None if unavailable.
+    """
+
+    return self.quotes.get(pair)
+
+
+def build_pair_index(rate_dicts: list[dict], price_dicts: list[dict], aliases: dict[str, str]) -> PairIndex:
+  """
+  Build the pair index from currency rates of every base and commodity USD prices.
+  Commodity pairs are derived by converting the USD price with the USD rates.
+
+  Parameters:
+  - rate_dicts: Currency rates data by base currency.
+  - price_dicts: Commodity price data, quoted in USD.
+  - aliases: Currencies quoted with the rates of another currency, e.g. CNH with CNY.
+
+  Returns:
+  - The pair index.
+  """
+
+  quotes: dict[str, float] = {}
+  usd_rates: dict[str, float] = {}
+
+  for rate_dict in rate_dicts:
+    base = rate_dict["base"]
+    for quote, rate in rate_dict["rates"].items():
+      quotes[f"{base}/{quote}"] = rate
+
+    if base == "USD":
+      usd_rates = rate_dict["rates"]
+
+  for price_dict in price_dicts:
+    symbol = price_dict["symbol"]
+    quotes[f"{symbol}/USD"] = price_dict["price"]
+    for quote, rate in usd_rates.items():
+      quotes[f"{symbol}/{quote}"] = price_dict["price"] * rate
+
+  # Quote aliased currencies with the rates of their proxy
+  for alias, proxy in aliases.items():
+    for pair, rate in list(quotes.items()):
+      base, quote = pair.split("/")
+      if base == proxy or quote == proxy:
+        quotes[f"{alias if base == proxy else base}/{alias if quote == proxy else quote}"] = rate
+
+  sources = rate_dicts + price_dicts
+  return PairIndex(
+    quotes=quotes,
+    updated_at=min((source["updated_at"] for source in sources), default=0),
+    expired_at=min((source["expired_at"] for source in sources), default=0),
+    stale=any(source.get("stale", False) for source in sources)
+  )
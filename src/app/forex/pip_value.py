@@ -0,0 +1,105 @@
+import numpy as np
+import zlib
+
+from dataclasses import dataclass
+from typing import Optional
+
+from src.app.forex.calculator import get_pair_spec
+from src.app.forex.constant import LOT_SIZES
+from src.app.forex.pair_index import PairIndex
+
+
+@dataclass
+class PipValueMatrix:
+  """
+  Data class representing the pip value of every pair, in every account currency, for every lot type.
+  """
+
+  pairs: list[str]
+  accounts: list[str]
+  lots: list[str]
+  quote_rates: np.ndarray # Account currency value of one unit of each quote currency, by quote and account
+  values: np.ndarray # Pip values by pair, account currency and lot type, NaN when a rate is unavailable
+  version: int # Checksum of the quote rates the values are computed from
+  updated_at: int # Oldest update time of the source data
+  expired_at: int # Earliest expiry time of the source data
+  stale: bool # Whether any source data was served stale
+
+  def select(self, pairs: list[str], accounts: list[str], lots: list[str]) -> np.ndarray:
+    """
+    Return the pip values of some pairs, account currencies and lot types, in the given order.
+    """
+
+    return self.values[np.ix_(
+      [self.pairs.index(pair) for pair in pairs],
+      [self.accounts.index(account) for account in accounts],
+      [self.lots.index(lot) for lot in lots]
+    )]
+
+
+def get_quote_currencies(pairs: list[str]) -> list[str]:
+  """
+  Return the distinct quote currencies of some pairs.
+  """
+
+  return list(dict.fromkeys(pair.split("/")[1] for pair in pairs))
+
+
+def get_quote_rate_pairs(pairs: list[str], accounts: list[str]) -> list[str]:
+  """
+  Return the pairs converting every quote currency of some pairs into every account currency.
+  """
+
+  return [f"{quote}/{account}" for quote in get_quote_currencies(pairs) for account in accounts if quote != account]
+
+
+def build_pip_value_matrix(
+  pairs: list[str],
+  accounts: list[str],
+  index: PairIndex,
+  previous: Optional[PipValueMatrix] = None
+) -> PipValueMatrix:
+  """
+  Compute the pip values of every pair in every account currency for every lot type, in one vectorized pass:
+  pipValue = pipDecimal * contractSize * lotSize * quoteRate, as in the web pip calculator.
+
+  Parameters:
+  - pairs: Currency and commodity pairs.
+  - accounts: Account currencies.
+  - index: Pair index holding the quotes of `get_quote_rate_pairs`.
+  - previous: Matrix computed before, returned as is if the rates are unchanged.
+
+  Returns:
+  - The pip value matrix.
+  """
+
+  quotes = get_quote_currencies(pairs)
+  quote_rates = np.array([
+    [1.0 if quote == account else index.get(f"{quote}/{account}") for account in accounts]
+    for quote in quotes
+  ], dtype=np.float64)
+
+  if (
+    previous is not None and previous.pairs == pairs and previous.accounts == accounts and
+    previous.stale == index.stale and np.array_equal(previous.quote_rates, quote_rates, equal_nan=True)
+  ):
+    return previous
+
+  # Pip value of a standard lot in quote currency, by pair
+  specs = [get_pair_spec(pair) for pair in pairs]
+  pip_values = np.array([spec.pip_decimal * spec.contract_size for spec in specs])
+  quote_positions = np.array([quotes.index(pair.split("/")[1]) for pair in pairs])
+  lot_sizes = np.array(list(LOT_SIZES.values()))
+
+  values = pip_values[:, None, None] * quote_rates[quote_positions][:, :, None] * lot_sizes[None, None, :]
+  return PipValueMatrix(
+    pairs=pairs,
+    accounts=accounts,
+    lots=list(LOT_SIZES),
+    quote_rates=quote_rates,
+    values=values,
+    version=zlib.crc32(quote_rates.tobytes()),
+    updated_at=index.updated_at,
+    expired_at=index.expired_at,
+    stale=index.stale
+  )
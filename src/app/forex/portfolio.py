@@ -0,0 +1,59 @@
+import numpy as np
+
+from src.app.forex.model import PortfolioInput, PortfolioResult
+
+
+def calculate_portfolio(positions: PortfolioInput) -> PortfolioResult:
+  """
+  Aggregate the margin, exposure and floating profit or loss of many open positions at once, following the web
+  margin and profit/loss calculators (`web/src/form/calculator/forex/margin/utils.ts`, `profit_loss/utils.ts`).
+
+  A long position holds the base asset and owes the quote asset, a short position the reverse.
+  Positions missing a rate are NaN and left out of the totals and exposures.
+  """
+
+  p = positions
+  sign = np.where(p.is_long, 1.0, -1.0)
+
+  # positionSize = lotSize * contractSize
+  size = p.lots * p.contract_size
+
+  # margin = positionSize * baseRate / leverage
+  notional = size * p.asset_rates[p.base]
+  margin = notional / p.leverage
+
+  # grossGained = priceDiff * round(positionSize) * quoteRate, priced at the current price
+  price_diff = sign * (p.price - p.entry_price)
+  profit_loss = price_diff * np.round(size) * p.asset_rates[p.quote]
+
+  priced = ~np.isnan(margin) & ~np.isnan(p.price) & ~np.isnan(p.asset_rates[p.quote])
+  base_units = np.where(priced, sign * size, 0)
+  quote_units = np.where(priced, -sign * size * p.price, 0)
+
+  exposure = (
+    np.bincount(p.base, weights=base_units, minlength=len(p.assets)) +
+    np.bincount(p.quote, weights=quote_units, minlength=len(p.assets))
+  )
+  # Assets without a rate are only held by unpriced positions, whose exposure is zero
+  exposure_value = np.where(exposure == 0, 0, exposure * p.asset_rates)
+
+  total_margin = float(margin[priced].sum())
+  total_profit_loss = float(np.nansum(profit_loss[priced]))
+  equity = None if p.balance is None else p.balance + total_profit_loss
+
+  return PortfolioResult(
+    assets=p.assets,
+    position_size=size,
+    notional=notional,
+    margin=margin,
+    profit_loss=profit_loss,
+    exposure=exposure,
+    exposure_value=exposure_value,
+    total_margin=total_margin,
+    gross_exposure=float(notional[priced].sum()),
+    total_profit_loss=total_profit_loss,
+    equity=equity,
+    free_margin=None if equity is None else equity - total_margin,
+    margin_level=None if equity is None or total_margin == 0 else equity / total_margin * 100,
+    unpriced=int((~priced).sum())
+  )
@@ -0,0 +1,220 @@
+import numpy as np
+
+from src.app.forex.constant import (
+  FEE_NONE, FEE_PER_100K, FEE_PER_LOT, POSITION_SIZE_MAX_ITERATIONS, PROFIT_GOAL_PIP, PROFIT_GOAL_PORTFOLIO
+)
+from src.app.forex.model import PositionSizeInput, PositionSizeResult
+
+
+LOT_UNITS = (1, 0.1, 0.01, 0.001) # Lot size steps of the adjustment, from standard to nano lot
+
+
+def calculate_position_size(scenarios: PositionSizeInput) -> PositionSizeResult:
+  """
+  Size the positions of many scenarios at once, the vectorized port of the web position size calculator
+  (`web/src/form/calculator/forex/position_size/utils.ts`).
+
+  The lot size is solved in closed form from the max loss, then stepped down or up lot unit by lot unit
+  while the rounded fees and swap keep the risk above, or allow it below, the max loss.
+  Values that are undefined in the web calculator (e.g. fees without trading fee) are NaN.
+  """
+
+  s = scenarios
+  has_fee = s.fee_type != FEE_NONE
+
+  # maxLotSize = (portfolioCapital * leverage) / (contractSize * baseRate), unbounded for a zero base rate
+  lot_value = s.contract_size * s.base_rate
+  max_lot = np.where(lot_value == 0, np.inf, _floor(_divide(s.capital * s.leverage, lot_value), s.lot_type))
+  max_loss = s.capital * s.risk / 100
+
+  # Loss, commission and swap of one lot, in account currency
+  loss_per_lot = s.stop_pip * s.pip_decimal * s.contract_size * s.quote_rate
+  fee_per_lot = np.where(
+    s.fee_type == FEE_PER_LOT,
+    s.commission,
+    np.where(s.fee_type == FEE_PER_100K, s.contract_size * (s.commission / 100000) * s.base_rate, 0)
+  )
+  swap_per_lot = s.swap * s.period * s.pip_decimal * s.contract_size * s.quote_rate / 10
+
+  def get_costs(lot: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # riskAmount = lotSize * contractSize * stopPriceDiff * quoteRate - swapValue + fee * 2
+    fee = np.where(has_fee, _round(lot * fee_per_lot, s.precision), 0)
+    swap = np.where(has_fee, _round(lot * swap_per_lot, s.precision), 0)
+    return lot * loss_per_lot + 2 * fee - swap, fee, swap
+
+  # lotSize = maxLoss / (priceDiff * contractSize * quoteRate + fee * 2 - swap)
+  divisor = loss_per_lot + np.where(has_fee, 2 * fee_per_lot - swap_per_lot, 0)
+  lot = np.where(
+    (loss_per_lot == 0) | (divisor == 0),
+    0,
+    np.minimum(_floor(_divide(max_loss, divisor), s.lot_type), max_lot)
+  )
+  risk, fee, swap = get_costs(lot)
+
+  # Rounded fees and swap may move the risk across the max loss, adjust the lot size from the largest unit
+  adjusted = has_fee & (lot != 0) & (lot != max_lot)
+  for i, unit in enumerate(LOT_UNITS):
+    active = adjusted & (s.lot_type >= i)
+    temp_lot, temp_risk = lot.copy(), risk.copy()
+    is_smaller = np.zeros(len(lot), dtype=bool)
+
+    for _ in range(POSITION_SIZE_MAX_ITERATIONS):
+      active &= ~_is_close(temp_risk, max_loss) & (temp_lot > 0)
+      down = active & (temp_risk > max_loss)
+      active &= ~(down & is_smaller)
+      if not active.any():
+        break
+
+      down &= active
+      is_smaller |= active & ~down
+      temp_lot = np.where(active, np.round(temp_lot + np.where(down, -unit, unit), 3), temp_lot)
+      next_risk, next_fee, next_swap = get_costs(temp_lot)
+      temp_risk = np.where(active, next_risk, temp_risk)
+
+      accepted = active & ((temp_risk <= max_loss) | _is_close(temp_risk, max_loss))
+      lot = np.where(accepted, temp_lot, lot)
+      risk = np.where(accepted, next_risk, risk)
+      fee = np.where(accepted, next_fee, fee)
+      swap = np.where(accepted, next_swap, swap)
+
+  lot = _floor(lot, s.lot_type)
+  position = lot * s.contract_size
+  entry_fee = np.where(has_fee, fee, np.nan)
+  swap_value = np.where(has_fee, swap, np.nan)
+
+  profit_pip, profit_amount, profit_fee = _calculate_profit(
+    s, has_fee, lot, position, fee_per_lot, entry_fee, swap_value
+  )
+
+  # ratio = profitAmount / riskAmount, breakEvenWinRate = (1 / (1 + ratio)) * 100
+  rewarded = (risk > 0) & (profit_amount > 0)
+  ratio = np.where(rewarded, _divide(profit_amount, risk), np.nan)
+
+  return PositionSizeResult(
+    lot_size=lot,
+    position_size=position,
+    margin_to_hold=position * _divide(s.base_rate, s.leverage),
+    risk_amount=risk,
+    portfolio_risk=_divide(risk, s.capital) * 100,
+    entry_fee=entry_fee,
+    stop_fee=entry_fee,
+    swap_value=swap_value,
+    profit_pip=profit_pip,
+    profit_amount=profit_amount,
+    profit_fee=profit_fee,
+    portfolio_profit=np.where(np.isnan(profit_amount), np.nan, _divide(profit_amount, s.capital) * 100),
+    risk_reward_ratio=ratio,
+    break_even_win_rate=np.where(rewarded, _divide(np.ones_like(ratio), 1 + ratio) * 100, np.nan)
+  )
+
+
+def _calculate_profit(
+  s: PositionSizeInput,
+  has_fee: np.ndarray,
+  lot: np.ndarray,
+  position: np.ndarray,
+  fee_per_lot: np.ndarray,
+  entry_fee: np.ndarray,
+  swap_value: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+  """
+  Calculate the profit pips, profit amount and profit fee of the sized positions.
+  A pip goal gives the profit of that many pips, a portfolio goal gives the fewest pips reaching the min profit.
+  """
+
+  pip_goal = s.profit_goal_type == PROFIT_GOAL_PIP
+  portfolio_goal = s.profit_goal_type == PROFIT_GOAL_PORTFOLIO
+  pip_value = s.pip_decimal * position * s.quote_rate
+
+  # Pip goal: profitAmount = profitPip * pipDecimal * positionSize * quoteRate - entryFee - profitFee + swapValue
+  pip_fee = np.where(has_fee, _round(lot * fee_per_lot, s.precision), np.nan)
+  pip_amount = s.profit_goal * pip_value - np.where(has_fee, entry_fee + pip_fee - swap_value, 0)
+
+  # Portfolio goal: profitPip = (minProfit + entryFee + profitFee - swapValue) / (positionSize * quoteRate * pipDecimal),
+  # with profitFee = entryFee
+  min_profit = s.capital * s.profit_goal / 100
+  costs = np.where(has_fee, 2 * entry_fee - swap_value, 0)
+  reachable = portfolio_goal & (position != 0) & (s.quote_rate != 0)
+  portfolio_pip = np.where(
+    reachable,
+    _ceil(_divide(_divide(min_profit + costs, position * s.quote_rate), s.pip_decimal)),
+    0
+  )
+  portfolio_amount = np.where(reachable, portfolio_pip * pip_value - costs, 0)
+
+  # With trading fee, step the pips by one until the profit is just above the min profit
+  active = reachable & has_fee
+  temp_pip, temp_amount = portfolio_pip.copy(), portfolio_amount.copy()
+  is_larger = np.zeros(len(lot), dtype=bool)
+  for _ in range(POSITION_SIZE_MAX_ITERATIONS):
+    active &= ~_is_close(temp_amount, min_profit) & (temp_pip > 0)
+    down = active & (temp_amount > min_profit)
+    active &= ~(~down & is_larger)
+    if not active.any():
+      break
+
+    down &= active
+    is_larger |= down
+    temp_pip = np.where(active, temp_pip + np.where(down, -1, 1), temp_pip)
+    temp_amount = np.where(active, temp_pip * pip_value - costs, temp_amount)
+
+    accepted = active & ((temp_amount >= min_profit) | _is_close(temp_amount, min_profit))
+    portfolio_pip = np.where(accepted, temp_pip, portfolio_pip)
+    portfolio_amount = np.where(accepted, temp_amount, portfolio_amount)
+
+  profit_pip = np.where(pip_goal, s.profit_goal, np.where(portfolio_goal, portfolio_pip, np.nan))
+  profit_amount = np.where(pip_goal, pip_amount, np.where(portfolio_goal, portfolio_amount, np.nan))
+  profit_fee = np.where(pip_goal, pip_fee, np.where(portfolio_goal & has_fee & reachable, entry_fee, np.nan))
+  return profit_pip, profit_amount, profit_fee
+
+
+def _divide(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+  """
+  Divide element-wise, zero where the divisor is zero.
+  """
+
+  a, b = np.broadcast_arrays(np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64))
+  return np.divide(a, b, out=np.zeros_like(a), where=b != 0)
+
+
+def _floor(x: np.ndarray, decimals: np.ndarray) -> np.ndarray:
+  """
+  Round down to some decimals.
+  """
+
+  scale = 10.0 ** decimals
+  return np.floor(_snap(x * scale)) / scale
+
+
+def _ceil(x: np.ndarray) -> np.ndarray:
+  """
+  Round up to an integer.
+  """
+
+  return np.ceil(_snap(x))
+
+
+def _round(x: np.ndarray, decimals: np.ndarray) -> np.ndarray:
+  """
+  Round half away from zero to some decimals, as decimal.js does.
+  """
+
+  scale = 10.0 ** decimals
+  return np.sign(x) * np.floor(_snap(np.abs(x) * scale + 0.5)) / scale
+
+
+def _is_close(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+  """
+  Compare amounts for equality, within float noise.
+  """
+
+  return np.abs(a - b) <= 1e-12 * np.maximum(1, np.abs(b))
+
+
+def _snap(x: np.ndarray) -> np.ndarray:
+  """
+  Snap values within float noise of an integer to it, so exact decimal results aren't rounded the wrong way.
+  """
+
+  nearest = np.round(x)
+  return np.where(np.abs(x - nearest) <= 1e-12 * np.maximum(1, np.abs(nearest)), nearest, x)
@@ -0,0 +1,111 @@
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+import src.app.forex.constant as constant
+
+
+def next_ecb_update(after: datetime) -> datetime:
+  """
+  Return the first time new ECB reference rates are available upstream, strictly after `after`.
+  The ECB publishes around 16:00 CET on TARGET business days only, never on weekends or TARGET holidays.
+  Naive datetimes are taken as server local time.
+  """
+
+  after = after.astimezone()
+  day = after.astimezone(ZoneInfo(constant.ECB_TIMEZONE)).date()
+  while True:
+    if is_target_business_day(day):
+      published_at = _get_ecb_publication(day)
+      if published_at > after:
+        return published_at
+    day += timedelta(days=1)
+
+
+def latest_ecb_reference_date(at: datetime) -> date:
+  """
+  Return the reference date of the latest ECB rates available upstream at `at`.
+  Naive datetimes are taken as server local time.
+  """
+
+  at = at.astimezone()
+  day = at.astimezone(ZoneInfo(constant.ECB_TIMEZONE)).date()
+  while not is_target_business_day(day) or _get_ecb_publication(day) > at:
+    day -= timedelta(days=1)
+
+  return day
+
+
+def next_metals_update(after: datetime, interval: timedelta) -> datetime:
+  """
+  Return when metal prices should be fetched again after `after`, every `interval` while markets trade.
+  Markets close from Friday 17:00 to Sunday 18:00 New York time, prices fetched during the close stay
+  final until the reopen.
+  Naive datetimes are taken as server local time.
+  """
+
+  tz = ZoneInfo(constant.METALS_TIMEZONE)
+  local = after.astimezone(tz)
+
+  # Last Friday close, today's close on Friday
+  close_day = local.date() - timedelta(days=(local.weekday() - 4) % 7)
+  closed_at = datetime.combine(close_day, constant.METALS_CLOSE_TIME, tz)
+  reopened_at = datetime.combine(close_day + timedelta(days=2), constant.METALS_OPEN_TIME, tz)
+  if closed_at <= local < reopened_at:
+    return reopened_at
+
+  return after.astimezone() + interval
+
+
+def is_target_business_day(day: date) -> bool:
+  """
+  Return true if the TARGET2 payment system is open on the day, i.e. the ECB publishes reference rates.
+  """
+
+  return day.weekday() < 5 and day not in _get_target_holidays(day.year)
+
+
+@lru_cache(maxsize=16)
+def _get_target_holidays(year: int) -> frozenset[date]:
+  """
+  Return the TARGET closing days of a year: New Year's Day, Good Friday, Easter Monday, Labour Day,
+  Christmas Day and the day after.
+  """
+
+  easter = _get_easter_sunday(year)
+  return frozenset((
+    date(year, 1, 1),
+    easter - timedelta(days=2),
+    easter + timedelta(days=1),
+    date(year, 5, 1),
+    date(year, 12, 25),
+    date(year, 12, 26)
+  ))
+
+
+def _get_easter_sunday(year: int) -> date:
+  """
+  Compute the Gregorian Easter Sunday (anonymous Gregorian algorithm).
+  """
+
+  a = year % 19
+  b, c = divmod(year, 100)
+  d, e = divmod(b, 4)
+  f = (b + 8) // 25
+  g = (b - f + 1) // 3
+  h = (19 * a + b - d - g + 15) % 30
+  i, k = divmod(c, 4)
+  l = (32 + 2 * e + 2 * i - h - k) % 7
+  m = (a + 11 * h + 22 * l) // 451
+  month, day = divmod(h + l - 7 * m + 114, 31)
+
+  return date(year, month, day + 1)
+
+
+def _get_ecb_publication(day: date) -> datetime:
+  """
+  Return when the ECB rates of a business day are available upstream.
+  """
+
+  published_at = datetime.combine(day, constant.ECB_PUBLICATION_TIME, ZoneInfo(constant.ECB_TIMEZONE))
+  return published_at + constant.ECB_PUBLICATION_DELAY
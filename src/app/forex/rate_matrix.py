@@ -0,0 +1,72 @@
+import numpy as np
+
+from dataclasses import dataclass
+
+
+@dataclass
+class RateMatrix:
+  """
+  Data class representing the full cross-rate matrix of a set of currencies.
+  `rates[i, j]` is the amount of `currencies[j]` for one unit of `currencies[i]`.
+  """
+
+  currencies: list[str]
+  index: dict[str, int]
+  rates: np.ndarray
+
+  def row(self, base: str) -> dict[str, float]:
+    """
+    Return the rates of every other currency against the base currency.
+    Currencies without a rate are omitted, an unknown base returns an empty dict.
+    """
+
+    i = self.index.get(base)
+    if i is None:
+      return {}
+
+    return {
+      currency: float(rate)
+      for currency, rate in zip(self.currencies, self.rates[i])
+      if currency != base and np.isfinite(rate)
+    }
+
+
+def build_rate_matrix(anchor: str, anchor_rates: dict[str, float], currencies: list[str],
+  significant_digits: int = 6) -> RateMatrix:
+  """
+  Build the NxN cross-rate matrix from a single anchor rate table in one vectorized pass.
+
+  With `u[c]` the amount of currency `c` for one unit of the anchor, the rate from `b` to `q` is `u[q] / u[b]`.
+  Frankfurter derives non-EUR bases from the same ECB reference table, so triangulated rates match
+  direct upstream rates within `CROSS_RATE_TOLERANCE` (relative difference), the gap being upstream rounding.
+  Rates are rounded to `significant_digits`.
+
+  Parameters:
+  - anchor: The anchor currency of the rate table.
+  - anchor_rates: Amount of each currency for one unit of the anchor.
+  - currencies: Currencies of the matrix, those missing from the table get NaN rates.
+  - significant_digits: Number of significant digits to keep.
+
+  Returns:
+  - The cross-rate matrix.
+  """
+
+  units = np.array(
+    [1.0 if currency == anchor else anchor_rates.get(currency, np.nan) for currency in currencies],
+    dtype=np.float64
+  )
+  units[units <= 0] = np.nan
+
+  # rates[i, j] = units[j] / units[i]
+  rates = units[np.newaxis, :] / units[:, np.newaxis]
+
+  # Round to significant digits
+  with np.errstate(invalid="ignore", divide="ignore"):
+    scale = np.power(10.0, significant_digits - 1 - np.floor(np.log10(rates)))
+    rates = np.round(rates * scale) / scale
+
+  return RateMatrix(
+    currencies=currencies,
+    index={currency: i for i, currency in enumerate(currencies)},
+    rates=rates
+  )
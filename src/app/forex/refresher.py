@@ -0,0 +1,92 @@
+import threading
+
+from datetime import timedelta
+from redis.exceptions import LockError
+
+from src.app.forex.repository import Repository
+from src.extensions import app_logger
+from src.service.redis import RedisServicer
+
+
+class ForexRefresher:
+  """
+  Background scheduler that reloads forex and commodity cache keys shortly before they expire,
+  so users don't pay the upstream latency of a cold cache miss.
+  Every worker runs the scheduler, a Redis lock ensures only one of them refreshes at a time.
+  """
+
+  lock_key = "forex:refresher:lock"
+
+  def __init__(self, rdb: RedisServicer, repo: Repository, interval: timedelta, lead: timedelta):
+    """
+    Initialize the forex refresher.
+
+    Parameters:
+    - rdb: Redis client used for the distributed lock.
+    - repo: Forex repository.
+    - interval: Time between two refresh rounds.
+    - lead: How long before expiry a key gets refreshed, should be greater than the interval.
+    """
+
+    self.rdb = rdb
+    self.repo = repo
+    self.interval = interval
+    self.lead = lead
+    self.stop_event = threading.Event()
+    self.thread: threading.Thread | None = None
+
+  def start(self):
+    """
+    Start the refresher in a daemon thread.
+    """
+
+    if self.thread is not None:
+      return
+
+    self.thread = threading.Thread(target=self._run, name="forex-refresher", daemon=True)
+    self.thread.start()
+
+  def stop(self):
+    """
+    Stop the refresher thread.
+    """
+
+    self.stop_event.set()
+
+  def refresh_once(self) -> int:
+    """
+    Run a single refresh round if no other node is running one.
+    Return the number of keys refreshed.
+    """
+
+    lock = self.rdb.custom_lock(
+      self.lock_key,
+      timeout=self.lead.total_seconds(),
+      blocking=False,
+      caller="refresh_once"
+    )
+    if not lock.acquire():
+      return 0
+
+    try:
+      return self.repo.currency.refresh_expiring(self.lead)
+    finally:
+      try:
+        lock.release()
+      except LockError as e:
+        app_logger.warning(f"Failed to release forex refresher lock. Error: {e}.")
+
+  def _run(self):
+    """
+    Refresh loop executed by the background thread.
+    """
+
+    while not self.stop_event.is_set():
+      try:
+        refreshed = self.refresh_once()
+        if refreshed > 0:
+          app_logger.info(f"Forex refresher reloaded {refreshed} cache keys.")
+      except Exception as e:
+        app_logger.error(f"Forex refresher failed. Error: {e}.")
+
+      self.stop_event.wait(self.interval.total_seconds())
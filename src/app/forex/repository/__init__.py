@@ -1,3 +1,6 @@
+from datetime import timedelta
+
+from src.service.async_http import AsyncHTTPClient
 from src.service.redis import RedisServicer
 from src.service.frankfurter import FrankFurtherServicer
 from src.service.gold_api import GoldAPIServicer
@@ -8,5 +11,5 @@ from src.app.forex.repository.currency import CurrencyRepo
 
 class Repository:
   def __init__(self, rdb: RedisServicer, ffs: FrankFurtherServicer, gs: GoldAPIServicer,
-    gsio: GoldAPIIOServicer):
-    self.currency = CurrencyRepo(rdb, ffs, gs, gsio)
+    gsio: GoldAPIIOServicer, async_client: AsyncHTTPClient, max_staleness: timedelta, batch_deadline: timedelta):
+    self.currency = CurrencyRepo(rdb, ffs, gs, gsio, async_client, max_staleness, batch_deadline)
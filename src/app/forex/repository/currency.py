@@ -1,143 +1,844 @@
 import json
+import threading
+import uuid
+import src.app.forex.constant as constant
 
-from typing import Union
+from concurrent.futures import Future
+from typing import Any, Callable, Coroutine, cast, Union
 from redis import Redis
+from redis.client import Pipeline
+from redis.exceptions import LockError
 from typing import Optional
-from datetime import timedelta, datetime, time
+from datetime import timedelta, datetime
 from dataclasses import asdict
+from functools import partial
 
+from src.common.cache import LocalCache
+from src.common.pool import MonitoredThreadPool
+from src.common.singleflight import SingleFlight
 from src.extensions import app_logger
+from src.service.async_http import AsyncHTTPClient
+from src.service.quota import QuotaManager
 from src.service.redis import RedisServicer
 from src.service.frankfurter import FrankFurtherServicer
 from src.service.gold_api import GoldAPIServicer
 from src.service.gold_api_io import GoldAPIIOServicer
+from src.app.forex.fragment import CacheFragment, CommoditySnapshot
 from src.app.forex.model import ComodityCache, CurrencyCache
+from src.app.forex.publication import latest_ecb_reference_date, next_ecb_update, next_metals_update
+from src.app.forex.rate_matrix import build_rate_matrix
 
 
 class CurrencyRepo:
   rdb: Union[Redis, RedisServicer]
 
-  def __init__(self, rdb: RedisServicer, ffs: FrankFurtherServicer, gs: GoldAPIServicer, gsio: GoldAPIIOServicer):
+  def __init__(self, rdb: RedisServicer, ffs: FrankFurtherServicer, gs: GoldAPIServicer, gsio: GoldAPIIOServicer,
+    async_client: AsyncHTTPClient, max_staleness: timedelta, batch_deadline: timedelta):
     self.rdb = rdb
     self.ffs = ffs
     self.gs = gs
     self.gsio = gsio
 
+    # Commodity prices are fetched concurrently on the event loop, one batch per refresh
+    self.async_client = async_client
+    self.batch_deadline = batch_deadline
+
+    # Expired data is kept and served (flagged as stale) up to this long while being refreshed
+    self.max_staleness = max_staleness
+    self.revalidate_pool = MonitoredThreadPool(constant.REVALIDATE_MAX_WORKERS, "forex-revalidate")
+    self.revalidate_lock = threading.Lock()
+    self.revalidating: set[str] = set()
+
+    # Coalesce concurrent cache misses within the process
+    self.flight = SingleFlight()
+
+    # Shared pool loading cache misses of batch reads
+    self.fill_pool = MonitoredThreadPool(constant.FILL_MAX_WORKERS, "forex-fill")
+
+    # In-process cache tier in front of Redis
+    self.l1 = LocalCache(constant.L1_CACHE_MAX_SIZE)
+    self.instance_id = uuid.uuid4().hex
+    self.pubsub_thread: Optional[Any] = None
+
+  def subscribe_invalidation(self):
+    """
+    Start a background listener that drops local cache entries refilled by other workers.
+    """
+
+    if self.pubsub_thread is not None:
+      return
+
+    pubsub = self.rdb.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(**{constant.L1_INVALIDATION_CHANNEL: self._handle_invalidation})
+    self.pubsub_thread = pubsub.run_in_thread(
+      sleep_time=1,
+      daemon=True,
+      exception_handler=lambda e, _pubsub, _thread: app_logger.error(
+        f"Forex cache invalidation listener error: {e}."
+      )
+    )
+
+  def get_cache_stats(self) -> dict:
+    """
+    Return hit/miss counters of the local cache tier.
+    """
+
+    return self.l1.stats()
+
+  def get_upstream_stats(self) -> dict:
+    """
+    Return circuit breaker state of each upstream.
+    """
+
+    return {
+      "frankfurter": self.ffs.breaker.stats(),
+      "gold_api": self.gs.breaker.stats(),
+      "gold_api_io": self.gsio.breaker.stats()
+    }
+
+  def get_quota_stats(self) -> dict:
+    """
+    Return the call budget left of each metered upstream.
+    """
+
+    quotas = {"frankfurter": self.ffs.quota, "gold_api": self.gs.quota, "gold_api_io": self.gsio.quota}
+    return {name: quota.stats() for name, quota in quotas.items() if quota is not None}
+
+  def get_pool_stats(self) -> dict:
+    """
+    Return queue depth and activity counters of the background pools.
+    """
+
+    return {
+      "fill": self.fill_pool.stats(),
+      "revalidate": self.revalidate_pool.stats()
+    }
+
   def get_currency_rate(self, base: str) -> Optional[dict]:
     """
     Get currency rates by base currency.
     Return rates data in json format if found, else None.
+    The `stale` field is true when the rates are past their expiry and being refreshed.
     """
-    
-    key, duration = self._get_currency_rate_cache_info(base)
 
-    # Get data from cache
-    rate_bytes = self.rdb.get(key)
-    if rate_bytes is not None:    
-      if rate_bytes == b"":
-        return None
-      
-      return json.loads(rate_bytes)
+    return self.get_currency_rates([base])[0]
 
-    # Get data from service
-    rates = self.ffs.get_currency_rates(base)
-    if rates is None:
-      return None
-    
-    now = int(datetime.now().timestamp())
-    data = CurrencyCache(
-      amount=rates.amount,
-      base=rates.base,
-      date=rates.date,
-      rates=rates.rates,
-      updated_at=now,
-      expired_at=now + int(duration.total_seconds())
-    )
+  def get_currency_rates(self, bases: list[str]) -> list[Optional[dict]]:
+    """
+    Get currency rates of multiple base currencies with a single cache round trip.
+    Return rates data in json format for each base, None for those not found.
+    """
 
-    # Store data to cache
-    rate_dict = asdict(data)
-    json_str = json.dumps(rate_dict)
-    if not self.rdb.set(key, json_str, duration):
-      app_logger.error(f"Failed to write currency rates data to cache, key: {key}.")
+    return [fragment.to_dict() if fragment is not None else None for fragment in self.get_currency_rate_fragments(bases)]
+
+  def get_currency_rate_fragments(self, bases: list[str]) -> list[Optional[CacheFragment]]:
+    """
+    Get currency rates of multiple base currencies as serialized fragments, without decoding them.
+    Return the fragment for each base, None for those not found.
+    """
+
+    items: list[tuple[str, Callable[[], Optional[CacheFragment]]]] = []
+    for base in bases:
+      key = self._get_currency_rate_cache_key(base)
+      items.append((key, partial(self._load_currency_rate, base)))
+
+    return self._get_many(items)
 
-    return rate_dict
-    
   def get_commodity_price(self, symbol: str) -> Optional[dict]:
     """
     Get commodity price by symbol.
     Return price data in json format if found, else None.
+    The `stale` field is true when the price is past its expiry and being refreshed.
+    """
+
+    return self.get_commodity_prices([symbol])[0]
+
+  def get_commodity_prices(self, symbols: list[str]) -> list[Optional[dict]]:
+    """
+    Get prices of multiple commodities from the same snapshot.
+    Return price data in json format for each symbol, None for those not found.
+    """
+
+    return [fragment.to_dict() if fragment is not None else None for fragment in self.get_commodity_price_fragments(symbols)]
+
+  def get_commodity_price_fragments(self, symbols: list[str]) -> list[Optional[CacheFragment]]:
+    """
+    Get prices of multiple commodities as serialized fragments, without decoding them.
+    Every price comes from the same snapshot, whatever the subset of symbols.
+    Return the fragment for each symbol, None for those not found.
+    """
+
+    snapshot = self.get_commodity_snapshot()
+    if snapshot is None:
+      return [None] * len(symbols)
+
+    return [snapshot.get(symbol) for symbol in symbols]
+
+  def get_commodity_snapshot(self) -> Optional[CommoditySnapshot]:
+    """
+    Get the snapshot of every commodity price with a single cache round trip.
+    An expired snapshot is served (flagged as stale) and refreshed in the background.
+    A missing snapshot, or one older than the max staleness, is fetched in the calling thread.
+    """
+
+    snapshot = self._read_commodity_snapshot()
+    if snapshot is not None:
+      expired_for = datetime.now().timestamp() - snapshot.expired_at
+      if expired_for < 0:
+        return snapshot
+
+      if expired_for <= self.max_staleness.total_seconds():
+        self._revalidate(
+          constant.COMMODITY_SNAPSHOT_KEY,
+          partial(self._fill_commodity_snapshot, self._is_unexpired)
+        )
+        return snapshot.as_stale(True)
+
+    return self.flight.do(
+      constant.COMMODITY_SNAPSHOT_KEY,
+      partial(self._fill_commodity_snapshot, self._is_unexpired)
+    )
+
+  def refresh_expiring(self, lead: timedelta) -> int:
+    """
+    Reload every default currency key that is missing or expired, and the commodity snapshot if missing
+    or expiring within `lead`.
+    Currency rates only change when the ECB publishes, so they are reloaded once their publication is out,
+    a reload ahead of it would fetch the same rates again.
+    Return the number of keys refreshed.
+    """
+
+    def is_fresh(cached: Union[CacheFragment, CommoditySnapshot]) -> bool:
+      return cached.expired_at - datetime.now().timestamp() > lead.total_seconds()
+
+    refreshed = 0
+
+    for base in constant.DEFAULT_CURRENCIES:
+      key = self._get_currency_rate_cache_key(base)
+      if self._refresh_key(key, partial(self._load_currency_rate, base), self._is_unexpired):
+        refreshed += 1
+
+    # Commodity prices are reloaded together as a new snapshot, unless a reload wouldn't outlive it (market close)
+    snapshot = self._read_commodity_snapshot()
+    if snapshot is None or (
+      not is_fresh(snapshot) and self._get_commodity_snapshot_expiry(datetime.now()) > snapshot.expired_at
+    ):
+      key = constant.COMMODITY_SNAPSHOT_KEY
+      if self.flight.do(key, partial(self._fill_commodity_snapshot, is_fresh)) is None:
+        app_logger.error(f"Failed to refresh forex cache, key: {key}.")
+      else:
+        refreshed += 1
+
+    return refreshed
+
+  def export_cache(self) -> tuple[dict[str, CacheFragment], Optional[CommoditySnapshot]]:
+    """
+    Return the cached rates by base currency and the commodity snapshot, without loading missing data.
+    """
+
+    keys = {base: self._get_currency_rate_cache_key(base) for base in constant.DEFAULT_CURRENCIES}
+    cached = self._read_caches(list(keys.values()))
+
+    rates: dict[str, CacheFragment] = {}
+    for base, key in keys.items():
+      _, fragment = cached[key]
+      if fragment is not None:
+        rates[base] = fragment
+
+    return rates, self._read_commodity_snapshot()
+
+  def restore_cache(self, rates: dict[str, CacheFragment], snapshot: Optional[CommoditySnapshot]) -> int:
+    """
+    Write data saved by `export_cache` back to Redis where it is missing, e.g. after a Redis flush.
+    Data already cached is never overwritten, and data older than the max staleness can't be served so it is skipped.
+    The data keeps its timestamps, so it is reported as stale once past its expiry.
+    Return the number of keys restored.
+    """
+
+    now = int(datetime.now().timestamp())
+    max_staleness = int(self.max_staleness.total_seconds())
+    casted_rdb = cast(RedisServicer, self.rdb)
+
+    items = [
+      (self._get_currency_rate_cache_key(base), fragment) for base, fragment in rates.items()
+      if base in constant.DEFAULT_CURRENCIES and fragment.expired_at + max_staleness > now
+    ]
+    is_snapshot_restorable = snapshot is not None and snapshot.expired_at + max_staleness > now
+
+    def restore_rates() -> int:
+      # Negative cache entries of failed fetches are replaced as well
+      cached = self.rdb.mget([key for key, _ in items])
+      missing = [(key, fragment) for (key, fragment), value in zip(items, cached) if value is None or value == b""]
+      if len(missing) == 0:
+        return 0
+
+      def fn(pipe: Pipeline) -> None:
+        for key, fragment in missing:
+          pipe.set(key, fragment.encode(), timedelta(seconds=fragment.expired_at + max_staleness - now))
+
+      casted_rdb.exec_with_pipeline(fn)
+      for key, _ in missing:
+        self.l1.delete(key)
+      return len(missing)
+
+    def restore_snapshot() -> int:
+      if snapshot is None or self.rdb.exists(constant.COMMODITY_SNAPSHOT_KEY):
+        return 0
+
+      return 1 if self._write_commodity_snapshot(snapshot) else 0
+
+    restored = 0
+    if len(items) > 0 and any(value is None or value == b"" for value in self.rdb.mget([key for key, _ in items])):
+      restored += self._restore_under_lock(constant.RATE_MATRIX_LOCK_KEY, restore_rates)
+    if is_snapshot_restorable and not self.rdb.exists(constant.COMMODITY_SNAPSHOT_KEY):
+      restored += self._restore_under_lock(constant.COMMODITY_FILL_LOCK_KEY, restore_snapshot)
+
+    return restored
+
+  def _restore_under_lock(self, lock_key: str, restore: Callable[[], int]) -> int:
+    """
+    Run a cache restore while holding the fill lock of its keys, so it never overwrites data being filled.
+    """
+
+    casted_rdb = cast(RedisServicer, self.rdb)
+    lock = casted_rdb.custom_lock(
+      lock_key,
+      timeout=constant.CACHE_FILL_LOCK_TIMEOUT.total_seconds(),
+      blocking_timeout=constant.CACHE_FILL_LOCK_WAIT.total_seconds(),
+      caller="restore_cache"
+    )
+    if not lock.acquire():
+      app_logger.warning(f"Timeout waiting for cache fill lock to restore cache, lock: {lock_key}.")
+      return 0
+
+    try:
+      return restore()
+    finally:
+      try:
+        lock.release()
+      except LockError as e:
+        app_logger.warning(f"Failed to release cache fill lock, lock: {lock_key}. Error: {e}.")
+
+  def _get_many(self, items: list[tuple[str, Callable[[], Optional[CacheFragment]]]]) -> list[Optional[CacheFragment]]:
+    """
+    Resolve multiple cache keys with one local cache pass and one Redis MGET.
+    Expired values are served (flagged as stale) and refreshed in the background.
+    Missing values, or values older than the max staleness, are loaded on the shared fill pool.
     """
-    
-    key: str
-    duration: timedelta
-    if symbol == "XPT":
-      key, duration = self._get_gold_api_io_cache_info(symbol)
-    else:
-      key, duration = self._get_gold_api_cache_info(symbol)
 
     # Get data from cache
-    price_bytes = self.rdb.get(key)
-    if price_bytes is not None:    
-      if price_bytes == b"":
-        return None
-      
-      return json.loads(price_bytes)
-    
+    cached = self._read_caches([key for key, _ in items])
+
+    results: list[Optional[CacheFragment]] = [None] * len(items)
+    misses: list[int] = []
+    for i, (key, loader) in enumerate(items):
+      is_found, fragment = cached[key]
+      if is_found:
+        if fragment is None:
+          continue
+
+        expired_for = datetime.now().timestamp() - fragment.expired_at
+        if expired_for < 0:
+          results[i] = fragment
+          continue
+
+        if expired_for <= self.max_staleness.total_seconds():
+          self._revalidate(key, partial(self._fill_cache, key, loader, self._is_unexpired))
+          results[i] = fragment.as_stale(True)
+          continue
+
+      misses.append(i)
+
     # Get data from service
-    data: ComodityCache
-    if symbol == "XPT":
-      gsio_res = self.gsio.get_commodities_price(symbol, "USD")
-      if gsio_res is None:
-        return None
-      data = ComodityCache(
-        name="Platinum",
-        price=gsio_res.price,
-        symbol=gsio_res.metal,
-        updated_at=gsio_res.timestamp,
-        expired_at=gsio_res.timestamp + int(duration.total_seconds())
-      )
-    else:
-      gs_res = self.gs.get_commodities_price(symbol)
-      if gs_res is None:
+    if len(misses) > 0:
+      for i, fragment in zip(misses, self._load_misses(items, misses)):
+        results[i] = fragment
+
+    return results
+
+  def _load_misses(self, items: list[tuple[str, Callable[[], Optional[CacheFragment]]]],
+    misses: list[int]) -> list[Optional[CacheFragment]]:
+    """
+    Load each missing key on the shared fill pool, a single miss is loaded in the calling thread.
+    """
+
+    futures: list[Future] = [self.fill_pool.submit(self._load_fresh, *items[i]) for i in misses[1:]]
+    return [self._load_fresh(*items[misses[0]])] + [future.result() for future in futures]
+
+  def _load_fresh(self, key: str, loader: Callable[[], Optional[CacheFragment]]) -> Optional[CacheFragment]:
+    """
+    Load an unexpired value, only one caller per key fetches the upstream.
+    """
+
+    return self.flight.do(key, lambda: self._fill_cache(key, loader, self._is_unexpired))
+
+  def _revalidate(self, key: str, fill: Callable[[], Optional[Any]]):
+    """
+    Refresh an expired key in the background with `fill`, at most once at a time per key.
+    """
+
+    with self.revalidate_lock:
+      if key in self.revalidating:
+        return
+      self.revalidating.add(key)
+
+    def task():
+      try:
+        if self.flight.do(key, fill) is None:
+          app_logger.error(f"Failed to revalidate forex cache, key: {key}.")
+      except Exception as e:
+        app_logger.error(f"Failed to revalidate forex cache, key: {key}. Error: {e}.")
+      finally:
+        with self.revalidate_lock:
+          self.revalidating.discard(key)
+
+    self.revalidate_pool.submit(task)
+
+  def _is_unexpired(self, cached: Union[CacheFragment, CommoditySnapshot]) -> bool:
+    """
+    Return true if the cached data has not reached its expiry.
+    """
+
+    return cached.expired_at > datetime.now().timestamp()
+
+  def _refresh_key(self, key: str, loader: Callable[[], Optional[CacheFragment]],
+    is_fresh: Callable[[CacheFragment], bool]) -> bool:
+    """
+    Reload a key from upstream if it is missing or not fresh.
+    Return true if the key has been reloaded.
+    """
+
+    is_found, fragment = self._read_cache(key)
+    if is_found and fragment is not None and is_fresh(fragment):
+      return False
+
+    fragment = self.flight.do(key, lambda: self._fill_cache(key, loader, is_fresh))
+    if fragment is None:
+      app_logger.error(f"Failed to refresh forex cache, key: {key}.")
+      return False
+
+    return True
+
+  def _fill_cache(self, key: str, loader: Callable[[], Optional[CacheFragment]],
+    is_fresh: Optional[Callable[[CacheFragment], bool]] = None) -> Optional[CacheFragment]:
+    """
+    Fill the cache key while holding a cross-process lock, so only one worker calls the upstream.
+    Workers waiting on the lock read the value filled by the lock holder instead.
+    If `is_fresh` is given, a cached value is only reused when it returns true.
+    When the upstream fails, a short negative cache entry makes other callers fail fast,
+    unless the key still holds data that can be served as stale.
+    """
+
+    casted_rdb = cast(RedisServicer, self.rdb)
+    lock = casted_rdb.custom_lock(
+      self._get_fill_lock_key(key),
+      timeout=constant.CACHE_FILL_LOCK_TIMEOUT.total_seconds(),
+      blocking_timeout=constant.CACHE_FILL_LOCK_WAIT.total_seconds(),
+      caller="_fill_cache"
+    )
+
+    is_locked = lock.acquire()
+    if not is_locked:
+      app_logger.warning(f"Timeout waiting for cache fill lock, key: {key}.")
+
+    try:
+      # Another worker may have filled the cache while we were waiting
+      is_found, cached_fragment = self._read_cache(key)
+      if is_found and (is_fresh is None or (cached_fragment is not None and is_fresh(cached_fragment))):
+        return cached_fragment
+
+      fragment = loader()
+      if fragment is None:
+        self.rdb.set(key, b"", constant.NEGATIVE_CACHE_TTL, nx=True)
+
+      return fragment
+    finally:
+      if is_locked:
+        try:
+          lock.release()
+        except LockError as e:
+          app_logger.warning(f"Failed to release cache fill lock, key: {key}. Error: {e}.")
+
+  def _fill_commodity_snapshot(self, is_fresh: Callable[[CommoditySnapshot], bool]) -> Optional[CommoditySnapshot]:
+    """
+    Refresh the commodity snapshot while holding the commodity fill lock, so only one worker calls the upstreams.
+    Workers waiting on the lock read the snapshot refreshed by the lock holder instead, if `is_fresh` returns true.
+    When every upstream fetch fails, the previous snapshot is kept to be served as stale,
+    or a short negative cache entry makes other callers fail fast if there is none.
+    """
+
+    casted_rdb = cast(RedisServicer, self.rdb)
+    lock = casted_rdb.custom_lock(
+      constant.COMMODITY_FILL_LOCK_KEY,
+      timeout=constant.CACHE_FILL_LOCK_TIMEOUT.total_seconds(),
+      blocking_timeout=constant.CACHE_FILL_LOCK_WAIT.total_seconds(),
+      caller="_fill_commodity_snapshot"
+    )
+
+    is_locked = lock.acquire()
+    if not is_locked:
+      app_logger.warning("Timeout waiting for commodity fill lock.")
+
+    try:
+      # Another worker may have refreshed the snapshot while we were waiting
+      snapshot = self._read_commodity_snapshot()
+      if snapshot is not None and is_fresh(snapshot):
+        return snapshot
+
+      if snapshot is None and self.rdb.exists(constant.COMMODITY_SNAPSHOT_FAILED_KEY):
         return None
-      data = ComodityCache(
-        name=gs_res.name,
-        price=gs_res.price,
-        symbol=gs_res.symbol,
-        updated_at=gs_res.updated_at,
-        expired_at=gs_res.updated_at + int(duration.total_seconds())
-      )
-    
-    # Store data to cache
-    price_dict = asdict(data)
-    json_str = json.dumps(price_dict)
-    if not self.rdb.set(key, json_str, duration):
-      app_logger.error(f"Failed to write commodity price data to cache, key: {key}.")
 
-    return price_dict
+      loaded = self._load_commodity_snapshot(snapshot)
+      if loaded is None and snapshot is None:
+        self.rdb.set(constant.COMMODITY_SNAPSHOT_FAILED_KEY, b"", constant.NEGATIVE_CACHE_TTL, nx=True)
+
+      return loaded
+    finally:
+      if is_locked:
+        try:
+          lock.release()
+        except LockError as e:
+          app_logger.warning(f"Failed to release commodity fill lock. Error: {e}.")
+
+  def _read_cache(self, key: str) -> tuple[bool, Optional[CacheFragment]]:
+    """
+    Read a key from the local cache, falling back to Redis.
+    Return whether the key was found, and its fragment (None for a negative cache entry).
+    """
+
+    fragment = self.l1.get(key)
+    if fragment is not None:
+      return True, fragment
+
+    cached_bytes = self.rdb.get(key)
+    if not isinstance(cached_bytes, bytes):
+      return False, None
+
+    if cached_bytes == b"":
+      return True, None
+
+    fragment = CacheFragment.decode(cached_bytes)
+    self.l1.set(key, fragment, fragment.expired_at)
+    return True, fragment
+
+  def _read_caches(self, keys: list[str]) -> dict[str, tuple[bool, Optional[CacheFragment]]]:
+    """
+    Read multiple keys from the local cache, falling back to a single Redis MGET for the rest.
+    Return whether each key was found, and its fragment (None for a negative cache entry).
+    """
+
+    results: dict[str, tuple[bool, Optional[CacheFragment]]] = {}
+    remote_keys: list[str] = []
+    for key in keys:
+      fragment = self.l1.get(key)
+      if fragment is not None:
+        results[key] = (True, fragment)
+      elif key not in results:
+        results[key] = (False, None)
+        remote_keys.append(key)
+
+    if len(remote_keys) == 0:
+      return results
+
+    for key, cached_bytes in zip(remote_keys, self.rdb.mget(remote_keys)):
+      if cached_bytes is None:
+        continue
+
+      if cached_bytes == b"":
+        results[key] = (True, None)
+        continue
+
+      fragment = CacheFragment.decode(cached_bytes)
+      self.l1.set(key, fragment, fragment.expired_at)
+      results[key] = (True, fragment)
+
+    return results
+
+  def _write_cache(self, key: str, fragment: CacheFragment, duration: timedelta) -> bool:
+    """
+    Write data to Redis and the local cache, then tell other workers to drop their local copy.
+    Redis keeps the data for the max staleness past its expiry, so it can still be served while refreshing.
+    """
+
+    return self._write_caches([(key, fragment)], duration)
+
+  def _write_caches(self, items: list[tuple[str, CacheFragment]], duration: timedelta) -> bool:
+    """
+    Write multiple keys sharing the same duration in one pipeline round trip.
+    Return true if every key has been written.
+    """
+
+    invalidation_msgs = [json.dumps({"key": key, "origin": self.instance_id}) for key, _ in items]
+
+    def fn(pipe: Pipeline) -> None:
+      for key, fragment in items:
+        pipe.set(key, fragment.encode(), duration + self.max_staleness)
+      for msg in invalidation_msgs:
+        pipe.publish(constant.L1_INVALIDATION_CHANNEL, msg)
+
+    casted_rdb = cast(RedisServicer, self.rdb)
+    results = casted_rdb.exec_with_pipeline(fn)
+
+    for key, fragment in items:
+      self.l1.set(key, fragment, fragment.expired_at)
+
+    return all(results[:len(items)])
+
+  def _read_commodity_snapshot(self) -> Optional[CommoditySnapshot]:
+    """
+    Read the commodity snapshot from the local cache, falling back to a single Redis HMGET.
+    Return None if there is no snapshot.
+    """
+
+    snapshot = self.l1.get(constant.COMMODITY_SNAPSHOT_KEY)
+    if snapshot is not None:
+      return snapshot
+
+    symbols = list(constant.DEFAULT_COMMODITIES)
+    values = self.rdb.hmget(constant.COMMODITY_SNAPSHOT_KEY, [*CommoditySnapshot.FIELDS, *symbols])
+    snapshot = CommoditySnapshot.decode(symbols, [value if isinstance(value, bytes) else None for value in values])
+    if snapshot is not None:
+      self.l1.set(constant.COMMODITY_SNAPSHOT_KEY, snapshot, snapshot.expired_at)
+
+    return snapshot
+
+  def _write_commodity_snapshot(self, snapshot: CommoditySnapshot) -> bool:
+    """
+    Replace the commodity snapshot in Redis and the local cache, then tell other workers to drop their local copy.
+    The hash is rewritten in one transaction, so readers never see fields of two snapshots.
+    Redis keeps the snapshot for the max staleness past its expiry, so it can still be served while refreshing.
+    """
+
+    key = constant.COMMODITY_SNAPSHOT_KEY
+    invalidation_msg = json.dumps({"key": key, "origin": self.instance_id})
+    duration = timedelta(seconds=snapshot.expired_at - int(datetime.now().timestamp()))
+
+    def fn(pipe: Pipeline) -> None:
+      pipe.delete(key)
+      pipe.hset(key, mapping=snapshot.encode())
+      pipe.expire(key, duration + self.max_staleness)
+      pipe.publish(constant.L1_INVALIDATION_CHANNEL, invalidation_msg)
+
+    casted_rdb = cast(RedisServicer, self.rdb)
+    results = casted_rdb.exec_with_pipeline(fn)
+
+    self.l1.set(key, snapshot, snapshot.expired_at)
+
+    return all(results[1:3])
+
+  def _handle_invalidation(self, message: dict):
+    """
+    Drop the local cache entry of a key refilled by another worker.
+    """
+
+    try:
+      payload: dict = json.loads(message["data"])
+    except (TypeError, ValueError) as e:
+      app_logger.error(f"Invalid forex cache invalidation message: {message}. Error: {e}.")
+      return
+
+    if payload.get("origin") != self.instance_id:
+      self.l1.delete(payload.get("key", ""))
 
-  def _get_currency_rate_cache_info(self, base: str) -> tuple[str, timedelta]:
+  def _load_currency_rate(self, base: str) -> Optional[CacheFragment]:
     """
-    Construct currency rate cache key and cache duration.
+    Fetch currency rates from upstream and store them to cache.
+    Rates of every base currency are derived from one anchor fetch, so all bases are stored together.
     """
 
+    rate_fragments = self._load_rate_matrix()
+    if rate_fragments is None:
+      return None
+
+    return rate_fragments.get(base)
+
+  def _load_rate_matrix(self) -> Optional[dict[str, CacheFragment]]:
+    """
+    Fetch the anchor rate table from upstream, derive the rates of every default currency
+    and store each base currency's rates to cache, until the next ECB publication.
+    Return the rates fragment by base currency.
+    """
+
+    anchor_rates = self.ffs.get_currency_rates(constant.ANCHOR_CURRENCY)
+    if anchor_rates is None:
+      return None
+
+    matrix = build_rate_matrix(anchor_rates.base, anchor_rates.rates, list(constant.DEFAULT_CURRENCIES))
+
     now = datetime.now()
-    next_midnight = datetime.combine(now.date() + timedelta(days=1), time(0, 0))
-    cache_duration = next_midnight - now
+    expired_at = self._get_currency_rate_expiry(anchor_rates.date, now)
+    rate_fragments: dict[str, CacheFragment] = {}
+    for base in matrix.currencies:
+      rates = matrix.row(base)
+      if len(rates) == 0:
+        app_logger.error(f"Missing {base} from {anchor_rates.base} currency rates.")
+        continue
+
+      rate_fragments[base] = CacheFragment.from_data(asdict(CurrencyCache(
+        amount=1,
+        base=base,
+        date=anchor_rates.date,
+        rates=rates,
+        updated_at=int(now.timestamp()),
+        expired_at=int(expired_at.timestamp())
+      )))
+
+    # Store data to cache
+    items = [(self._get_currency_rate_cache_key(base), fragment) for base, fragment in rate_fragments.items()]
+    if not self._write_caches(items, expired_at - now.astimezone()):
+      app_logger.error("Failed to write currency rates data to cache.")
+
+    return rate_fragments
 
-    return f"forex:currency:{base}", cache_duration
-  
-  def _get_gold_api_cache_info(self, symbol: str) -> tuple[str, timedelta]:
+  def _load_commodity_snapshot(self, previous: Optional[CommoditySnapshot]) -> Optional[CommoditySnapshot]:
     """
-    Construct commodity price cache key and cache duration.
+    Fetch the commodity prices from upstream and store them to cache as a new snapshot.
+    Prices of the previous snapshot that outlive the new one are carried over instead of being fetched,
+    as are prices of a metered upstream running low on budget, until they expire.
+    A price that fails to load keeps its previous value.
+    Return None if every fetch failed.
     """
 
-    return f"forex:gold_api:{symbol}", timedelta(hours=1)  
-  
-  def _get_gold_api_io_cache_info(self, symbol: str) -> tuple[str, timedelta]:
+    now = int(datetime.now().timestamp())
+    expired_at = self._get_commodity_snapshot_expiry(datetime.fromtimestamp(now))
+
+    prices = dict(previous.prices) if previous is not None else {}
+    pending: list[str] = []
+    for symbol in constant.DEFAULT_COMMODITIES:
+      fragment = prices.get(symbol)
+      if fragment is not None:
+        quota = self._get_commodity_quota(symbol)
+        if fragment.expired_at >= expired_at or (
+          quota is not None and quota.is_low() and fragment.expired_at > now
+        ):
+          continue
+
+      pending.append(symbol)
+
+    loaded = self._fetch_commodity_prices(pending)
+    if len(pending) > 0 and len(loaded) == 0:
+      return None
+    prices.update(loaded)
+
+    snapshot = CommoditySnapshot(
+      version=previous.version + 1 if previous is not None else 1,
+      updated_at=now,
+      expired_at=expired_at,
+      prices=prices
+    )
+
+    # Store data to cache
+    if not self._write_commodity_snapshot(snapshot):
+      app_logger.error("Failed to write commodity snapshot to cache.")
+
+    return snapshot
+
+  def _fetch_commodity_prices(self, symbols: list[str]) -> dict[str, CacheFragment]:
     """
-    Construct commodity price cache key and cache duration.
+    Fetch the prices of multiple commodities concurrently in one event loop batch, bounded by the batch deadline.
+    Return the price fragment by symbol, symbols that failed or missed the deadline are left out.
     """
 
-    return f"forex:gold_api_io:{symbol}", timedelta(hours=24)  
-  
\ No newline at end of file
+    coros: list[Coroutine[Any, Any, Any]] = []
+    for symbol in symbols:
+      if symbol == "XPT":
+        coros.append(self.gsio.get_commodities_price_async(symbol, "USD"))
+      else:
+        coros.append(self.gs.get_commodities_price_async(symbol))
+
+    responses = self.async_client.run_batch(coros, self.batch_deadline)
+
+    fragments: dict[str, CacheFragment] = {}
+    for symbol, res in zip(symbols, responses):
+      if res is None:
+        continue
+
+      duration = self._get_commodity_cache_duration(symbol)
+
+      # Keep prices of a metered upstream longer as its budget runs low
+      quota = self._get_commodity_quota(symbol)
+      if quota is not None:
+        duration = quota.stretch(duration)
+
+      data: ComodityCache
+      if symbol == "XPT":
+        data = ComodityCache(
+          name="Platinum",
+          price=res.price,
+          symbol=res.metal,
+          updated_at=res.timestamp,
+          expired_at=res.timestamp + int(duration.total_seconds())
+        )
+      else:
+        data = ComodityCache(
+          name=res.name,
+          price=res.price,
+          symbol=res.symbol,
+          updated_at=res.updated_at,
+          expired_at=res.updated_at + int(duration.total_seconds())
+        )
+
+      fragments[symbol] = CacheFragment.from_data(asdict(data))
+
+    return fragments
+
+  def _get_fill_lock_key(self, key: str) -> str:
+    """
+    Construct the lock key serializing upstream fills of a cache key.
+    Currency rates of every base come from one anchor fetch, so they share a single lock.
+    """
+
+    if key.startswith(constant.CURRENCY_CACHE_PREFIX):
+      return constant.RATE_MATRIX_LOCK_KEY
+
+    return f"{key}:lock"
+
+  def _get_currency_rate_cache_key(self, base: str) -> str:
+    """
+    Construct currency rate cache key.
+    """
+
+    return f"{constant.CURRENCY_CACHE_PREFIX}{base}"
+
+  def _get_currency_rate_expiry(self, rates_date: str, now: datetime) -> datetime:
+    """
+    Return when rates of the given ECB reference date (YYYY-MM-DD) expire: at the next ECB publication,
+    or after a short retry interval if the upstream hasn't picked up the latest publication yet.
+    """
+
+    try:
+      is_outdated = datetime.strptime(rates_date, "%Y-%m-%d").date() < latest_ecb_reference_date(now)
+    except ValueError:
+      is_outdated = False
+
+    if is_outdated:
+      return now.astimezone() + constant.ECB_RETRY_INTERVAL
+
+    return next_ecb_update(now)
+
+  def _get_commodity_snapshot_expiry(self, now: datetime) -> int:
+    """
+    Return when a commodity snapshot taken now expires, after the snapshot TTL or at the market reopen.
+    """
+
+    return int(next_metals_update(now, constant.COMMODITY_SNAPSHOT_TTL).timestamp())
+
+  def _get_commodity_cache_duration(self, symbol: str) -> timedelta:
+    """
+    Return how long a commodity price is valid, based on the symbol's provider.
+    """
+
+    if symbol == "XPT":
+      return timedelta(hours=24)
+
+    return timedelta(hours=1)
+
+  def _get_commodity_quota(self, symbol: str) -> Optional[QuotaManager]:
+    """
+    Return the call budget of the symbol's provider, if metered.
+    """
+
+    if symbol == "XPT":
+      return self.gsio.quota
+
+    return self.gs.quota
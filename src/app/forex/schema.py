@@ -1,8 +1,18 @@
 import src.common.error as common_error
 
-from marshmallow import EXCLUDE, Schema, fields
+from marshmallow import EXCLUDE, Schema, fields, validate
 from typing import Any
 
+from src.app.forex.constant import BATCH_MAX_SIZE, FEE_TYPES, LOT_SIZES, POSITION_SIDES, PROFIT_GOAL_TYPES
+
+
+def batch_list(field: fields.Field, **kwargs) -> fields.List:
+  """
+  Create a field of a batch request, holding one value per item or a single value shared by every item.
+  """
+
+  return fields.List(field, validate=validate.Length(min=1, max=BATCH_MAX_SIZE), **kwargs)
+
 
 # Create requests schema
 class BaseRequestSchema(Schema):
@@ -16,12 +26,82 @@ class BaseRequestSchema(Schema):
 
 class GetCurrencyRateRequestSchema(BaseRequestSchema):
   base = fields.List(fields.Str(), required=True)
+  quotes = fields.List(fields.Str(), load_default=list)
+  since = fields.Int(load_default=None)
 
 
 class GetCommodityPriceRequestSchema(BaseRequestSchema):
   symbol = fields.List(fields.Str(), required=True)
 
 
+class GetPairQuoteRequestSchema(BaseRequestSchema):
+  pair = fields.List(fields.Str(), required=True)
+
+
+class GetCalculatorContextRequestSchema(BaseRequestSchema):
+  pair = fields.Str(required=True)
+  account = fields.Str(required=True)
+
+
+class GetPipValueRequestSchema(BaseRequestSchema):
+  pair = fields.List(fields.Str(), load_default=list)
+  account = fields.List(fields.Str(), load_default=list)
+  lot = fields.List(fields.Str(validate=validate.OneOf(LOT_SIZES)), load_default=list)
+
+
+class CalculatePositionSizeRequestSchema(BaseRequestSchema):
+  account = fields.Str(required=True)
+  pair = batch_list(fields.Str(), required=True)
+  capital = batch_list(fields.Float(validate=validate.Range(min=0, max=1e18, min_inclusive=False)), required=True)
+  risk = batch_list(
+    fields.Float(validate=validate.Range(min=0, max=100, min_inclusive=False, max_inclusive=False)),
+    required=True
+  )
+  stop_pip = batch_list(fields.Float(validate=validate.Range(min=0, max=1e15, min_inclusive=False)), required=True)
+  pip_decimal = batch_list(fields.Float(validate=validate.Range(min=0, max=1e6)), load_default=None)
+  contract_size = batch_list(
+    fields.Float(validate=validate.Range(min=0, max=1e6, min_inclusive=False)),
+    load_default=None
+  )
+  leverage = batch_list(fields.Float(validate=validate.Range(min=0, min_inclusive=False)), load_default=[100])
+  lot_type = batch_list(fields.Int(validate=validate.Range(min=0, max=3)), load_default=[2])
+  fee_type = batch_list(fields.Str(validate=validate.OneOf(FEE_TYPES)), load_default=["none"])
+  commission = batch_list(fields.Float(validate=validate.Range(min=0, max=1e15)), load_default=[0])
+  swap = batch_list(fields.Float(validate=validate.Range(min=-1e15, max=1e15)), load_default=[0])
+  period = batch_list(fields.Float(validate=validate.Range(min=0, max=1e15)), load_default=[0])
+  precision = batch_list(fields.Int(validate=validate.Range(min=0, max=8)), load_default=[2])
+  profit_goal_type = batch_list(fields.Str(validate=validate.OneOf(PROFIT_GOAL_TYPES)), load_default=["none"])
+  profit_goal = batch_list(fields.Float(validate=validate.Range(min=0, max=1e15)), load_default=[0])
+
+
+class CalculatePortfolioRequestSchema(BaseRequestSchema):
+  account = fields.Str(required=True)
+  balance = fields.Float(validate=validate.Range(min=0, max=1e18), load_default=None)
+  pair = batch_list(fields.Str(), required=True)
+  side = batch_list(fields.Str(validate=validate.OneOf(POSITION_SIDES)), required=True)
+  lots = batch_list(fields.Float(validate=validate.Range(min=0, max=1e6, min_inclusive=False)), required=True)
+  leverage = batch_list(fields.Float(validate=validate.Range(min=0, min_inclusive=False)), load_default=[100])
+  contract_size = batch_list(
+    fields.Float(validate=validate.Range(min=0, max=1e6, min_inclusive=False)),
+    load_default=None
+  )
+  entry_price = batch_list(
+    fields.Float(validate=validate.Range(min=0, max=1e15, min_inclusive=False)),
+    load_default=None
+  )
+
+
+class GetRateHistoryRequestSchema(BaseRequestSchema):
+  pair = fields.Str(required=True)
+  start = fields.Date(required=True)
+  end = fields.Date(load_default=None)
+
+
+class GetStreamRequestSchema(BaseRequestSchema):
+  symbol = fields.List(fields.Str(), load_default=list)
+  base = fields.List(fields.Str(), load_default=list)
+
+
 # Create response schema
 class BaseResponseSchema(Schema):
   code = fields.Int()
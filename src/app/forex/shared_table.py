@@ -0,0 +1,267 @@
+import fcntl
+import mmap
+import os
+import threading
+import time
+import zlib
+import numpy as np
+
+from datetime import datetime, timedelta
+from typing import Callable, Optional, TextIO
+
+from src.app.forex.pair_index import PairIndex
+from src.extensions import app_logger
+
+
+HEADER_SIZE = 8 # Number of int64 header fields
+SEQ, SIGNATURE, SIZE, UPDATED_AT, EXPIRED_AT, STALE = range(6)
+
+
+class SharedRateTable:
+  """
+  Quotes of every currency and commodity pair in a memory-mapped file shared by all workers of the host,
+  e.g. on /dev/shm. A single writer per host refreshes it, workers read quotes in place without a Redis round trip.
+
+  The file holds an int64 header (sequence, code list signature, size, timestamps, stale flag) followed by a
+  float64 matrix, `rates[i, j]` being the amount of `codes[j]` for one unit of `codes[i]`, NaN when unavailable.
+  Readers and the writer are synchronized with a seqlock: the writer makes the sequence odd while writing
+  and even once done, readers retry when the sequence was odd or changed while they were reading.
+  """
+
+  def __init__(self, path: str, codes: list[str], read_retries: int):
+    """
+    Initialize the shared rate table.
+
+    Parameters:
+    - path: Table file path.
+    - codes: Currency and commodity codes indexing the matrix.
+    - read_retries: Max attempts of a read racing with writes before giving up.
+    """
+
+    self.path = path
+    self.codes = codes
+    self.index = {code: i for i, code in enumerate(codes)}
+    self.signature = zlib.crc32(",".join(codes).encode())
+    self.read_retries = read_retries
+
+    self._lock = threading.Lock()
+    self._pid = 0
+    self._header: Optional[np.ndarray] = None
+    self._writable = False
+    self._rates: Optional[np.ndarray] = None
+    self._writer_file: Optional[TextIO] = None
+    self._failed_reads = 0
+
+  def read(self, pairs: list[str]) -> Optional[PairIndex]:
+    """
+    Read the quotes of multiple pairs ("BASE/QUOTE") from one consistent version of the table.
+    Pairs without a quote are left out, the table is reported stale once past its expiry.
+    Return None if the table has not been written yet, or kept changing while reading.
+    """
+
+    if not self._map(writable=False):
+      return None
+
+    header, rates = self._header, self._rates
+    if header is None or rates is None or header[SIGNATURE] != self.signature:
+      return None
+
+    cells: list[tuple[str, int, int]] = []
+    for pair in pairs:
+      base, _, quote = pair.partition("/")
+      if base in self.index and quote in self.index:
+        cells.append((pair, self.index[base], self.index[quote]))
+
+    for _ in range(self.read_retries):
+      seq = int(header[SEQ])
+      if seq == 0:
+        return None
+      if seq % 2 == 1:
+        time.sleep(0)
+        continue
+
+      values = [float(rates[i, j]) for _, i, j in cells]
+      updated_at, expired_at, stale = int(header[UPDATED_AT]), int(header[EXPIRED_AT]), bool(header[STALE])
+      if int(header[SEQ]) != seq:
+        continue
+
+      return PairIndex(
+        quotes={pair: value for (pair, _, _), value in zip(cells, values) if not np.isnan(value)},
+        updated_at=updated_at,
+        expired_at=expired_at,
+        stale=stale or expired_at <= datetime.now().timestamp()
+      )
+
+    self._failed_reads += 1
+    return None
+
+  def acquire_writer(self) -> bool:
+    """
+    Try to become the single writer of the host, the writer keeps the role until its process exits.
+    Return true if this process is the writer.
+    """
+
+    with self._lock:
+      if self._writer_file is not None:
+        return True
+
+      os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+      lock_file = open(f"{self.path}.lock", "w")
+      try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+      except BlockingIOError:
+        lock_file.close()
+        return False
+
+      self._writer_file = lock_file
+      return True
+
+  def write(self, index: PairIndex) -> bool:
+    """
+    Publish the quotes of a pair index, if they changed. Only the writer may call it (see `acquire_writer`).
+    Return true if the table has been written.
+    """
+
+    if not self._map(writable=True):
+      return False
+
+    header, rates = self._header, self._rates
+    if header is None or rates is None:
+      return False
+
+    matrix = np.full((len(self.codes), len(self.codes)), np.nan, dtype=np.float64)
+    for pair, rate in index.quotes.items():
+      base, _, quote = pair.partition("/")
+      if base in self.index and quote in self.index:
+        matrix[self.index[base], self.index[quote]] = rate
+
+    if (
+      header[SEQ] != 0 and header[SIGNATURE] == self.signature and
+      (header[UPDATED_AT], header[EXPIRED_AT], header[STALE]) == (index.updated_at, index.expired_at, index.stale) and
+      np.array_equal(rates, matrix, equal_nan=True)
+    ):
+      return False
+
+    seq = int(header[SEQ])
+    header[SEQ] = seq + 1
+    rates[:] = matrix
+    header[SIGNATURE] = self.signature
+    header[SIZE] = len(self.codes)
+    header[UPDATED_AT] = index.updated_at
+    header[EXPIRED_AT] = index.expired_at
+    header[STALE] = int(index.stale)
+    header[SEQ] = seq + 2
+    return True
+
+  def stats(self) -> dict:
+    """
+    Return the table version and the number of reads that gave up racing with writes.
+    """
+
+    header = self._header
+    return {
+      "version": int(header[SEQ]) // 2 if header is not None else 0,
+      "writer": self._writer_file is not None,
+      "failed_reads": self._failed_reads
+    }
+
+  def _map(self, writable: bool) -> bool:
+    """
+    Map the table file in this process, the writer creates it with the expected size.
+    Return false if the file is not ready.
+    """
+
+    if self._header is not None and self._pid == os.getpid() and (self._writable or not writable):
+      return True
+
+    with self._lock:
+      if self._header is not None and self._pid == os.getpid() and (self._writable or not writable):
+        return True
+
+      size = (HEADER_SIZE + len(self.codes) ** 2) * 8
+      try:
+        if writable:
+          fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+          if os.fstat(fd).st_size != size:
+            os.ftruncate(fd, size)
+          buffer = mmap.mmap(fd, size, access=mmap.ACCESS_WRITE)
+        else:
+          fd = os.open(self.path, os.O_RDONLY)
+          if os.fstat(fd).st_size != size:
+            os.close(fd)
+            return False
+          buffer = mmap.mmap(fd, size, access=mmap.ACCESS_READ)
+        os.close(fd)
+      except OSError:
+        return False
+
+      self._rates = np.frombuffer(buffer, dtype=np.float64, offset=HEADER_SIZE * 8).reshape(len(self.codes), -1)
+      self._header = np.frombuffer(buffer, dtype=np.int64, count=HEADER_SIZE)
+      self._writable = writable
+      self._pid = os.getpid()
+      return True
+
+
+class RateTableWriter:
+  """
+  Background writer of the shared rate table. Every worker runs it, the one holding the host writer lock
+  rebuilds the pair index from cache and publishes it.
+  """
+
+  def __init__(self, table: SharedRateTable, load_index: Callable[[], PairIndex], interval: timedelta):
+    """
+    Initialize the rate table writer.
+
+    Parameters:
+    - table: Shared rate table.
+    - load_index: Function building the pair index from the cached data.
+    - interval: Time between two writes.
+    """
+
+    self.table = table
+    self.load_index = load_index
+    self.interval = interval
+    self.stop_event = threading.Event()
+    self.thread: threading.Thread | None = None
+
+  def start(self):
+    """
+    Start the writer in a daemon thread.
+    """
+
+    if self.thread is not None:
+      return
+
+    self.thread = threading.Thread(target=self._run, name="forex-rate-table", daemon=True)
+    self.thread.start()
+
+  def stop(self):
+    """
+    Stop the writer thread.
+    """
+
+    self.stop_event.set()
+
+  def write_once(self) -> bool:
+    """
+    Publish the current quotes if this process is the host writer.
+    Return true if the table has been written.
+    """
+
+    if not self.table.acquire_writer():
+      return False
+
+    return self.table.write(self.load_index())
+
+  def _run(self):
+    """
+    Write loop executed by the background thread.
+    """
+
+    while not self.stop_event.is_set():
+      try:
+        self.write_once()
+      except Exception as e:
+        app_logger.error(f"Forex rate table writer failed. Error: {e}.")
+
+      self.stop_event.wait(self.interval.total_seconds())
@@ -0,0 +1,328 @@
+import queue
+import threading
+import src.app.forex.constant as constant
+
+from datetime import timedelta
+from redis.client import Pipeline
+from redis.exceptions import LockError
+from typing import Any, Iterator, Optional
+
+from src.app.forex.fragment import CacheFragment
+from src.app.forex.repository import Repository
+from src.extensions import app_logger
+from src.service.redis import RedisServicer
+
+
+PRICE_EVENT = "price"
+RATE_EVENT = "rate"
+
+
+class ForexStreamPoller:
+  """
+  Background poller publishing forex price and rate updates to Redis pub/sub.
+  Every worker runs the poller, a Redis lock ensures only one of them polls at a time,
+  so the number of stream clients doesn't change the upstream load.
+  """
+
+  def __init__(self, rdb: RedisServicer, repo: Repository, interval: timedelta):
+    """
+    Initialize the stream poller.
+
+    Parameters:
+    - rdb: Redis client used for the distributed lock and publishing.
+    - repo: Forex repository.
+    - interval: Time between two polls.
+    """
+
+    self.rdb = rdb
+    self.repo = repo
+    self.interval = interval
+    self.stop_event = threading.Event()
+    self.thread: threading.Thread | None = None
+
+  def start(self):
+    """
+    Start the poller in a daemon thread.
+    """
+
+    if self.thread is not None:
+      return
+
+    self.thread = threading.Thread(target=self._run, name="forex-stream-poller", daemon=True)
+    self.thread.start()
+
+  def stop(self):
+    """
+    Stop the poller thread.
+    """
+
+    self.stop_event.set()
+
+  def poll_once(self) -> int:
+    """
+    Publish the prices and rates updated since the last poll, if no other node is polling.
+    Return the number of updates published.
+    """
+
+    lock = self.rdb.custom_lock(
+      constant.STREAM_POLLER_LOCK_KEY,
+      timeout=self.interval.total_seconds() * 3,
+      blocking=False,
+      caller="poll_once"
+    )
+    if not lock.acquire():
+      return 0
+
+    try:
+      return self._publish_updates()
+    finally:
+      try:
+        lock.release()
+      except LockError as e:
+        app_logger.warning(f"Failed to release forex stream poller lock. Error: {e}.")
+
+  def _publish_updates(self) -> int:
+    """
+    Compare the cached data with the last published versions and publish the changed items.
+    """
+
+    symbols = list(constant.DEFAULT_COMMODITIES)
+    bases = list(constant.DEFAULT_CURRENCIES)
+
+    items: list[tuple[str, str, Optional[CacheFragment]]] = []
+    items.extend(zip([PRICE_EVENT] * len(symbols), symbols, self.repo.currency.get_commodity_price_fragments(symbols)))
+    items.extend(zip([RATE_EVENT] * len(bases), bases, self.repo.currency.get_currency_rate_fragments(bases)))
+
+    versions: dict[bytes, bytes] = self.rdb.hgetall(constant.STREAM_VERSIONS_KEY)
+
+    updates: list[tuple[str, bytes, str]] = []
+    for event, item_id, fragment in items:
+      if fragment is None:
+        continue
+
+      version = f"{fragment.updated_at}:{fragment.stale}"
+      field = f"{event}:{item_id}"
+      if versions.get(field.encode()) != version.encode():
+        updates.append((field, encode_update(event, item_id, fragment), version))
+
+    if len(updates) == 0:
+      return 0
+
+    def fn(pipe: Pipeline) -> None:
+      pipe.hset(constant.STREAM_VERSIONS_KEY, mapping={field: version for field, _, version in updates})
+      for _, msg, _ in updates:
+        pipe.publish(constant.STREAM_CHANNEL, msg)
+
+    self.rdb.exec_with_pipeline(fn)
+    return len(updates)
+
+  def _run(self):
+    """
+    Poll loop executed by the background thread.
+    """
+
+    while not self.stop_event.is_set():
+      try:
+        self.poll_once()
+      except Exception as e:
+        app_logger.error(f"Forex stream poller failed. Error: {e}.")
+
+      self.stop_event.wait(self.interval.total_seconds())
+
+
+class StreamClient:
+  """
+  Stream subscription of a single client, holding its pending events.
+  """
+
+  def __init__(self, topics: set[str], buffer_size: int):
+    """
+    Initialize the stream client.
+
+    Parameters:
+    - topics: Items the client listens to, as "{event}:{id}".
+    - buffer_size: Max pending events before the client is dropped.
+    """
+
+    self.topics = topics
+    self.events: queue.Queue[Optional[bytes]] = queue.Queue(buffer_size)
+    self.closed = False
+
+  def push(self, event: bytes) -> bool:
+    """
+    Queue an event for the client, return false if the client is too slow to keep up.
+    """
+
+    try:
+      self.events.put_nowait(event)
+      return True
+    except queue.Full:
+      return False
+
+  def close(self):
+    """
+    Wake the client up to end its stream.
+    """
+
+    self.closed = True
+    try:
+      self.events.put_nowait(None)
+    except queue.Full:
+      # The client checks the closed flag between events, so it notices the drop anyway
+      pass
+
+  def listen(self, keepalive: timedelta) -> Iterator[bytes]:
+    """
+    Yield the queued events until the client is closed, with a keep-alive comment when idle,
+    so proxies keep the connection open and disconnected clients are detected.
+    """
+
+    while not self.closed:
+      try:
+        event = self.events.get(timeout=keepalive.total_seconds())
+      except queue.Empty:
+        yield b": keep-alive\n\n"
+        continue
+
+      if event is None:
+        return
+      yield event
+
+
+class EventStream:
+  """
+  Server-sent events of a subscribed client, used as the response body.
+  The client is unsubscribed when the server closes the response, even if it was never iterated.
+  """
+
+  def __init__(self, hub: "ForexStreamHub", client: StreamClient, initial_events: list[bytes], keepalive: timedelta):
+    """
+    Initialize the event stream.
+
+    Parameters:
+    - hub: Hub the client is subscribed to.
+    - client: Subscribed client.
+    - initial_events: Events sent before the updates, e.g. the current data.
+    - keepalive: Max idle time before a keep-alive comment is sent.
+    """
+
+    self.hub = hub
+    self.client = client
+    self.initial_events = initial_events
+    self.keepalive = keepalive
+
+  def __iter__(self) -> Iterator[bytes]:
+    yield b"retry: 5000\n\n"
+    yield from self.initial_events
+    yield from self.client.listen(self.keepalive)
+
+  def close(self):
+    self.hub.unsubscribe(self.client)
+
+
+class ForexStreamHub:
+  """
+  Per-worker fan-out of the forex updates published on Redis pub/sub to the connected stream clients.
+  """
+
+  def __init__(self, rdb: RedisServicer, max_clients: int, buffer_size: int):
+    """
+    Initialize the stream hub.
+
+    Parameters:
+    - rdb: Redis client used to subscribe to updates.
+    - max_clients: Max concurrent clients of this worker.
+    - buffer_size: Max pending events per client.
+    """
+
+    self.rdb = rdb
+    self.max_clients = max_clients
+    self.buffer_size = buffer_size
+    self.lock = threading.Lock()
+    self.clients: set[StreamClient] = set()
+    self.pubsub_thread: Optional[Any] = None
+
+  def start(self):
+    """
+    Start a background listener of the update channel.
+    """
+
+    if self.pubsub_thread is not None:
+      return
+
+    pubsub = self.rdb.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(**{constant.STREAM_CHANNEL: self._handle_update})
+    self.pubsub_thread = pubsub.run_in_thread(
+      sleep_time=1,
+      daemon=True,
+      exception_handler=lambda e, _pubsub, _thread: app_logger.error(f"Forex stream listener error: {e}.")
+    )
+
+  def subscribe(self, topics: set[str]) -> Optional[StreamClient]:
+    """
+    Register a client listening to the given topics ("{event}:{id}").
+    Return None if the worker already serves the max number of clients.
+    """
+
+    with self.lock:
+      if len(self.clients) >= self.max_clients:
+        return None
+
+      client = StreamClient(topics, self.buffer_size)
+      self.clients.add(client)
+      return client
+
+  def unsubscribe(self, client: StreamClient):
+    """
+    Unregister a client.
+    """
+
+    with self.lock:
+      self.clients.discard(client)
+
+  def stats(self) -> dict[str, int]:
+    """
+    Return the number of connected clients.
+    """
+
+    with self.lock:
+      return {"clients": len(self.clients), "max_clients": self.max_clients}
+
+  def _handle_update(self, message: dict):
+    """
+    Format a published update as a server-sent event once, and queue it to every client listening to it.
+    """
+
+    try:
+      event, item_id, data = message["data"].split(b":", 2)
+    except (AttributeError, ValueError) as e:
+      app_logger.error(f"Invalid forex stream message: {message}. Error: {e}.")
+      return
+
+    topic = f"{event.decode()}:{item_id.decode()}"
+    frame = format_event(event.decode(), data)
+
+    with self.lock:
+      clients = [client for client in self.clients if topic in client.topics]
+
+    for client in clients:
+      if not client.push(frame):
+        app_logger.warning("Forex stream client dropped, too slow to keep up.")
+        self.unsubscribe(client)
+        client.close()
+
+
+def encode_update(event: str, item_id: str, fragment: CacheFragment) -> bytes:
+  """
+  Serialize an update to publish it, as "{event}:{id}:{json}".
+  """
+
+  return b"%s:%s:%s" % (event.encode(), item_id.encode(), fragment.to_json())
+
+
+def format_event(event: str, data: bytes) -> bytes:
+  """
+  Format a server-sent event.
+  """
+
+  return b"event: %s\ndata: %s\n\n" % (event.encode(), data)
@@ -0,0 +1,147 @@
+import json
+import os
+import threading
+import time
+import zlib
+
+from datetime import timedelta
+from typing import Optional
+
+from src.app.forex.fragment import CacheFragment, CommoditySnapshot
+from src.app.forex.repository import Repository
+from src.extensions import app_logger
+
+
+class ForexWarmStart:
+  """
+  Periodic snapshot of the cached forex rates and commodity prices to a local file, used to rehydrate Redis
+  on boot or after it comes back empty, so a flushed cache and a down upstream don't leave nothing to serve.
+
+  The file is zlib compressed JSON of the fragments as stored in Redis, so their `updated_at` is kept.
+  Every worker runs the snapshot, the file is replaced atomically and only rewritten once per interval.
+  """
+
+  def __init__(self, path: str, repo: Repository, interval: timedelta):
+    """
+    Initialize the warm-start snapshot.
+
+    Parameters:
+    - path: Snapshot file path.
+    - repo: Forex repository.
+    - interval: Time between two snapshots, and between two checks for an empty cache.
+    """
+
+    self.path = path
+    self.repo = repo
+    self.interval = interval
+    self.stop_event = threading.Event()
+    self.thread: threading.Thread | None = None
+
+  def start(self):
+    """
+    Rehydrate the cache from the snapshot file, then start the snapshot loop in a daemon thread.
+    """
+
+    if self.thread is not None:
+      return
+
+    try:
+      self.restore()
+    except Exception as e:
+      app_logger.error(f"Failed to restore forex cache from warm-start snapshot. Error: {e}.")
+
+    self.thread = threading.Thread(target=self._run, name="forex-warm-start", daemon=True)
+    self.thread.start()
+
+  def stop(self):
+    """
+    Stop the snapshot thread.
+    """
+
+    self.stop_event.set()
+
+  def save(self) -> bool:
+    """
+    Write the cached data to the snapshot file, unless another worker just wrote it or there is nothing cached.
+    Return true if the file has been written.
+    """
+
+    if os.path.exists(self.path) and time.time() - os.path.getmtime(self.path) < self.interval.total_seconds() / 2:
+      return False
+
+    rates, snapshot = self.repo.currency.export_cache()
+    if len(rates) == 0 and snapshot is None:
+      return False
+
+    payload = {
+      "saved_at": int(time.time()),
+      "rates": {base: fragment.encode().decode() for base, fragment in rates.items()},
+      "commodities": {
+        field: value.decode() for field, value in snapshot.encode().items() if isinstance(value, bytes)
+      } if snapshot else None
+    }
+
+    # Write then rename, so readers never see a partial file
+    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+    tmp_path = f"{self.path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+      f.write(zlib.compress(json.dumps(payload, separators=(",", ":")).encode()))
+    os.replace(tmp_path, self.path)
+
+    return True
+
+  def restore(self) -> int:
+    """
+    Restore the data of the snapshot file that is missing from the cache.
+    Return the number of keys restored.
+    """
+
+    loaded = self.load()
+    if loaded is None:
+      return 0
+
+    restored = self.repo.currency.restore_cache(*loaded)
+    if restored > 0:
+      app_logger.info(f"Restored {restored} forex cache keys from warm-start snapshot.")
+
+    return restored
+
+  def load(self) -> Optional[tuple[dict[str, CacheFragment], Optional[CommoditySnapshot]]]:
+    """
+    Read the snapshot file.
+    Return the rates by base currency and the commodity snapshot, None if there is no valid file.
+    """
+
+    try:
+      with open(self.path, "rb") as f:
+        payload: dict = json.loads(zlib.decompress(f.read()))
+
+      rates = {base: CacheFragment.decode(value.encode()) for base, value in payload.get("rates", {}).items()}
+
+      snapshot: Optional[CommoditySnapshot] = None
+      commodities: Optional[dict[str, str]] = payload.get("commodities")
+      if commodities is not None:
+        symbols = [field for field in commodities if field not in CommoditySnapshot.FIELDS]
+        snapshot = CommoditySnapshot.decode(symbols, [
+          commodities[field].encode() if field in commodities else None
+          for field in [*CommoditySnapshot.FIELDS, *symbols]
+        ])
+    except FileNotFoundError:
+      return None
+    except (OSError, zlib.error, ValueError, AttributeError) as e:
+      app_logger.error(f"Invalid forex warm-start snapshot: {self.path}. Error: {e}.")
+      return None
+
+    return rates, snapshot
+
+  def _run(self):
+    """
+    Snapshot loop executed by the background thread.
+    """
+
+    while not self.stop_event.wait(self.interval.total_seconds()):
+      try:
+        self.restore()
+        self.save()
+      except Exception as e:
+        app_logger.error(f"Forex warm-start snapshot failed. Error: {e}.")
@@ -0,0 +1,89 @@
+import threading
+import time
+
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class LocalCache:
+  """
+  Bounded, thread-safe in-memory LRU cache where each entry expires at an absolute timestamp.
+  Keeps hit and miss counters so the saving over the backing store can be observed.
+  """
+
+  def __init__(self, max_size: int):
+    """
+    Initialize the local cache.
+
+    Parameters:
+    - max_size: Maximum number of entries kept, the least recently used entry is evicted first.
+    """
+
+    self.max_size = max_size
+    self._lock = threading.Lock()
+    self._entries: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+    self._hits = 0
+    self._misses = 0
+
+  def get(self, key: str) -> Optional[Any]:
+    """
+    Return the cached value, or None if the key is missing or expired.
+    """
+
+    now = time.time()
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is None or entry[1] <= now:
+        if entry is not None:
+          del self._entries[key]
+        self._misses += 1
+        return None
+
+      self._entries.move_to_end(key)
+      self._hits += 1
+      return entry[0]
+
+  def set(self, key: str, value: Any, expired_at: float):
+    """
+    Store a value until the given unix timestamp.
+    """
+
+    if expired_at <= time.time():
+      return
+
+    with self._lock:
+      self._entries[key] = (value, expired_at)
+      self._entries.move_to_end(key)
+      while len(self._entries) > self.max_size:
+        self._entries.popitem(last=False)
+
+  def delete(self, key: str):
+    """
+    Remove a key from the cache if present.
+    """
+
+    with self._lock:
+      self._entries.pop(key, None)
+
+  def clear(self):
+    """
+    Remove all entries from the cache.
+    """
+
+    with self._lock:
+      self._entries.clear()
+
+  def stats(self) -> dict[str, Any]:
+    """
+    Return cache size and hit/miss counters.
+    """
+
+    with self._lock:
+      total = self._hits + self._misses
+      return {
+        "size": len(self._entries),
+        "max_size": self.max_size,
+        "hits": self._hits,
+        "misses": self._misses,
+        "hit_ratio": round(self._hits / total, 4) if total > 0 else 0
+      }
@@ -0,0 +1,66 @@
+import threading
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+
+class MonitoredThreadPool(ThreadPoolExecutor):
+  """
+  Long-lived, bounded thread pool that keeps queue depth and activity counters.
+  """
+
+  def __init__(self, max_workers: int, thread_name_prefix: str = ""):
+    """
+    Initialize the thread pool.
+
+    Parameters:
+    - max_workers: Max number of worker threads.
+    - thread_name_prefix: Prefix of the worker thread names.
+    """
+
+    super().__init__(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+    self.max_workers = max_workers
+    self._stats_lock = threading.Lock()
+    self._queued = 0
+    self._active = 0
+    self._completed = 0
+
+  def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+    """
+    Schedule a function to run on the pool and track it while queued and running.
+    """
+
+    with self._stats_lock:
+      self._queued += 1
+
+    def run() -> Any:
+      with self._stats_lock:
+        self._queued -= 1
+        self._active += 1
+
+      try:
+        return fn(*args, **kwargs)
+      finally:
+        with self._stats_lock:
+          self._active -= 1
+          self._completed += 1
+
+    try:
+      return super().submit(run)
+    except RuntimeError:
+      with self._stats_lock:
+        self._queued -= 1
+      raise
+
+  def stats(self) -> dict[str, int]:
+    """
+    Return pool size, queue depth and activity counters.
+    """
+
+    with self._stats_lock:
+      return {
+        "max_workers": self.max_workers,
+        "queued": self._queued,
+        "active": self._active,
+        "completed": self._completed
+      }
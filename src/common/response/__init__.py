@@ -1,4 +1,10 @@
+import hashlib
+import json
+
+from datetime import datetime, timezone
+from flask import Response, request
 from typing import Any, Optional
+from werkzeug.http import http_date, is_resource_modified, quote_etag
 
 
 def make_response_body(code: int, message: str = "", data: Optional[dict] = None) -> dict[str, Any]:
@@ -19,3 +25,86 @@ def make_response_body(code: int, message: str = "", data: Optional[dict] = None
     "data": data or {},  # Default to an empty dictionary if data is None
     **({"message": message} if message else {})  # Add message only if it's provided
   }
+
+
+def make_raw_response(code: int, data: dict[str, bytes], headers: Optional[dict[str, str]] = None) -> Response:
+  """
+  Constructs a JSON response from pre-serialized data fields, splicing them in without re-encoding.
+  The body has the same shape as `make_response_body`.
+
+  Parameters:
+  - code: The status code of the response.
+  - data: Serialized JSON value of each data field.
+  - headers: Optional response headers.
+
+  Returns:
+  - The response.
+  """
+
+  fields = b", ".join(json.dumps(name).encode() + b": " + value for name, value in data.items())
+  body = b'{"code": %d, "data": {%s}}' % (code, fields)
+  return Response(body, status=code, mimetype="application/json", headers=headers)
+
+
+def make_etag(*parts: Any) -> str:
+  """
+  Derives a strong entity tag from the values the response body is built from.
+
+  Parameters:
+  - parts: Values identifying the response body version, e.g. the update time of the data.
+
+  Returns:
+  - The entity tag, unquoted.
+  """
+
+  return hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def make_cache_headers(etag: str, max_age: int, last_modified: Optional[int] = None) -> dict[str, str]:
+  """
+  Constructs the validator and freshness headers of a cacheable response.
+
+  Parameters:
+  - etag: The entity tag of the response body, unquoted.
+  - max_age: Seconds the response may be reused without revalidation.
+  - last_modified: Optional unix timestamp of the last change of the response body.
+
+  Returns:
+  - A dictionary of response headers.
+  """
+
+  headers = {
+    "ETag": quote_etag(etag),
+    "Cache-Control": f"public, max-age={max(int(max_age), 0)}"
+  }
+  if last_modified:
+    headers["Last-Modified"] = http_date(last_modified)
+
+  return headers
+
+
+def is_not_modified(etag: str, last_modified: Optional[int] = None) -> bool:
+  """
+  Checks the conditional headers (If-None-Match, If-Modified-Since) of the current request.
+
+  Parameters:
+  - etag: The entity tag of the current response body, unquoted.
+  - last_modified: Optional unix timestamp of the last change of the response body.
+
+  Returns:
+  - True if the client copy is still valid and a 304 can be sent instead of the body.
+  """
+
+  return not is_resource_modified(
+    request.environ,
+    etag=etag,
+    last_modified=datetime.fromtimestamp(last_modified, timezone.utc) if last_modified else None
+  )
+
+
+def make_not_modified_response(headers: dict[str, str]) -> Response:
+  """
+  Constructs an empty 304 response carrying the cache headers.
+  """
+
+  return Response(status=304, headers=headers)
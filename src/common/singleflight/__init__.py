@@ -0,0 +1,58 @@
+import threading
+
+from concurrent.futures import Future
+from typing import Any, Callable
+
+
+class SingleFlight:
+  """
+  Coalesce concurrent calls that share the same key into a single execution.
+  The first caller runs the function, every other caller arriving before it
+  finishes waits on the same future and receives the same result (or exception).
+  """
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._calls: dict[str, Future] = {}
+
+  def do(self, key: str, fn: Callable[[], Any]) -> Any:
+    """
+    Execute `fn` once for all concurrent callers of `key`.
+
+    Parameters:
+    - key: Identifier used to group concurrent calls.
+    - fn: Function to execute when no call for the key is in flight.
+
+    Returns:
+    - The value returned by `fn`.
+    """
+
+    with self._lock:
+      future = self._calls.get(key)
+      is_leader = future is None
+      if future is None:
+        future = Future()
+        self._calls[key] = future
+
+    # Wait for the in-flight call to finish
+    if not is_leader:
+      return future.result()
+
+    try:
+      result = fn()
+      future.set_result(result)
+      return result
+    except BaseException as e:
+      future.set_exception(e)
+      raise
+    finally:
+      with self._lock:
+        self._calls.pop(key, None)
+
+  def in_flight(self) -> int:
+    """
+    Return the number of keys currently being executed.
+    """
+
+    with self._lock:
+      return len(self._calls)
@@ -9,11 +9,37 @@ class Config:
   """
 
   app_mode: str # App mode to run [http_public, http_internal]
+  circuit_failure_threshold: int # Consecutive upstream failures before the circuit opens
+  circuit_open_seconds: float # Initial seconds an open circuit rejects upstream calls
+  circuit_max_open_seconds: float # Max seconds an open circuit rejects upstream calls after failed probes
   cors_allowed_origins: str # CORS origins to whitelist
   cookie_domain: str # Auth cookies's domain
   cookie_samesite: str # Auth cookie's samesite
   debug_mode: bool
+  forex_history_dir: str # Directory of the memory-mapped forex rate history files
+  forex_history_start: str # First date (YYYY-MM-DD) of the forex rate history
+  forex_max_staleness: float # Max seconds expired forex data is still served while being refreshed
+  forex_rate_table_path: str # Shared memory file of the forex rate table read by every worker of the host
+  forex_refresh_ahead: float # Seconds before expiry to proactively refresh forex cache keys
+  forex_refresh_interval: float # Seconds between two forex cache refresh rounds
+  forex_warm_start_interval: float # Seconds between two snapshots of the forex cache to local disk
+  forex_warm_start_path: str # File of the forex cache snapshot used to rehydrate an empty Redis
+  frankfurter_base_url: str # Base URL of the Frankfurter API
+  gold_api_base_url: str # Base URL of gold-api.com
+  gold_api_io_base_url: str # Base URL of goldapi.io
   gold_api_io_token: str # Access token for goldapi.io
+  gold_api_io_daily_quota: int # Max goldapi.io calls per UTC day across all nodes, 0 for no limit
+  gold_api_io_quota_burst: int # Max goldapi.io calls in a burst across all nodes
+  gold_api_io_quota_per_minute: float # Sustained goldapi.io calls per minute across all nodes
+  http_pool_connections: int # Number of per-host connection pools kept by upstream HTTP clients
+  http_pool_maxsize: int # Max keep-alive connections per host of upstream HTTP clients
+  http_connect_timeout: float # Timeout in seconds to connect to upstream APIs
+  http_read_timeout: float # Timeout in seconds to read the response of upstream APIs
+  http_max_retries: int # Max retries of failed upstream requests
+  http_backoff_factor: float # Base in seconds of the exponential backoff between upstream retries
+  http_backoff_jitter: float # Max random jitter in seconds added to upstream retry backoff
+  http_batch_deadline: float # Max seconds a concurrent batch of upstream requests may take
+  http_threads: int # Request threads of each gunicorn worker, every open forex stream holds one
   log_base_dir: str # Log base directory
   log_level: str # Log level
   db_uri: str # Database connection URI
@@ -28,11 +54,37 @@ class Config:
 # Initialize configs
 config = Config(
   app_mode = os.getenv("APP_MODE", "http_public"),
+  circuit_failure_threshold = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")),
+  circuit_open_seconds = float(os.getenv("CIRCUIT_OPEN_SECONDS", "5")),
+  circuit_max_open_seconds = float(os.getenv("CIRCUIT_MAX_OPEN_SECONDS", "300")),
   cors_allowed_origins = os.getenv("CORS_ALLOWED_ORIGINS", ""),
   cookie_domain = os.getenv("COOKIE_DOMAIN", ""),
   cookie_samesite = os.getenv("COOKIE_SAMESITE", "Lax"),
   debug_mode = os.getenv("FLASK_DEBUG", "1") == "1",
+  forex_history_dir = os.getenv("FOREX_HISTORY_DIR", "./data/forex_history"),
+  forex_history_start = os.getenv("FOREX_HISTORY_START", "2020-01-01"),
+  forex_max_staleness = float(os.getenv("FOREX_MAX_STALENESS", "21600")),
+  forex_rate_table_path = os.getenv("FOREX_RATE_TABLE_PATH", "/dev/shm/forex_rate_table"),
+  forex_refresh_ahead = float(os.getenv("FOREX_REFRESH_AHEAD", "300")),
+  forex_refresh_interval = float(os.getenv("FOREX_REFRESH_INTERVAL", "60")),
+  forex_warm_start_interval = float(os.getenv("FOREX_WARM_START_INTERVAL", "300")),
+  forex_warm_start_path = os.getenv("FOREX_WARM_START_PATH", "./data/forex_warm_start.bin"),
+  frankfurter_base_url = os.getenv("FRANKFURTER_BASE_URL", "https://api.frankfurter.dev/v1"),
+  gold_api_base_url = os.getenv("GOLD_API_BASE_URL", "https://api.gold-api.com"),
+  gold_api_io_base_url = os.getenv("GOLD_API_IO_BASE_URL", "https://www.goldapi.io"),
   gold_api_io_token = os.getenv("GOLD_API_IO_TOKEN", ""),
+  gold_api_io_daily_quota = int(os.getenv("GOLD_API_IO_DAILY_QUOTA", "100")),
+  gold_api_io_quota_burst = int(os.getenv("GOLD_API_IO_QUOTA_BURST", "5")),
+  gold_api_io_quota_per_minute = float(os.getenv("GOLD_API_IO_QUOTA_PER_MINUTE", "1")),
+  http_pool_connections = int(os.getenv("HTTP_POOL_CONNECTIONS", "4")),
+  http_pool_maxsize = int(os.getenv("HTTP_POOL_MAXSIZE", "16")),
+  http_connect_timeout = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3")),
+  http_read_timeout = float(os.getenv("HTTP_READ_TIMEOUT", "7")),
+  http_max_retries = int(os.getenv("HTTP_MAX_RETRIES", "1")),
+  http_backoff_factor = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.2")),
+  http_backoff_jitter = float(os.getenv("HTTP_BACKOFF_JITTER", "0.2")),
+  http_batch_deadline = float(os.getenv("HTTP_BATCH_DEADLINE", "10")),
+  http_threads = int(os.getenv("HTTP_THREADS", "64")),
   log_base_dir = os.getenv("LOG_BASE", ""),
   log_level = os.getenv("LOG_LEVEL", "DEBUG"),
   db_uri = os.getenv("DATABASE_URI", ""),
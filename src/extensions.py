@@ -2,9 +2,13 @@ import os
 
 from src.common.logger import BasicJSONFormatter, create_logger
 from src.config import config
+from src.service.async_http import AsyncHTTPClient
 from src.service.auth import AuthServicer
+from src.service.circuit_breaker import CircuitBreaker
 from src.service.email import SendEmailService
+from src.service.http import HTTPClientConfig
 from src.service.ip import IP2LocationServicer
+from src.service.quota import QuotaManager
 from src.service.redis import RedisServicer
 from src.service.sql_alchemy import SQLAlchemyServicer
 from src.service.frankfurter import FrankFurtherServicer
@@ -20,24 +24,65 @@ app_logger = create_logger(
   BasicJSONFormatter(datefmt="%Y-%m-%d %H:%M:%S")
 )
 
+# Upstream HTTP client settings
+http_client_config = HTTPClientConfig(
+  pool_connections=config.http_pool_connections,
+  pool_maxsize=config.http_pool_maxsize,
+  connect_timeout=config.http_connect_timeout,
+  read_timeout=config.http_read_timeout,
+  max_retries=config.http_max_retries,
+  backoff_factor=config.http_backoff_factor,
+  backoff_jitter=config.http_backoff_jitter
+)
+
+# Event loop client for concurrent upstream fan-out, shared by the servicers
+async_http_client = AsyncHTTPClient(http_client_config)
+
 # Create services
 auth_service = AuthServicer()
 db_service = SQLAlchemyServicer()
+redis_service = RedisServicer()
 email_service = SendEmailService(
   os.path.join(config.log_base_dir, os.path.basename("email.log")) if config.log_base_dir != "" else "",
   config.reset_password_link, 
   config.send_grid_token, 
-  config.sender_email
+  config.sender_email,
+  http_client_config
 )
 frank_further_service = FrankFurtherServicer(
-  os.path.join(config.log_base_dir, os.path.basename("frank_further.log")) if config.log_base_dir != "" else ""
+  os.path.join(config.log_base_dir, os.path.basename("frank_further.log")) if config.log_base_dir != "" else "",
+  http_client_config,
+  CircuitBreaker(
+    "frankfurter", config.circuit_failure_threshold, config.circuit_open_seconds, config.circuit_max_open_seconds
+  ),
+  basic_url=config.frankfurter_base_url
 )
 gold_api_io_service = GoldAPIIOServicer(
   os.path.join(config.log_base_dir, os.path.basename("gold_api_io.log")) if config.log_base_dir != "" else "",
-  config.gold_api_io_token
+  config.gold_api_io_token,
+  http_client_config,
+  CircuitBreaker(
+    "gold_api_io", config.circuit_failure_threshold, config.circuit_open_seconds, config.circuit_max_open_seconds
+  ),
+  async_http_client,
+  # Only goldapi.io is metered, Frankfurter and gold-api.com have no call budget to share
+  QuotaManager(
+    os.path.join(config.log_base_dir, os.path.basename("quota.log")) if config.log_base_dir != "" else "",
+    redis_service,
+    "gold_api_io",
+    config.gold_api_io_daily_quota,
+    config.gold_api_io_quota_burst,
+    config.gold_api_io_quota_per_minute
+  ),
+  basic_url=config.gold_api_io_base_url
 )
 gold_api_service = GoldAPIServicer(
-  os.path.join(config.log_base_dir, os.path.basename("gold_api.log")) if config.log_base_dir != "" else ""
+  os.path.join(config.log_base_dir, os.path.basename("gold_api.log")) if config.log_base_dir != "" else "",
+  http_client_config,
+  CircuitBreaker(
+    "gold_api", config.circuit_failure_threshold, config.circuit_open_seconds, config.circuit_max_open_seconds
+  ),
+  async_http_client,
+  basic_url=config.gold_api_base_url
 )
 ip_service = IP2LocationServicer("IP2LOCATION-LITE-DB11.BIN", "IP2LOCATION-LITE-DB11.IPV6.BIN")
-redis_service = RedisServicer()
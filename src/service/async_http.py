@@ -0,0 +1,153 @@
+import aiohttp
+import asyncio
+import json
+import os
+import random
+import threading
+
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Coroutine, Optional, TypeVar
+from urllib.parse import urlsplit
+
+from src.service.http import HTTPClientConfig
+
+
+T = TypeVar("T")
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+@dataclass
+class AsyncHTTPResponse:
+  """
+  Data class representing a fully read HTTP response, with the parts of the requests interface the servicers use.
+  """
+
+  status_code: int
+  content: bytes
+
+  @property
+  def text(self) -> str:
+    return self.content.decode(errors="replace")
+
+  def json(self) -> Any:
+    return json.loads(self.content)
+
+
+class AsyncHTTPClient:
+  """
+  Asyncio HTTP client running on a dedicated event loop thread, shared by every servicer of a worker.
+  Sync code submits coroutines with `run` and `run_batch`, so a whole upstream fan-out is served by one thread
+  instead of one blocked thread per request.
+  """
+
+  def __init__(self, config: HTTPClientConfig):
+    """
+    Initialize the client, the event loop is started on first use so it is never inherited across a fork.
+
+    Parameters:
+    - config: Connection pool, timeout and retry settings, `pool_maxsize` is the max concurrent requests per host.
+    """
+
+    self.config = config
+    self.lock = threading.Lock()
+    self.loop: Optional[asyncio.AbstractEventLoop] = None
+    self.pid = 0
+    self.session: Optional[aiohttp.ClientSession] = None
+    self.host_limits: dict[str, asyncio.Semaphore] = {}
+
+  def run(self, coro: Coroutine[Any, Any, T], deadline: timedelta) -> T:
+    """
+    Run a coroutine on the event loop and wait for its result.
+    Raise TimeoutError if it doesn't complete before the deadline.
+    """
+
+    future = asyncio.run_coroutine_threadsafe(asyncio.wait_for(coro, deadline.total_seconds()), self._get_loop())
+    return future.result()
+
+  def run_batch(self, coros: list[Coroutine[Any, Any, T]], deadline: timedelta) -> list[Optional[T]]:
+    """
+    Run coroutines concurrently as one batch on the event loop and wait for all of them, or the deadline.
+    Coroutines still running at the deadline are cancelled.
+
+    Returns:
+    - The result of each coroutine, None for those that failed or were cancelled.
+    """
+
+    if len(coros) == 0:
+      return []
+
+    future = asyncio.run_coroutine_threadsafe(self._gather(coros, deadline), self._get_loop())
+    return future.result()
+
+  async def get(self, url: str, params: Optional[dict] = None, headers: Optional[dict] = None) -> AsyncHTTPResponse:
+    """
+    Send a GET request, limited to `pool_maxsize` concurrent requests per host.
+    Connection errors and retryable status codes are retried with exponential backoff and jitter.
+    """
+
+    session = self._get_session()
+    host = urlsplit(url).netloc
+    limit = self.host_limits.setdefault(host, asyncio.Semaphore(self.config.pool_maxsize))
+
+    attempt = 0
+    while True:
+      try:
+        async with limit:
+          async with session.get(url, params=params, headers=headers) as response:
+            resp = AsyncHTTPResponse(status_code=response.status, content=await response.read())
+
+        if resp.status_code not in RETRY_STATUSES or attempt >= self.config.max_retries:
+          return resp
+      except (aiohttp.ClientError, asyncio.TimeoutError):
+        if attempt >= self.config.max_retries:
+          raise
+
+      await asyncio.sleep(self.config.backoff_factor * (2 ** attempt) + random.uniform(0, self.config.backoff_jitter))
+      attempt += 1
+
+  async def _gather(self, coros: list[Coroutine[Any, Any, T]], deadline: timedelta) -> list[Optional[T]]:
+    """
+    Wait for the coroutines until the deadline, cancelling the unfinished ones.
+    """
+
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    _, pending = await asyncio.wait(tasks, timeout=deadline.total_seconds())
+    for task in pending:
+      task.cancel()
+    if len(pending) > 0:
+      await asyncio.wait(pending)
+
+    return [
+      task.result() if not task.cancelled() and task.exception() is None else None
+      for task in tasks
+    ]
+
+  def _get_session(self) -> aiohttp.ClientSession:
+    """
+    Return the keep-alive session, created on the event loop thread.
+    """
+
+    if self.session is None:
+      self.session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit_per_host=self.config.pool_maxsize),
+        timeout=aiohttp.ClientTimeout(sock_connect=self.config.connect_timeout, sock_read=self.config.read_timeout)
+      )
+
+    return self.session
+
+  def _get_loop(self) -> asyncio.AbstractEventLoop:
+    """
+    Return the running event loop, starting it in a daemon thread if needed.
+    """
+
+    with self.lock:
+      if self.loop is None or self.pid != os.getpid():
+        self.loop = asyncio.new_event_loop()
+        self.pid = os.getpid()
+        self.session = None
+        self.host_limits = {}
+        threading.Thread(target=self.loop.run_forever, name="async-http", daemon=True).start()
+
+      return self.loop
@@ -0,0 +1,131 @@
+import threading
+import time
+
+from typing import Any
+
+
+class CircuitBreaker:
+  """
+  Circuit breaker guarding calls to an upstream service.
+
+  - closed: calls go through, the circuit opens after `failure_threshold` consecutive failures.
+  - open: calls are rejected immediately until the open period ends.
+  - half-open: a single probe call goes through, success closes the circuit,
+    failure re-opens it with the open period doubled (exponential backoff) up to `max_open_seconds`.
+  """
+
+  CLOSED = "closed"
+  OPEN = "open"
+  HALF_OPEN = "half_open"
+
+  def __init__(self, name: str, failure_threshold: int, open_seconds: float, max_open_seconds: float):
+    """
+    Initialize the circuit breaker.
+
+    Parameters:
+    - name: Name of the guarded upstream.
+    - failure_threshold: Consecutive failures before the circuit opens.
+    - open_seconds: Initial time the circuit stays open before a probe is allowed.
+    - max_open_seconds: Upper bound of the open period after repeated failed probes.
+    """
+
+    self.name = name
+    self.failure_threshold = failure_threshold
+    self.open_seconds = open_seconds
+    self.max_open_seconds = max_open_seconds
+
+    self._lock = threading.Lock()
+    self._state = self.CLOSED
+    self._failures = 0
+    self._current_open_seconds = open_seconds
+    self._opened_at = 0.0
+    self._is_probing = False
+    self._rejected = 0
+
+  def allow_request(self) -> bool:
+    """
+    Return true if a call to the upstream may be made now.
+    """
+
+    with self._lock:
+      if self._state == self.CLOSED:
+        return True
+
+      if self._state == self.OPEN and time.monotonic() - self._opened_at >= self._current_open_seconds:
+        self._state = self.HALF_OPEN
+        self._is_probing = False
+
+      # Only a single probe at a time is allowed while half-open
+      if self._state == self.HALF_OPEN and not self._is_probing:
+        self._is_probing = True
+        return True
+
+      self._rejected += 1
+      return False
+
+  def cancel_request(self):
+    """
+    Give back a permission granted by `allow_request` for a call that was not made,
+    so a half-open circuit can probe again.
+    """
+
+    with self._lock:
+      if self._state == self.HALF_OPEN:
+        self._is_probing = False
+
+  def record_success(self):
+    """
+    Record a successful call, closing the circuit.
+    """
+
+    with self._lock:
+      self._state = self.CLOSED
+      self._failures = 0
+      self._current_open_seconds = self.open_seconds
+      self._is_probing = False
+
+  def record_failure(self):
+    """
+    Record a failed call, opening the circuit once the threshold is reached or if the probe failed.
+    """
+
+    with self._lock:
+      self._failures += 1
+
+      if self._state == self.HALF_OPEN:
+        self._current_open_seconds = min(self._current_open_seconds * 2, self.max_open_seconds)
+        self._open()
+      elif self._state == self.CLOSED and self._failures >= self.failure_threshold:
+        self._open()
+
+  def record_response(self, status_code: int):
+    """
+    Record a call by its HTTP status code, server errors and rate limiting count as failures.
+    """
+
+    if status_code >= 500 or status_code == 429:
+      self.record_failure()
+    else:
+      self.record_success()
+
+  def stats(self) -> dict[str, Any]:
+    """
+    Return the circuit state and counters.
+    """
+
+    with self._lock:
+      return {
+        "state": self._state,
+        "consecutive_failures": self._failures,
+        "open_seconds": self._current_open_seconds,
+        "rejected": self._rejected
+      }
+
+  def _open(self):
+    """
+    Open the circuit, the caller must hold the lock.
+    """
+
+    self._state = self.OPEN
+    self._opened_at = time.monotonic()
+    self._is_probing = False
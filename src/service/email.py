@@ -1,10 +1,11 @@
 import json
-import requests
 
 from src.common.logger import BasicJSONFormatter, create_logger
+from src.service.http import HTTPClientConfig, create_session
 
 class SendEmailService:
-  def __init__(self, log_path: str, base_link: str, send_grid_token: str, sender_email: str):
+  def __init__(self, log_path: str, base_link: str, send_grid_token: str, sender_email: str,
+    http_config: HTTPClientConfig):
     """
     Initialize the send email service.
     
@@ -13,6 +14,7 @@ class SendEmailService:
     - log_path: Path where error log will be store
     - send_grid_token: Auth token from SendGrid (https://sendgrid.com)
     - sender_email: Email to use for sending email to recipient
+    - http_config: Connection pool, timeout and retry settings
     """
 
     self.base_link = base_link
@@ -23,6 +25,10 @@ class SendEmailService:
       "Content-Type": "application/json",
     }
 
+    # Pooled keep-alive session shared by all threads
+    self.session = create_session(http_config)
+    self.timeout = http_config.timeout
+
     # Configure the logger with a JSON format for logging error
     self.logger = create_logger("email", "info", log_path, 
                                 BasicJSONFormatter(datefmt="%Y-%m-%d %H:%M:%S"))
@@ -62,7 +68,7 @@ class SendEmailService:
     }
 
     # Send POST request to SendGrid API
-    response = requests.post(self.basic_url, headers=self.headers, data=json.dumps(data), timeout=10)
+    response = self.session.post(self.basic_url, headers=self.headers, data=json.dumps(data), timeout=self.timeout)
 
     # Handle response
     if response.status_code == 202:
@@ -4,6 +4,9 @@ from typing import Optional
 from dataclasses import dataclass
 
 from src.common.logger import BasicJSONFormatter, create_logger
+from src.service.circuit_breaker import CircuitBreaker
+from src.service.http import HTTPClientConfig, create_session
+from src.service.quota import QuotaManager
 
 
 @dataclass
@@ -18,13 +21,40 @@ class CurrencyRateResp:
   rates: dict[str, float]
 
 
+@dataclass
+class CurrencyTimeSeriesResp:
+  """
+  Data class representing daily currency rates response.
+  """
+
+  amount: float
+  base: str
+  start_date: str
+  end_date: str
+  rates: dict[str, dict[str, float]] # rates by date (YYYY-MM-DD)
+
+
 class FrankFurtherServicer:
-  def __init__(self, log_path: str):
+  def __init__(self, log_path: str, http_config: HTTPClientConfig, breaker: CircuitBreaker,
+    quota: Optional[QuotaManager] = None, basic_url: str = "https://api.frankfurter.dev/v1"):
     """
     Initialize the frankfurther api service to get currency pairs exchange rate.
+
+    Parameters:
+    - log_path: Path where error log will be store
+    - http_config: Connection pool, timeout and retry settings
+    - breaker: Circuit breaker guarding the upstream
+    - quota: Optional call budget of the upstream
+    - basic_url: Base URL of the API, overridden to point at a stand-in server when load testing
     """
 
-    self.basic_url = "https://api.frankfurter.dev/v1"
+    self.basic_url = basic_url
+    self.breaker = breaker
+
+    # Pooled keep-alive session shared by all threads
+    self.session = create_session(http_config)
+    self.timeout = http_config.timeout
+    self.quota = quota
 
     # Configure the logger with a JSON format for logging error
     self.logger = create_logger("frankfurther", "info", log_path, 
@@ -40,28 +70,94 @@ class FrankFurtherServicer:
       "base": base_currency
     }
 
+    # Fail fast while the upstream is known to be down
+    if not self.breaker.allow_request():
+      return None
+
+    # Stay within the call budget shared by every worker
+    if self.quota is not None and not self.quota.acquire():
+      self.breaker.cancel_request()
+      self.logger.warning("Skipped frankfurter call, quota exhausted.")
+      return None
+
     try:
       # Send Get request with parameters
-      response = requests.get(url, params=params, timeout=10) # 10s timeout
+      response = self.session.get(url, params=params, timeout=self.timeout)
+      return self._handle_rates_response(base_currency, response)
+    except Exception as e:
+      self.breaker.record_failure()
+      self.logger.error(
+        f"Failed to get currency rates with base currency of {base_currency}. Error: {e}."
+      )
+      return None
+
+  def _handle_rates_response(self, base_currency: str, response: requests.Response
+    ) -> Optional[CurrencyRateResp]:
+    """
+    Record the response on the circuit breaker and parse the currency rates.
+    """
+
+    self.breaker.record_response(response.status_code)
+    if response.status_code == 200:
+      json_resp:dict = response.json()
+
+      return CurrencyRateResp(
+        amount=json_resp.get("amount", 0),
+        base=json_resp.get("base", ""),
+        date=json_resp.get("date", ""),
+        rates=json_resp.get("rates", {})
+      )
+
+    self.logger.error(
+      f"Failed to get currency rates with base currency of {base_currency}. Status code: {response.status_code}. Response: {response.text}"
+    )
+    return None
+
+  def get_currency_time_series(self, base_currency: str, start_date: str, end_date: str
+    ) -> Optional[CurrencyTimeSeriesResp]:
+    """
+    Get daily currency exchange rates based on the base currency, between two dates (YYYY-MM-DD) inclusive.
+    """
+
+    url = f"{self.basic_url}/{start_date}..{end_date}"
+    params = {
+      "base": base_currency
+    }
+
+    # Fail fast while the upstream is known to be down
+    if not self.breaker.allow_request():
+      return None
+
+    # Stay within the call budget shared by every worker
+    if self.quota is not None and not self.quota.acquire():
+      self.breaker.cancel_request()
+      self.logger.warning("Skipped frankfurter call, quota exhausted.")
+      return None
+
+    try:
+      # Send Get request with parameters
+      response = self.session.get(url, params=params, timeout=self.timeout)
 
       # Handle response
+      self.breaker.record_response(response.status_code)
       if response.status_code == 200:
-        json_resp:dict = response.json()
+        json_resp: dict = response.json()
 
-        return CurrencyRateResp(
+        return CurrencyTimeSeriesResp(
           amount=json_resp.get("amount", 0),
           base=json_resp.get("base", ""),
-          date=json_resp.get("date", ""),
+          start_date=json_resp.get("start_date", ""),
+          end_date=json_resp.get("end_date", ""),
           rates=json_resp.get("rates", {})
         )
 
       self.logger.error(
-        f"Failed to get currency rates with base currency of {base_currency}. Status code: {response.status_code}. Response: {response.text}"
+        f"Failed to get currency time series with base currency of {base_currency}. Status code: {response.status_code}. Response: {response.text}"
       )
       return None
     except Exception as e:
+      self.breaker.record_failure()
       self.logger.error(
-        f"Failed to get currency rates with base currency of {base_currency}. Error: {e}."
+        f"Failed to get currency time series with base currency of {base_currency}. Error: {e}."
       )
       return None
-  
\ No newline at end of file
@@ -1,10 +1,15 @@
+import asyncio
 import requests
 
 from datetime import datetime
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Union
 
 from src.common.logger import BasicJSONFormatter, create_logger
+from src.service.async_http import AsyncHTTPClient, AsyncHTTPResponse
+from src.service.circuit_breaker import CircuitBreaker
+from src.service.http import HTTPClientConfig, create_session
+from src.service.quota import QuotaManager
 
 
 @dataclass
@@ -20,12 +25,29 @@ class CommodityPriceResp:
 
 
 class GoldAPIServicer:
-  def __init__(self, log_path: str):
+  def __init__(self, log_path: str, http_config: HTTPClientConfig, breaker: CircuitBreaker,
+    async_client: AsyncHTTPClient,
+    quota: Optional[QuotaManager] = None, basic_url: str = "https://api.gold-api.com"):
     """
     Initialize the gold-api.com service to get commodities price.
+
+    Parameters:
+    - log_path: Path where error log will be store
+    - http_config: Connection pool, timeout and retry settings
+    - breaker: Circuit breaker guarding the upstream
+    - async_client: Asyncio HTTP client used by the async methods
+    - quota: Optional call budget of the upstream
+    - basic_url: Base URL of the API, overridden to point at a stand-in server when load testing
     """
 
-    self.basic_url = "https://api.gold-api.com"
+    self.basic_url = basic_url
+    self.breaker = breaker
+
+    # Pooled keep-alive session shared by all threads
+    self.session = create_session(http_config)
+    self.timeout = http_config.timeout
+    self.async_client = async_client
+    self.quota = quota
 
     # Configure the logger with a JSON format for logging error
     self.logger = create_logger("gold_api", "info", log_path, 
@@ -38,33 +60,86 @@ class GoldAPIServicer:
 
     url = f"{self.basic_url}/price/{symbol}"
 
+    # Fail fast while the upstream is known to be down
+    if not self.breaker.allow_request():
+      return None
+
+    # Stay within the call budget shared by every worker
+    if self.quota is not None and not self.quota.acquire():
+      self.breaker.cancel_request()
+      self.logger.warning("Skipped gold-api.com call, quota exhausted.")
+      return None
+
     try:
       # Send Get request with parameters
-      response = requests.get(url, timeout=10) # 10s timeout
-
-      # Handle response
-      if response.status_code == 200:
-        json_resp: dict = response.json()
-
-        updated_at = 0
-        update_time = json_resp.get("updatedAt", 0)
-        if update_time is not None:
-          updated_at = int(datetime.strptime(update_time, "%Y-%m-%dT%H:%M:%SZ").timestamp())
-
-        return CommodityPriceResp(
-          name=json_resp.get("name", ""),
-          price=json_resp.get("price", 0),
-          symbol=json_resp.get("symbol", ""),
-          updated_at=updated_at
-        )
-      
+      response = self.session.get(url, timeout=self.timeout)
+      return self._handle_price_response(symbol, response)
+    except Exception as e:
+      self.breaker.record_failure()
       self.logger.error(
-        f"Failed to get commodity price with symbol {symbol}. Status code: {response.status_code}. Response: {response.text}."
+        f"Failed to get commodity price with symbol {symbol}. Error: {e}."
       )
       return None
+
+  async def get_commodities_price_async(self, symbol: str) -> Optional[CommodityPriceResp]:
+    """
+    Get commodity price based on the given symbol, on the async client event loop.
+    """
+
+    url = f"{self.basic_url}/price/{symbol}"
+
+    # Fail fast while the upstream is known to be down
+    if not self.breaker.allow_request():
+      return None
+
+    # Stay within the call budget shared by every worker
+    try:
+      is_allowed = self.quota is None or await asyncio.to_thread(self.quota.acquire)
+    except asyncio.CancelledError:
+      self.breaker.cancel_request()
+      raise
+    if not is_allowed:
+      self.breaker.cancel_request()
+      self.logger.warning("Skipped gold-api.com call, quota exhausted.")
+      return None
+
+    try:
+      response = await self.async_client.get(url)
+      return self._handle_price_response(symbol, response)
+    except asyncio.CancelledError:
+      # Cancelled by the batch deadline, release a possible half-open probe
+      self.breaker.cancel_request()
+      raise
     except Exception as e:
+      self.breaker.record_failure()
       self.logger.error(
         f"Failed to get commodity price with symbol {symbol}. Error: {e}."
       )
       return None
-  
\ No newline at end of file
+
+  def _handle_price_response(self, symbol: str, response: Union[requests.Response, AsyncHTTPResponse]
+    ) -> Optional[CommodityPriceResp]:
+    """
+    Record the response on the circuit breaker and parse the commodity price.
+    """
+
+    self.breaker.record_response(response.status_code)
+    if response.status_code == 200:
+      json_resp: dict = response.json()
+
+      updated_at = 0
+      update_time = json_resp.get("updatedAt", 0)
+      if update_time is not None:
+        updated_at = int(datetime.strptime(update_time, "%Y-%m-%dT%H:%M:%SZ").timestamp())
+
+      return CommodityPriceResp(
+        name=json_resp.get("name", ""),
+        price=json_resp.get("price", 0),
+        symbol=json_resp.get("symbol", ""),
+        updated_at=updated_at
+      )
+
+    self.logger.error(
+      f"Failed to get commodity price with symbol {symbol}. Status code: {response.status_code}. Response: {response.text}."
+    )
+    return None
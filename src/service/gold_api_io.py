@@ -1,9 +1,14 @@
+import asyncio
 import requests
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Union
 
 from src.common.logger import BasicJSONFormatter, create_logger
+from src.service.async_http import AsyncHTTPClient, AsyncHTTPResponse
+from src.service.circuit_breaker import CircuitBreaker
+from src.service.http import HTTPClientConfig, create_session
+from src.service.quota import QuotaManager
 
 
 @dataclass
@@ -18,13 +23,31 @@ class CommodityPriceResp:
 
 
 class GoldAPIIOServicer:
-  def __init__(self, log_path: str, access_token: str):
+  def __init__(self, log_path: str, access_token: str, http_config: HTTPClientConfig,
+    breaker: CircuitBreaker, async_client: AsyncHTTPClient,
+    quota: Optional[QuotaManager] = None, basic_url: str = "https://www.goldapi.io"):
     """
     Initialize the goldapi.io service to get commodities price.
+
+    Parameters:
+    - log_path: Path where error log will be store
+    - access_token: Access token from goldapi.io (https://www.goldapi.io)
+    - http_config: Connection pool, timeout and retry settings
+    - breaker: Circuit breaker guarding the upstream
+    - async_client: Asyncio HTTP client used by the async methods
+    - quota: Optional call budget of the upstream
+    - basic_url: Base URL of the API, overridden to point at a stand-in server when load testing
     """
 
-    self.basic_url = "https://www.goldapi.io"
+    self.basic_url = basic_url
     self.access_token = access_token
+    self.breaker = breaker
+
+    # Pooled keep-alive session shared by all threads
+    self.session = create_session(http_config)
+    self.timeout = http_config.timeout
+    self.async_client = async_client
+    self.quota = quota
 
     # Configure the logger with a JSON format for logging error
     self.logger = create_logger("gold_api_io", "info", log_path, 
@@ -38,27 +61,81 @@ class GoldAPIIOServicer:
     url = f"{self.basic_url}/api/{symbol}/{currency}"
     headers = {"x-access-token": self.access_token}
 
+    # Fail fast while the upstream is known to be down
+    if not self.breaker.allow_request():
+      return None
+
+    # Stay within the call budget shared by every worker
+    if self.quota is not None and not self.quota.acquire():
+      self.breaker.cancel_request()
+      self.logger.warning("Skipped goldapi.io call, quota exhausted.")
+      return None
+
     try:
       # Send Get request with parameters
-      response = requests.get(url, headers=headers, timeout=10) # 10s timeout
-
-      # Handle response
-      if response.status_code == 200:
-        json_resp: dict = response.json()
-        
-        return CommodityPriceResp(
-          price=json_resp.get("price", 0),
-          metal=json_resp.get("metal", ""),
-          timestamp=json_resp.get("timestamp", 0)
-        )
-      
+      response = self.session.get(url, headers=headers, timeout=self.timeout)
+      return self._handle_price_response(symbol, response)
+    except Exception as e:
+      self.breaker.record_failure()
       self.logger.error(
-        f"Failed to get commodity price with symbol {symbol}. Status code: {response.status_code}. Response: {response.text}."
+        f"Failed to get commodity price with symbol {symbol}. Error: {e}."
       )
       return None
-    except Exception as e:    
+
+  async def get_commodities_price_async(self, symbol: str, currency: str) -> Optional[CommodityPriceResp]:
+    """
+    Get commodity price based on the given symbol, on the async client event loop.
+    """
+
+    url = f"{self.basic_url}/api/{symbol}/{currency}"
+    headers = {"x-access-token": self.access_token}
+
+    # Fail fast while the upstream is known to be down
+    if not self.breaker.allow_request():
+      return None
+
+    # Stay within the call budget shared by every worker
+    try:
+      is_allowed = self.quota is None or await asyncio.to_thread(self.quota.acquire)
+    except asyncio.CancelledError:
+      self.breaker.cancel_request()
+      raise
+    if not is_allowed:
+      self.breaker.cancel_request()
+      self.logger.warning("Skipped goldapi.io call, quota exhausted.")
+      return None
+
+    try:
+      response = await self.async_client.get(url, headers=headers)
+      return self._handle_price_response(symbol, response)
+    except asyncio.CancelledError:
+      # Cancelled by the batch deadline, release a possible half-open probe
+      self.breaker.cancel_request()
+      raise
+    except Exception as e:
+      self.breaker.record_failure()
       self.logger.error(
         f"Failed to get commodity price with symbol {symbol}. Error: {e}."
       )
       return None
-  
\ No newline at end of file
+
+  def _handle_price_response(self, symbol: str, response: Union[requests.Response, AsyncHTTPResponse]
+    ) -> Optional[CommodityPriceResp]:
+    """
+    Record the response on the circuit breaker and parse the commodity price.
+    """
+
+    self.breaker.record_response(response.status_code)
+    if response.status_code == 200:
+      json_resp: dict = response.json()
+
+      return CommodityPriceResp(
+        price=json_resp.get("price", 0),
+        metal=json_resp.get("metal", ""),
+        timestamp=json_resp.get("timestamp", 0)
+      )
+
+    self.logger.error(
+      f"Failed to get commodity price with symbol {symbol}. Status code: {response.status_code}. Response: {response.text}."
+    )
+    return None
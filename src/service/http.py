@@ -0,0 +1,65 @@
+import requests
+
+from dataclasses import dataclass
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+@dataclass
+class HTTPClientConfig:
+  """
+  Data class representing connection pool, timeout and retry settings of an upstream HTTP client.
+  """
+
+  pool_connections: int # Number of per-host connection pools to keep
+  pool_maxsize: int # Max connections kept alive per host
+  connect_timeout: float # Timeout in seconds to establish a connection
+  read_timeout: float # Timeout in seconds to wait for the response
+  max_retries: int # Max retries on connection errors and retryable status codes
+  backoff_factor: float # Base in seconds of the exponential backoff between retries
+  backoff_jitter: float # Max random jitter in seconds added to each backoff
+
+  @property
+  def timeout(self) -> tuple[float, float]:
+    """
+    Return the (connect, read) timeout tuple used by requests.
+    """
+
+    return (self.connect_timeout, self.read_timeout)
+
+
+def create_session(config: HTTPClientConfig) -> requests.Session:
+  """
+  Create a pooled, keep-alive HTTP session with bounded retries.
+  The session is shared by all threads of a servicer, urllib3 connection pools are thread-safe.
+
+  Parameters:
+  - config: Connection pool, timeout and retry settings.
+
+  Returns:
+  - The configured session.
+  """
+
+  retry = Retry(
+    total=config.max_retries,
+    connect=config.max_retries,
+    read=config.max_retries,
+    status=config.max_retries,
+    backoff_factor=config.backoff_factor,
+    backoff_jitter=config.backoff_jitter,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(["GET", "HEAD"]), # Only retry idempotent requests
+    respect_retry_after_header=False, # Keep the retry delay bounded by our own backoff
+    raise_on_status=False
+  )
+  adapter = HTTPAdapter(
+    pool_connections=config.pool_connections,
+    pool_maxsize=config.pool_maxsize,
+    max_retries=retry
+  )
+
+  session = requests.Session()
+  session.mount("https://", adapter)
+  session.mount("http://", adapter)
+
+  return session
@@ -0,0 +1,144 @@
+import threading
+import time
+
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from src.common.logger import BasicJSONFormatter, create_logger
+from src.service.redis import RedisServicer
+
+
+class QuotaManager:
+  """
+  Call budget of a metered upstream, kept in Redis so every worker and node shares it.
+
+  - A token bucket bounds the burst size and the sustained call rate.
+  - A daily ledger (UTC day) bounds the number of calls per day.
+
+  When the daily budget left drops below the low watermark, callers stretch cache TTLs
+  and defer optional refreshes, so the budget lasts until the next day.
+  """
+
+  STATUS_CACHE_SECONDS = 5 # Time the remaining budget read from Redis is reused locally
+
+  def __init__(self, log_path: str, rdb: RedisServicer, name: str, daily_limit: int, burst: int, per_minute: float,
+    low_watermark: float = 0.25, max_ttl_stretch: float = 4):
+    """
+    Initialize the quota manager.
+
+    Parameters:
+    - log_path: Path where error log will be store
+    - rdb: Redis client holding the bucket and the ledger.
+    - name: Name of the metered upstream.
+    - daily_limit: Max calls per UTC day, 0 for no daily limit.
+    - burst: Max calls in a burst.
+    - per_minute: Sustained calls per minute.
+    - low_watermark: Fraction of the daily limit left below which the budget is considered low.
+    - max_ttl_stretch: Max factor cache TTLs are stretched by as the budget runs out.
+    """
+
+    self.rdb = rdb
+    self.name = name
+    self.daily_limit = daily_limit
+    self.burst = burst
+    self.per_minute = per_minute
+    self.low_watermark = low_watermark
+    self.max_ttl_stretch = max_ttl_stretch
+
+    self._lock = threading.Lock()
+    self._remaining = daily_limit
+    self._checked_at = 0.0
+    self._rejected = 0
+
+    # Configure the logger with a JSON format for logging error
+    self.logger = create_logger("quota", "info", log_path, BasicJSONFormatter(datefmt="%Y-%m-%d %H:%M:%S"))
+
+  def acquire(self, cost: int = 1) -> bool:
+    """
+    Take budget for a call, return false if the call would exceed the rate or the daily limit.
+    The call is allowed if Redis is unreachable, the upstream's own limits still apply.
+    """
+
+    try:
+      allowed, _, remaining = self.rdb.take_quota(
+        self._get_bucket_key(),
+        self._get_ledger_key(),
+        self.burst,
+        self.per_minute / 60,
+        self.daily_limit,
+        int(timedelta(days=2).total_seconds()),
+        cost
+      )
+    except Exception as e:
+      self.logger.error(f"Failed to take {self.name} quota. Error: {e}.")
+      return True
+
+    with self._lock:
+      self._remaining = remaining
+      self._checked_at = time.monotonic()
+      if not allowed:
+        self._rejected += 1
+
+    return allowed
+
+  def remaining_ratio(self) -> float:
+    """
+    Return the fraction of the daily limit left, 1 if there is no daily limit.
+    """
+
+    if self.daily_limit <= 0:
+      return 1
+
+    with self._lock:
+      if time.monotonic() - self._checked_at < self.STATUS_CACHE_SECONDS:
+        return max(self._remaining, 0) / self.daily_limit
+
+    try:
+      used = int(self.rdb.get(self._get_ledger_key()) or 0)
+    except Exception as e:
+      self.logger.error(f"Failed to read {self.name} quota. Error: {e}.")
+      return 1
+
+    with self._lock:
+      self._remaining = self.daily_limit - used
+      self._checked_at = time.monotonic()
+      return max(self._remaining, 0) / self.daily_limit
+
+  def is_low(self) -> bool:
+    """
+    Return true if the daily budget left is below the low watermark.
+    """
+
+    return self.remaining_ratio() < self.low_watermark
+
+  def stretch(self, duration: timedelta) -> timedelta:
+    """
+    Stretch a cache TTL as the daily budget runs low, linearly up to `max_ttl_stretch` when it is exhausted.
+    """
+
+    ratio = self.remaining_ratio()
+    if ratio >= self.low_watermark:
+      return duration
+
+    return duration * (1 + (self.max_ttl_stretch - 1) * (1 - ratio / self.low_watermark))
+
+  def stats(self) -> dict[str, Any]:
+    """
+    Return the daily budget left and the number of calls rejected by this worker.
+    """
+
+    ratio = self.remaining_ratio()
+    with self._lock:
+      return {
+        "daily_limit": self.daily_limit,
+        "daily_remaining": max(self._remaining, 0) if self.daily_limit > 0 else None,
+        "remaining_ratio": round(ratio, 4),
+        "low": ratio < self.low_watermark,
+        "rejected": self._rejected
+      }
+
+  def _get_bucket_key(self) -> str:
+    return f"quota:{self.name}:bucket"
+
+  def _get_ledger_key(self) -> str:
+    return f"quota:{self.name}:daily:{datetime.now(timezone.utc).strftime('%Y%m%d')}"
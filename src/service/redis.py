@@ -460,3 +460,81 @@ class RedisServicer:
     except NoScriptError as e:
       self.sha.pop("pop")
       raise e
+
+  def take_quota(self, bucket_key: str, ledger_key: str, capacity: float, refill_per_second: float,
+    daily_limit: int, ledger_ttl: int, cost: int = 1) -> tuple[bool, float, int]:
+    """
+    Atomically take tokens from a token bucket and record them on a daily ledger.
+    The call is only allowed if both the bucket and the ledger have enough budget left.
+
+    Parameters:
+    - bucket_key: The Redis key of the token bucket hash.
+    - ledger_key: The Redis key counting the calls of the current day.
+    - capacity: Max tokens of the bucket, i.e. the burst size.
+    - refill_per_second: Tokens added to the bucket per second.
+    - daily_limit: Max calls recorded on the ledger, 0 for no limit.
+    - ledger_ttl: Lifetime (in seconds) of the ledger key.
+    - cost: Tokens taken by the call.
+
+    Returns:
+    - Whether the call is allowed, the tokens left in the bucket and the calls left on the ledger.
+    """
+
+    sha = self.sha.get("take_quota")
+    if not sha:
+      script = """
+        local bucket_key = KEYS[1]
+        local ledger_key = KEYS[2]
+        local capacity = tonumber(ARGV[1])
+        local refill_per_second = tonumber(ARGV[2])
+        local daily_limit = tonumber(ARGV[3])
+        local ledger_ttl = tonumber(ARGV[4])
+        local cost = tonumber(ARGV[5])
+
+        -- Use the server clock, so every node refills the bucket alike
+        local time = redis.call("TIME")
+        local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+        -- Refill the bucket for the time elapsed since the last call
+        local state = redis.call("HMGET", bucket_key, "tokens", "ts")
+        local tokens = tonumber(state[1]) or capacity
+        local ts = tonumber(state[2]) or now
+        tokens = math.min(capacity, tokens + math.max(now - ts, 0) * refill_per_second)
+
+        local used = tonumber(redis.call("GET", ledger_key) or "0")
+        local allowed = 0
+        if tokens >= cost and (daily_limit <= 0 or used + cost <= daily_limit) then
+          allowed = 1
+          tokens = tokens - cost
+          used = redis.call("INCRBY", ledger_key, cost)
+          redis.call("EXPIRE", ledger_key, ledger_ttl)
+        end
+
+        -- Keep the bucket until it is full again, a bucket without refill as long as the ledger
+        local bucket_ttl = ledger_ttl
+        if refill_per_second > 0 then
+          bucket_ttl = math.min(math.ceil(capacity / refill_per_second) + 1, ledger_ttl)
+        end
+        redis.call("HSET", bucket_key, "tokens", tostring(tokens), "ts", tostring(now))
+        redis.call("EXPIRE", bucket_key, bucket_ttl)
+
+        return {allowed, tostring(tokens), daily_limit - used}
+      """
+      sha = self.client.script_load(script)
+      if sha is not None:
+        self.sha["take_quota"] = sha
+
+    caller = get_caller_name()
+
+    try:
+      allowed, tokens, remaining = log_slow_queries(
+        self.slow_threshold_ms, 
+        self.logger,
+        "eval take_quota",
+        caller,
+        self.client.evalsha
+      )(sha, 2, bucket_key, ledger_key, capacity, refill_per_second, daily_limit, ledger_ttl, cost)
+      return allowed == 1, float(tokens), int(remaining)
+    except NoScriptError as e:
+      self.sha.pop("take_quota")
+      raise e
@@ -0,0 +1,56 @@
+import pytest
+
+from datetime import date, datetime, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from src.app.forex.constant import ECB_TIMEZONE
+from src.app.forex.history import RateHistorySyncer
+
+
+class FakeStore:
+  def __init__(self, last_date: Optional[date]):
+    self.last_date = last_date
+    self.synced: list[tuple[date, date]] = []
+
+  def get_last_date(self) -> Optional[date]:
+    return self.last_date
+
+  def sync(self, ffs, start: date, end: date) -> int:
+    self.synced.append((start, end))
+    return 1
+
+
+def make_syncer(last_date: Optional[date]) -> RateHistorySyncer:
+  return RateHistorySyncer(FakeStore(last_date), None, date(2020, 1, 1), timedelta(hours=1))
+
+
+def at_ecb_time(year: int, month: int, day: int, hour: int) -> datetime:
+  return datetime(year, month, day, hour, tzinfo=ZoneInfo(ECB_TIMEZONE))
+
+
+@pytest.mark.parametrize("last_date, now", [
+  pytest.param(date(2026, 10, 16), at_ecb_time(2026, 10, 17, 12), id="saturday"),
+  pytest.param(date(2026, 10, 16), at_ecb_time(2026, 10, 19, 10), id="before the publication"),
+  pytest.param(date(2026, 4, 2), at_ecb_time(2026, 4, 3, 18), id="good friday"),
+  pytest.param(date(2026, 10, 19), at_ecb_time(2026, 10, 19, 18), id="up to date")
+])
+def test_skips_until_a_new_publication(last_date: date, now: datetime):
+  syncer = make_syncer(last_date)
+
+  assert syncer.sync_once(now) == 0
+  assert syncer.store.synced == []
+
+
+def test_syncs_up_to_the_latest_publication():
+  syncer = make_syncer(date(2026, 10, 16))
+
+  assert syncer.sync_once(at_ecb_time(2026, 10, 19, 17)) == 1
+  assert syncer.store.synced == [(date(2020, 1, 1), date(2026, 10, 19))]
+
+
+def test_backfills_an_empty_store():
+  syncer = make_syncer(None)
+
+  assert syncer.sync_once(at_ecb_time(2026, 10, 18, 12)) == 1
+  assert syncer.store.synced == [(date(2020, 1, 1), date(2026, 10, 16))]
@@ -0,0 +1,57 @@
+from src.app.forex.metrics import merge_metrics, split_metrics
+
+
+def get_worker_metrics(hits: int, misses: int, state: str, clients: int) -> dict:
+  return {
+    "l1_cache": {"size": 3, "max_size": 256, "hits": hits, "misses": misses, "hit_ratio": 0.5},
+    "pools": {"fill": {"max_workers": 8, "queued": 1, "active": 0, "completed": 10}},
+    "upstreams": {"frankfurter": {"state": state, "consecutive_failures": 2, "open_seconds": 5, "rejected": 4}},
+    "quotas": {"gold_api_io": {"daily_limit": 100, "remaining_ratio": 0.9, "low": False, "rejected": 1}},
+    "stream": {"clients": clients, "max_clients": 32},
+    "rate_table": {"version": 7, "writer": False, "failed_reads": 0}
+  }
+
+
+def test_split_worker_metrics():
+  counters, gauges = split_metrics(get_worker_metrics(30, 10, "open", 2))
+
+  assert counters == {
+    "l1_cache.hits": 30,
+    "l1_cache.misses": 10,
+    "pools.fill.completed": 10,
+    "upstreams.frankfurter.rejected": 4,
+    "quotas.gold_api_io.rejected": 1,
+    "rate_table.failed_reads": 0
+  }
+  assert gauges == {
+    "l1_cache.size": 3,
+    "l1_cache.max_size": 256,
+    "pools.fill.max_workers": 8,
+    "pools.fill.queued": 1,
+    "pools.fill.active": 0,
+    "upstreams.frankfurter.open": 1,
+    "stream.clients": 2,
+    "stream.max_clients": 32,
+    "rate_table.writer": 0
+  }
+
+
+def test_merge_sums_workers():
+  first_counters, first_gauges = split_metrics(get_worker_metrics(30, 10, "closed", 2))
+  second_counters, second_gauges = split_metrics(get_worker_metrics(50, 10, "open", 1))
+  counters = {path: first_counters[path] + second_counters[path] for path in first_counters}
+
+  metrics = merge_metrics(counters, [first_gauges, second_gauges])
+
+  assert metrics["workers"] == 2
+  assert metrics["l1_cache"] == {"hits": 80, "misses": 20, "hit_ratio": 0.8, "size": 6, "max_size": 512}
+  assert metrics["pools"] == {"fill": {"max_workers": 16, "queued": 2, "active": 0, "completed": 20}}
+  assert metrics["upstreams"] == {"frankfurter": {"closed": 1, "open": 1, "rejected": 8}}
+  assert metrics["stream"] == {"clients": 3, "max_clients": 64}
+
+
+def test_merge_keeps_counters_of_stopped_workers():
+  metrics = merge_metrics({"l1_cache.hits": 5, "l1_cache.misses": 0}, [])
+
+  assert metrics["workers"] == 0
+  assert metrics["l1_cache"] == {"hits": 5, "misses": 0, "hit_ratio": 1.0}
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from src.app.forex.model import PortfolioInput
+from src.app.forex.portfolio import calculate_portfolio
+
+
+RELATIVE_TOLERANCE = 1e-9 # Max relative difference with the hand computed results
+
+ASSETS = ["EUR", "USD", "JPY", "XAU", "GBP"]
+# USD value of one unit of each asset, GBP has no rate
+ASSET_RATES = [1.1, 1, 1.1 / 160, 2000, np.nan]
+USD_JPY = 160 / 1.1
+
+
+def make_input(balance: float | None) -> PortfolioInput:
+  # EUR/USD long, USD/JPY short, XAU/USD long and an unpriced EUR/GBP long
+  return PortfolioInput(
+    assets=ASSETS,
+    asset_rates=np.array(ASSET_RATES),
+    base=np.array([0, 1, 3, 0]),
+    quote=np.array([1, 2, 1, 4]),
+    price=np.array([1.1, USD_JPY, 2000, np.nan]),
+    is_long=np.array([True, False, True, True]),
+    lots=np.array([1, 0.5, 0.1, 1]),
+    contract_size=np.array([100000, 100000, 100, 100000]),
+    leverage=np.array([100, 50, 100, 100]),
+    entry_price=np.array([1.09, 150, 1990, 0.8]),
+    balance=balance
+  )
+
+
+def approx(expected):
+  return pytest.approx(expected, rel=RELATIVE_TOLERANCE, nan_ok=True)
+
+
+def test_mixed_currency_portfolio():
+  result = calculate_portfolio(make_input(10000))
+
+  assert result.position_size.tolist() == [100000, 50000, 10, 100000]
+  assert result.notional.tolist() == approx([110000, 50000, 20000, 110000])
+  assert result.margin.tolist() == approx([1100, 1000, 200, 1100])
+  # 0.01 * 100000, 4.545454... * 50000 / 145.4545..., 10 * 10
+  assert result.profit_loss.tolist() == approx([1000, 1562.5, 100, np.nan])
+
+  # The unpriced EUR/GBP position is left out of the exposures and totals
+  assert result.exposure.tolist() == approx([100000, -180000, 50000 * USD_JPY, 10, 0])
+  assert result.exposure_value.tolist() == approx([110000, -180000, 50000, 20000, 0])
+  assert result.unpriced == 1
+  assert result.total_margin == approx(2300)
+  assert result.gross_exposure == approx(180000)
+  assert result.total_profit_loss == approx(2662.5)
+  assert result.equity == approx(12662.5)
+  assert result.free_margin == approx(10362.5)
+  assert result.margin_level == approx(12662.5 / 2300 * 100)
+
+
+def test_portfolio_without_balance():
+  result = calculate_portfolio(make_input(None))
+
+  assert result.total_profit_loss == approx(2662.5)
+  assert result.equity is None
+  assert result.free_margin is None
+  assert result.margin_level is None
+  assert result.total_margin == approx(2300)
@@ -0,0 +1,124 @@
+import math
+import numpy as np
+import pytest
+
+from src.app.forex.constant import (
+  FEE_NONE, FEE_PER_100K, FEE_PER_LOT, PROFIT_GOAL_NONE, PROFIT_GOAL_PIP, PROFIT_GOAL_PORTFOLIO
+)
+from src.app.forex.model import PositionSizeInput
+from src.app.forex.position_size import calculate_position_size
+
+
+RELATIVE_TOLERANCE = 1e-9 # Max relative difference with the web calculator results
+
+# Scenarios and results of the web position size calculator (`web/src/form/calculator/forex/position_size/utils.ts`),
+# worked out with its decimal arithmetic. Fees and swap are None when the scenario has no trading fee,
+# profits are None when it has no profit goal, as they are undefined in the web calculator.
+SCENARIOS = [
+  # capital, risk, stop_pip, pip_decimal, contract_size, base_rate, quote_rate, leverage, lot_type,
+  # fee_type, commission, swap, period, precision, profit_goal_type, profit_goal
+  # -> lot_size, risk_amount, entry_fee, swap_value, profit_pip, profit_amount, profit_fee
+  pytest.param(
+    (10000, 1, 20, 0.0001, 100000, 1.1, 1, 100, 2, FEE_NONE, 0, 0, 0, 2, PROFIT_GOAL_NONE, 0),
+    (0.5, 100, None, None, None, None, None),
+    id="no fee"
+  ),
+  pytest.param(
+    (10000, 1, 20, 0.0001, 100000, 1.1, 1, 100, 2, FEE_NONE, 0, 0, 0, 2, PROFIT_GOAL_PIP, 40),
+    (0.5, 100, None, None, 40, 200, None),
+    id="no fee, pip goal"
+  ),
+  pytest.param(
+    (10000, 1, 20, 0.0001, 100000, 1.1, 1, 100, 2, FEE_NONE, 0, 0, 0, 2, PROFIT_GOAL_PORTFOLIO, 2),
+    (0.5, 100, None, None, 40, 200, None),
+    id="no fee, portfolio goal"
+  ),
+  pytest.param(
+    (10000, 1.5, 35, 0.01, 100000, 1, 0.00666667, 50, 2, FEE_PER_LOT, 7, -2.5, 3, 2, PROFIT_GOAL_PIP, 60),
+    (0.59, 148.8767355, 4.13, -2.95, 60, 224.790118, 4.13),
+    id="per lot fee, pip goal"
+  ),
+  pytest.param(
+    (5000, 2, 18, 0.0001, 100000, 1.1, 1.27, 30, 3, FEE_PER_100K, 3.5, 1.2, 2, 2, PROFIT_GOAL_PORTFOLIO, 1.5),
+    (0.428, 99.8408, 1.65, 1.3, 15, 79.534, 1.65),
+    id="per 100k fee, portfolio goal"
+  ),
+  pytest.param(
+    (25000, 2, 150, 0.1, 100, 2000, 1, 100, 2, FEE_PER_LOT, 10, 0, 0, 2, PROFIT_GOAL_PORTFOLIO, 3),
+    (0.32, 486.4, 3.2, 0, 237, 752, 3.2),
+    id="per lot fee, portfolio goal, commodity"
+  ),
+  pytest.param(
+    (200000, 1, 25, 0.0001, 100000, 0.65, 1, 100, 0, FEE_PER_100K, 6, -4, 7, 2, PROFIT_GOAL_NONE, 0),
+    (6, 1714.8, 23.4, -168, None, None, None),
+    id="per 100k fee, standard lots"
+  ),
+  pytest.param(
+    (50000, 3, 15, 0.0001, 100000, 1, 1, 100, 2, FEE_PER_LOT, 25, 0, 5, 0, PROFIT_GOAL_NONE, 0),
+    (7.49, 1497.5, 187, 0, None, None, None),
+    id="rounded fees, lot adjusted down"
+  ),
+  pytest.param(
+    (10000, 1, 10, 0.0001, 100000, 1, 1, 100, 2, FEE_PER_LOT, 25, 12.5, 1, 0, PROFIT_GOAL_NONE, 0),
+    (0.73, 100, 18, 9, None, None, None),
+    id="rounded swap, lot adjusted up"
+  ),
+  pytest.param(
+    (1000, 5, 2, 0.0001, 100000, 1.1, 1, 30, 2, FEE_PER_LOT, 7, 0, 0, 2, PROFIT_GOAL_PIP, 10),
+    (0.27, 9.18, 1.89, 0, 10, 23.22, 1.89),
+    id="max lot size"
+  ),
+  pytest.param(
+    (10000, 1, 0, 0.0001, 100000, 1.1, 1, 100, 2, FEE_NONE, 0, 0, 0, 2, PROFIT_GOAL_PIP, 40),
+    (0, 0, None, None, 40, 0, None),
+    id="zero stop"
+  ),
+  pytest.param(
+    (10000, 1, 0, 0.0001, 100000, 1.1, 1, 100, 2, FEE_PER_LOT, 7, -2.5, 3, 2, PROFIT_GOAL_PORTFOLIO, 2),
+    (0, 0, 0, 0, 0, 0, None),
+    id="zero stop, per lot fee"
+  ),
+  pytest.param(
+    (10000, 1, 20, 0.0001, 100000, 1.1, 0, 100, 2, FEE_PER_100K, 5, 0, 0, 2, PROFIT_GOAL_PIP, 40),
+    (0, 0, 0, 0, 40, 0, 0),
+    id="zero quote rate"
+  ),
+  pytest.param(
+    (10000, 1, 20, 0.0001, 100000, 0, 1, 100, 2, FEE_NONE, 0, 0, 0, 2, PROFIT_GOAL_PORTFOLIO, 2),
+    (0.5, 100, None, None, 40, 200, None),
+    id="zero base rate"
+  ),
+]
+
+RESULT_FIELDS = ("lot_size", "risk_amount", "entry_fee", "swap_value", "profit_pip", "profit_amount", "profit_fee")
+
+
+def make_input(scenarios: list[tuple]) -> PositionSizeInput:
+  columns = list(zip(*scenarios))
+  integer_columns = {8, 9, 13, 14}
+  return PositionSizeInput(*(
+    np.array(column, dtype=np.int64 if i in integer_columns else np.float64) for i, column in enumerate(columns)
+  ))
+
+
+def assert_matches(result: tuple, expected: tuple):
+  for name, value, expected_value in zip(RESULT_FIELDS, result, expected):
+    if expected_value is None:
+      assert math.isnan(value), name
+    else:
+      assert value == pytest.approx(expected_value, rel=RELATIVE_TOLERANCE, abs=RELATIVE_TOLERANCE), name
+
+
+@pytest.mark.parametrize("scenario, expected", SCENARIOS)
+def test_matches_web_calculator(scenario: tuple, expected: tuple):
+  result = calculate_position_size(make_input([scenario]))
+
+  assert_matches(tuple(getattr(result, name)[0] for name in RESULT_FIELDS), expected)
+
+
+def test_batch_matches_single_scenarios():
+  scenarios = [param.values[0] for param in SCENARIOS]
+  result = calculate_position_size(make_input(scenarios))
+
+  for i, param in enumerate(SCENARIOS):
+    assert_matches(tuple(getattr(result, name)[i] for name in RESULT_FIELDS), param.values[1])
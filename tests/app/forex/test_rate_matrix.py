@@ -0,0 +1,52 @@
+import numpy as np
+
+from src.app.forex.constant import ANCHOR_CURRENCY, CROSS_RATE_TOLERANCE
+from src.app.forex.rate_matrix import build_rate_matrix
+
+
+# EUR reference rates, as served by the upstream for the anchor currency
+EUR_RATES = {
+  "AUD": 1.6423, "CAD": 1.5053, "CHF": 0.9406, "CNY": 7.8711, "CZK": 25.188, "GBP": 0.84393, "HUF": 395.38,
+  "JPY": 158.12, "MXN": 21.6255, "NOK": 11.6795, "PLN": 4.2835, "SEK": 11.4685, "SGD": 1.4411, "THB": 37.236,
+  "TRY": 37.6905, "USD": 1.1052, "ZAR": 19.5416
+}
+
+
+def get_direct_rates(base: str, significant_digits: int = 5) -> dict[str, float]:
+  """
+  Direct rate table of a base currency, derived by the upstream from the same reference rates and rounded
+  to its published precision.
+  """
+
+  units = {ANCHOR_CURRENCY: 1.0, **EUR_RATES}
+  return {
+    quote: float(f"{unit / units[base]:.{significant_digits}g}")
+    for quote, unit in units.items() if quote != base
+  }
+
+
+def test_derived_rates_match_direct_rates():
+  currencies = [ANCHOR_CURRENCY, *EUR_RATES]
+  matrix = build_rate_matrix(ANCHOR_CURRENCY, EUR_RATES, currencies)
+
+  for base in currencies:
+    derived = matrix.row(base)
+    direct = get_direct_rates(base)
+    assert derived.keys() == direct.keys()
+
+    difference = max(abs(derived[quote] - rate) / rate for quote, rate in direct.items())
+    assert difference < CROSS_RATE_TOLERANCE, base
+
+
+def test_anchor_row_matches_anchor_rates():
+  matrix = build_rate_matrix(ANCHOR_CURRENCY, EUR_RATES, [ANCHOR_CURRENCY, *EUR_RATES])
+
+  assert matrix.row(ANCHOR_CURRENCY) == EUR_RATES
+
+
+def test_missing_currency_has_no_rates():
+  matrix = build_rate_matrix(ANCHOR_CURRENCY, {"USD": 1.1052, "JPY": 0}, [ANCHOR_CURRENCY, "USD", "JPY", "GBP"])
+
+  assert matrix.row("USD") == {"EUR": 0.904814}
+  assert matrix.row("GBP") == {}
+  assert np.isnan(matrix.rates[matrix.index["JPY"]]).all()